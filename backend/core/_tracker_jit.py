@@ -0,0 +1,71 @@
+"""
+backend/core/_tracker_jit.py
+Compiled zone and bowl membership kernels for the activity tracker.
+"""
+import numpy as np
+
+from ..data.models import Zone
+
+# Numba is optional; fall back to NumPy broadcasting without it
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Zone.batch_contains is the NumPy version of the rectangle test
+_points_in_rects_numpy = Zone.batch_contains
+
+
+def _points_near_circles_numpy(centers: np.ndarray, sizes: np.ndarray,
+                               circle_centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+    """Return an (N, B) mask of which points lie within the size-scaled circles."""
+    thresholds = radii[None, :] * (1.0 + sizes[:, None] / 100.0)
+    d2 = ((centers[:, None, :] - circle_centers[None, :, :]) ** 2).sum(-1)
+    return d2 <= thresholds ** 2
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def points_in_rects(centers, rects):
+        """Return an (N, Z) mask of which points lie inside which rectangles."""
+        n = centers.shape[0]
+        z = rects.shape[0]
+        inside = np.zeros((n, z), dtype=np.bool_)
+        for i in range(n):
+            x = centers[i, 0]
+            y = centers[i, 1]
+            for j in range(z):
+                inside[i, j] = (rects[j, 0] <= x and x <= rects[j, 2] and
+                                rects[j, 1] <= y and y <= rects[j, 3])
+        return inside
+    
+    @njit(cache=True, fastmath=True)
+    def points_near_circles(centers, sizes, circle_centers, radii):
+        """Return an (N, B) mask of which points lie within the size-scaled circles."""
+        n = centers.shape[0]
+        b = circle_centers.shape[0]
+        near = np.zeros((n, b), dtype=np.bool_)
+        for i in range(n):
+            factor = 1.0 + sizes[i] / 100.0
+            for j in range(b):
+                dx = centers[i, 0] - circle_centers[j, 0]
+                dy = centers[i, 1] - circle_centers[j, 1]
+                threshold = radii[j] * factor
+                near[i, j] = dx * dx + dy * dy <= threshold * threshold
+        return near
+else:
+    points_in_rects = _points_in_rects_numpy
+    points_near_circles = _points_near_circles_numpy
+
+
+def warm_up():
+    """Compile the kernels so the first processed frame does not pay for it."""
+    if not NUMBA_AVAILABLE:
+        return
+    
+    centers = np.zeros((1, 2), dtype=np.float32)
+    points_in_rects(centers, np.zeros((1, 4), dtype=np.float32))
+    points_near_circles(centers, np.zeros(1, dtype=np.float32),
+                        centers, np.ones(1, dtype=np.float32))
@@ -0,0 +1,72 @@
+"""
+backend/core/cache_policy.py
+Policies deciding when PetDetector can reuse its cached detections.
+"""
+from typing import Optional
+
+from ..data.models import DetectionBatch
+
+
+class FrameSkipPolicy:
+    """Run detection on every Nth frame and reuse the cache in between."""
+    
+    def __init__(self, interval: int, cache_frames: int):
+        self.interval = max(1, interval)
+        self.cache_frames = cache_frames
+    
+    def should_skip(self, frame_number: int, last_detection_frame: Optional[int]) -> bool:
+        """Check whether cached detections can be returned for this frame."""
+        if frame_number % self.interval != 0:
+            return True
+        if last_detection_frame is None:
+            return False
+        return frame_number - last_detection_frame < self.cache_frames
+    
+    def update(self, detections: DetectionBatch):
+        """Record the result of a detection run."""
+    
+    def reset(self):
+        """Forget any state from previous frames."""
+
+
+class MovementPolicy:
+    """
+    Reuse the cache only while pets hold still.
+    
+    After each detection run, the new centers are compared with the previous
+    run's centers. If the pet count changed or any pet moved further than
+    the threshold, detection runs every frame until the scene settles.
+    """
+    
+    def __init__(self, cache_frames: int, movement_threshold: float = 20.0):
+        self.cache_frames = cache_frames
+        self.movement_threshold = movement_threshold
+        self._previous_centers = None
+        self._moving = True
+    
+    def should_skip(self, frame_number: int, last_detection_frame: Optional[int]) -> bool:
+        """Check whether cached detections can be returned for this frame."""
+        if last_detection_frame is None or self._moving:
+            return False
+        return frame_number - last_detection_frame < self.cache_frames
+    
+    def update(self, detections: DetectionBatch):
+        """Record the result of a detection run."""
+        centers = detections.center
+        previous = self._previous_centers
+        
+        if previous is None or len(previous) != len(centers):
+            self._moving = True
+        elif len(centers) == 0:
+            self._moving = False
+        else:
+            # Distance from each pet to its nearest previous position, compared squared
+            d2 = ((centers[:, None, :] - previous[None, :, :]) ** 2).sum(-1).min(axis=1)
+            self._moving = bool((d2 > self.movement_threshold ** 2).any())
+        
+        self._previous_centers = centers
+    
+    def reset(self):
+        """Forget any state from previous frames."""
+        self._previous_centers = None
+        self._moving = True
@@ -5,37 +5,90 @@ YOLO-based pet detection module.
 import cv2
 import numpy as np
 from ultralytics import YOLO
-from typing import List, Optional, Tuple
-import datetime
+from typing import List, Optional, Sequence, Tuple
+from collections import deque
+import logging
+import math
 import os
+import time
 
-from ..data.models import Detection, PerformanceSettings
+# Torch is optional; it is only needed for frames decoded straight to the GPU
+try:
+    import torch
+    import torch.nn.functional as F
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+from ..data.models import Detection, DetectionBatch, PerformanceSettings
+from .cache_policy import FrameSkipPolicy, MovementPolicy
+
+# Per-frame diagnostics go through logging so they cost nothing unless enabled
+logger = logging.getLogger(__name__)
 
 
 class PetDetector:
     """YOLO-based pet detection system."""
     
-    def __init__(self, model_path: str = "models/yolo12n.pt", confidence_threshold: float = 0.5):
+    def __init__(self, model_path: str = "models/yolo12n.pt", confidence_threshold: float = 0.5,
+                 batch_size: int = 4, use_tensorrt: bool = True, use_opencl: bool = False):
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
         self.pet_classes = {'cat': 15, 'dog': 16}
+        self._pet_class_list = list(self.pet_classes.values())
+        
+        # Lookup table indexed by uint8 class id: one gather per batch instead
+        # of a membership search per detection
+        self._pet_class_mask = np.zeros(256, dtype=bool)
+        self._pet_class_mask[self._pet_class_list] = True
         
         # Detection caching for performance
         self.last_detection_frame = None
-        self.cached_detections = []
+        self.cached_detections = DetectionBatch.empty()
         self.detection_cache_frames = 3
         
+        # Frame buffer for batched inference
+        self.batch_size = max(1, batch_size)
+        self._frame_buffer = deque()
+        
+        # Reusable output buffers for resizing and drawing (reallocated only
+        # when the frame shape or processing scale changes)
+        self._small_bufs: List[np.ndarray] = []
+        self._overlay_buf = None
+        
+        # Rendered label widths keyed by label text ("cat 0.85"); at most
+        # 2 pet types x 101 confidence values
+        self._label_widths = {}
+        
         # Performance settings
         self.performance_settings = PerformanceSettings.from_mode("balanced")
+        self._cache_policy = self._create_cache_policy()
+        
+        # Inference backend (set to a CUDA device when a TensorRT engine is used)
+        self.use_tensorrt = use_tensorrt
+        self.device = None
+        
+        # Opt-in resize through OpenCV's OpenCL T-API (UMat). Off by default:
+        # YOLO takes the result back as NumPy, so the upload and download
+        # usually cost more than the CPU resize into the pooled buffers, and
+        # enabling it switches OpenCL on for the whole process
+        self._use_umat = use_opencl and cv2.ocl.haveOpenCL()
+        if self._use_umat:
+            cv2.ocl.setUseOpenCL(True)
         
         # Initialize YOLO model
         self.model = self._load_model()
     
     def _load_model(self) -> YOLO:
-        """Load the YOLO model."""
+        """Load the YOLO model, preferring a TensorRT engine when available."""
         if not os.path.exists(self.model_path):
             raise FileNotFoundError(f"Model file not found: {self.model_path}")
         
+        if self.use_tensorrt and self.model_path.endswith(".pt"):
+            engine_model = self._load_tensorrt_engine()
+            if engine_model is not None:
+                return engine_model
+        
         try:
             model = YOLO(self.model_path)
             print(f"✓ YOLO model loaded successfully: {self.model_path}")
@@ -43,104 +96,254 @@ class PetDetector:
         except Exception as e:
             raise RuntimeError(f"Failed to load YOLO model: {e}")
     
+    def _load_tensorrt_engine(self) -> Optional[YOLO]:
+        """
+        Load the TensorRT FP16 engine stored next to the .pt weights.
+        
+        The engine is exported on first run. Predictions from the engine use
+        FP16 accumulation, so confidences can differ slightly from the .pt
+        model. Returns None when TensorRT or CUDA is unavailable.
+        """
+        try:
+            import tensorrt  # noqa: F401
+            import torch
+        except ImportError:
+            return None
+        
+        if not torch.cuda.is_available():
+            return None
+        
+        engine_path = os.path.splitext(self.model_path)[0] + ".engine"
+        try:
+            if not os.path.exists(engine_path):
+                print(f"Exporting TensorRT engine (first run only): {engine_path}")
+                engine_path = YOLO(self.model_path).export(
+                    format="engine", half=True, dynamic=True, batch=16, imgsz=640, device=0
+                )
+            model = YOLO(engine_path, task="detect")
+        except Exception as e:
+            print(f"⚠ TensorRT engine unavailable, using PyTorch weights: {e}")
+            return None
+        
+        self.device = "cuda:0"
+        print(f"✓ TensorRT engine loaded successfully: {engine_path}")
+        return model
+    
     def update_performance_settings(self, settings: PerformanceSettings):
         """Update performance optimization settings."""
         self.performance_settings = settings
         self.detection_cache_frames = settings.detection_cache_frames
+        self._cache_policy = self._create_cache_policy()
+    
+    def _create_cache_policy(self):
+        """Pick the cache policy for the current performance mode."""
+        # Quality mode follows pet movement; the others detect every Nth frame
+        skip_intervals = {"balanced": 3, "performance": 5, "ultra": 10}
+        mode = self.performance_settings.mode
+        
+        if mode in skip_intervals:
+            return FrameSkipPolicy(skip_intervals[mode], self.detection_cache_frames)
+        return MovementPolicy(self.detection_cache_frames)
     
     def update_confidence_threshold(self, threshold: float):
         """Update detection confidence threshold."""
         self.confidence_threshold = max(0.1, min(0.9, threshold))
     
-    def detect_pets(self, frame: np.ndarray, frame_number: int) -> List[Detection]:
+    def detect_pets(self, frame: np.ndarray, frame_number: int) -> DetectionBatch:
         """
         Detect pets in the given frame.
         
         Args:
-            frame: Input video frame
+            frame: Input video frame (NumPy image, or CUDA tensor from NvdecCapture)
             frame_number: Current frame number for caching
 
         Returns:
-            List of Detection objects
+            DetectionBatch of pet detections (iterates as Detection objects)
         """
-        # Level 1: Processing-level frame skipping
-        mode = self.performance_settings.mode
-
-        if mode == "ultra":
-            if frame_number % 10 != 0:  # Process only every 10th frame
-                return self.cached_detections
-        elif mode == "performance":
-            if frame_number % 5 != 0:  # Process every 5th frame
-                return self.cached_detections
-        elif mode == "balanced":
-            if frame_number % 3 != 0:  # Process every 3rd frame
-                return self.cached_detections
-        
-        # Check if we can use cached detections
-        if self._can_use_cached_detections(frame_number):
+        # Reuse cached detections when the mode's cache policy allows it
+        if self._cache_policy.should_skip(frame_number, self.last_detection_frame):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Using cached detections frame=%d", frame_number)
             return self.cached_detections
         
         # Determine processing scale based on performance mode
         scale = self._get_processing_scale()
         
-        # Resize frame for processing if needed
-        if scale < 1.0:
-            small_frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
-        else:
-            small_frame = frame
-        
         # Run YOLO detection
-        try:
-            results = self.model(small_frame, conf=self.confidence_threshold, verbose=False)
-        except Exception as e:
-            print(f"Detection error: {e}")
-            return []
+        results = self._run_model(self._prepare_frames([frame], scale))
+        if results is None:
+            return DetectionBatch.empty()
         
-        # Process results
-        detections = []
-        current_time = datetime.datetime.now()
-        
-        for result in results:
-            if result.boxes is not None:
-                boxes = result.boxes
-                for box in boxes:
-                    class_id = int(box.cls[0])
-                    confidence = float(box.conf[0])
-                    
-                    # Check if it's a pet (cat or dog)
-                    if class_id in self.pet_classes.values():
-                        # Scale coordinates back to original frame size if needed
-                        bbox = box.xyxy[0].cpu().numpy()
-                        if scale < 1.0:
-                            bbox = bbox / scale
-                        
-                        # Determine pet type
-                        pet_type = 'cat' if class_id == 15 else 'dog'
-                        
-                        # Create detection object
-                        detection = Detection(
-                            bbox=tuple(bbox),
-                            pet_type=pet_type,
-                            confidence=confidence,
-                            timestamp=current_time,
-                            frame_number=frame_number
-                        )
-                        
-                        detections.append(detection)
+        detections = self._parse_result(results[0], scale, frame_number, time.monotonic_ns())
         
         # Update cache
         self.cached_detections = detections
         self.last_detection_frame = frame_number
+        self._cache_policy.update(detections)
         
         return detections
     
-    def _can_use_cached_detections(self, frame_number: int) -> bool:
-        """Check if cached detections can be used."""
-        if self.last_detection_frame is None:
-            return False
+    def detect_pets_batch(self, frames: Sequence[np.ndarray],
+                          frame_numbers: Sequence[int]) -> List[DetectionBatch]:
+        """
+        Detect pets in several frames with a single model call.
+        
+        Frame skipping and the detection cache are bypassed; every frame
+        is run through the model.
+        
+        Args:
+            frames: Input video frames
+            frame_numbers: Frame number for each frame
+            
+        Returns:
+            One DetectionBatch per input frame
+        """
+        if len(frames) != len(frame_numbers):
+            raise ValueError("frames and frame_numbers must have the same length")
+        if not frames:
+            return []
+        
+        scale = self._get_processing_scale()
+        results = self._run_model(self._prepare_frames(frames, scale))
+        if results is None:
+            return [DetectionBatch.empty() for _ in frames]
         
-        frame_diff = frame_number - self.last_detection_frame
-        return frame_diff < self.detection_cache_frames
+        current_time = time.monotonic_ns()
+        return [
+            self._parse_result(result, scale, frame_number, current_time)
+            for result, frame_number in zip(results, frame_numbers)
+        ]
+    
+    def buffer_frame(self, frame: np.ndarray, frame_number: int) -> Optional[List[DetectionBatch]]:
+        """
+        Add a frame to the inference buffer and run a batch once it is full.
+        
+        Returns:
+            Per-frame detections when a batch was run, otherwise None
+        """
+        self._frame_buffer.append((frame, frame_number))
+        if len(self._frame_buffer) < self.batch_size:
+            return None
+        
+        return self.flush_frame_buffer()
+    
+    def flush_frame_buffer(self) -> List[DetectionBatch]:
+        """Run detection on any buffered frames and empty the buffer."""
+        if not self._frame_buffer:
+            return []
+        
+        frames, frame_numbers = zip(*self._frame_buffer)
+        self._frame_buffer.clear()
+        return self.detect_pets_batch(frames, frame_numbers)
+    
+    def _prepare_frames(self, frames: Sequence[np.ndarray], scale: float) -> List[np.ndarray]:
+        """Resize frames for processing and pad them to a common shape."""
+        if TORCH_AVAILABLE and isinstance(frames[0], torch.Tensor):
+            return self._prepare_tensor_frames(frames, scale)
+        
+        if scale < 1.0:
+            small_frames = [self._resize_into_buffer(i, frame, scale) for i, frame in enumerate(frames)]
+        else:
+            small_frames = list(frames)
+        
+        if len(small_frames) < 2:
+            return small_frames
+        
+        # Mismatched shapes make the model fall back to per-image processing,
+        # so pad on the bottom/right (keeps box coordinates unchanged)
+        max_h = max(f.shape[0] for f in small_frames)
+        max_w = max(f.shape[1] for f in small_frames)
+        return [
+            f if f.shape[:2] == (max_h, max_w) else
+            cv2.copyMakeBorder(f, 0, max_h - f.shape[0], 0, max_w - f.shape[1],
+                               cv2.BORDER_CONSTANT, value=0)
+            for f in small_frames
+        ]
+    
+    def _prepare_tensor_frames(self, frames: Sequence["torch.Tensor"], scale: float) -> "torch.Tensor":
+        """
+        Resize GPU-decoded frames on the device without a round trip to host memory.
+        
+        Frames are HWC uint8 BGR tensors (see NvdecCapture). YOLO takes tensor
+        input as BCHW float RGB in [0, 1] with sides divisible by its stride,
+        so the batch is padded on the bottom/right like the NumPy path.
+        """
+        batch = torch.stack(list(frames)).permute(0, 3, 1, 2).flip(1).float().div_(255.0)
+        
+        if scale < 1.0:
+            height, width = batch.shape[2:]
+            size = (int(round(height * scale)), int(round(width * scale)))
+            batch = F.interpolate(batch, size=size, mode="bilinear", align_corners=False)
+        
+        stride = 32
+        height, width = batch.shape[2:]
+        pad_h = math.ceil(height / stride) * stride - height
+        pad_w = math.ceil(width / stride) * stride - width
+        if pad_h or pad_w:
+            batch = F.pad(batch, (0, pad_w, 0, pad_h))
+        
+        return batch.contiguous()
+    
+    def _resize_into_buffer(self, index: int, frame: np.ndarray, scale: float) -> np.ndarray:
+        """Resize a frame into the persistent buffer for its batch slot."""
+        height, width = frame.shape[:2]
+        size = (int(round(width * scale)), int(round(height * scale)))
+        shape = (size[1], size[0]) + frame.shape[2:]
+        
+        if self._use_umat:
+            # Resize runs on the OpenCL device; UMat.get() can't download into
+            # an existing array, so this path allocates a new frame each time
+            return cv2.resize(cv2.UMat(frame), size).get()
+        
+        while len(self._small_bufs) <= index:
+            self._small_bufs.append(None)
+        
+        buf = self._small_bufs[index]
+        if buf is None or buf.shape != shape or buf.dtype != frame.dtype:
+            buf = np.empty(shape, dtype=frame.dtype)
+            self._small_bufs[index] = buf
+        
+        cv2.resize(frame, size, dst=buf)
+        return buf
+    
+    def _run_model(self, frames: List[np.ndarray]):
+        """Run the YOLO model on a list of frames, returning None on failure."""
+        try:
+            # Restrict NMS to pet classes so other boxes never leave the device
+            return self.model(frames, conf=self.confidence_threshold, classes=self._pet_class_list,
+                              device=self.device, verbose=False)
+        except Exception as e:
+            logger.warning("Detection error: %s", e)
+            return None
+    
+    def _parse_result(self, result, scale: float, frame_number: int,
+                      timestamp: int) -> DetectionBatch:
+        """Convert a single YOLO result into a batch of pet detections."""
+        if result.boxes is None:
+            return DetectionBatch.empty(timestamp)
+        
+        # Copy the packed (N, 6) [x1, y1, x2, y2, conf, cls] tensor to host in
+        # a single transfer instead of one per output field
+        data = result.boxes.data.cpu().numpy().astype(np.float32, copy=False)
+        bboxes = data[:, :4]
+        confidences = data[:, 4]
+        class_ids = data[:, 5].astype(np.uint8)
+        
+        # Keep only pets (cats and dogs)
+        pet_mask = self._pet_class_mask[class_ids]
+        bboxes = bboxes[pet_mask]
+        
+        # Scale coordinates back to original frame size if needed
+        if scale < 1.0:
+            bboxes = bboxes / np.float32(scale)
+        
+        return DetectionBatch(
+            bbox=bboxes,
+            pet_type_id=class_ids[pet_mask],
+            confidence=confidences[pet_mask],
+            frame_number=np.full(len(bboxes), frame_number, dtype=np.int32),
+            timestamp=timestamp
+        )
     
     def _get_processing_scale(self) -> float:
         """Get frame processing scale based on performance mode."""
@@ -161,25 +364,32 @@ class PetDetector:
             detections: List of detections to draw
             
         Returns:
-            Frame with drawn detections
+            Frame with drawn detections (a reused buffer, overwritten by the next call)
         """
-        frame_copy = frame.copy()
+        if self._overlay_buf is None or self._overlay_buf.shape != frame.shape:
+            self._overlay_buf = np.empty_like(frame)
+        frame_copy = self._overlay_buf
+        np.copyto(frame_copy, frame)
         
-        for detection in detections:
-            x1, y1, x2, y2 = map(int, detection.bbox)
-            
+        batch = DetectionBatch.from_detections(detections)
+        boxes = batch.bbox.astype(np.int32).tolist()
+        
+        for (x1, y1, x2, y2), pet_type, confidence in zip(boxes, batch.pet_types, batch.confidence.tolist()):
             # Draw bounding box
             cv2.rectangle(frame_copy, (x1, y1), (x2, y2), (0, 255, 0), 2)
             
             # Prepare label
-            label = f"{detection.pet_type} {detection.confidence:.2f}"
+            label = "%s %.2f" % (pet_type, confidence)
             
-            # Get label size for background
-            label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)
+            # Get label width for background (labels repeat, so measure each once)
+            label_width = self._label_widths.get(label)
+            if label_width is None:
+                label_width = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)[0][0]
+                self._label_widths[label] = label_width
             
             # Draw label background
             cv2.rectangle(frame_copy, (x1, y1 - 20), 
-                         (x1 + label_size[0], y1), (0, 255, 0), -1)
+                         (x1 + label_width, y1), (0, 255, 0), -1)
             
             # Draw label text
             cv2.putText(frame_copy, label, (x1, y1 - 5), 
@@ -189,24 +399,26 @@ class PetDetector:
     
     def get_detection_summary(self, detections: List[Detection]) -> dict:
         """Get summary information about detections."""
-        if not detections:
+        batch = DetectionBatch.from_detections(detections)
+        if len(batch) == 0:
             return {"total": 0, "cats": 0, "dogs": 0, "avg_confidence": 0.0}
         
-        cats = sum(1 for d in detections if d.pet_type == 'cat')
-        dogs = sum(1 for d in detections if d.pet_type == 'dog')
-        avg_confidence = sum(d.confidence for d in detections) / len(detections)
+        # One pass over the class ID array instead of one per pet type
+        counts = np.bincount(batch.pet_type_id, minlength=max(self.pet_classes.values()) + 1)
         
         return {
-            "total": len(detections),
-            "cats": cats,
-            "dogs": dogs,
-            "avg_confidence": avg_confidence
+            "total": len(batch),
+            "cats": int(counts[self.pet_classes['cat']]),
+            "dogs": int(counts[self.pet_classes['dog']]),
+            "avg_confidence": float(batch.confidence.mean(dtype=np.float64))
         }
     
     def clear_cache(self):
         """Clear detection cache."""
         self.last_detection_frame = None
-        self.cached_detections = []
+        self.cached_detections = DetectionBatch.empty()
+        self._cache_policy.reset()
+        self._frame_buffer.clear()
     
     def get_model_info(self) -> dict:
         """Get information about the loaded model."""
@@ -215,5 +427,7 @@ class PetDetector:
             "model_exists": os.path.exists(self.model_path),
             "confidence_threshold": self.confidence_threshold,
             "supported_classes": self.pet_classes,
-            "cache_frames": self.detection_cache_frames
+            "cache_frames": self.detection_cache_frames,
+            "device": self.device or "default",
+            "opencl_resize": self._use_umat
         }
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+backend/core/pipeline.py
+Pipelined capture, detection and tracking using asyncio queues.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from .detector import PetDetector
+from .tracker import PetActivityTracker
+
+
+# Marks the end of the frame stream between stages
+_END_OF_STREAM = object()
+
+
+class PetPipeline:
+    """
+    Runs capture, detection and tracking as overlapping stages.
+    
+    Each stage is an asyncio task connected to the next by a bounded queue,
+    so the GPU can work on one batch while the next frames are being read.
+    Blocking OpenCV and YOLO calls run in dedicated executor threads, which
+    release the GIL inside their C code.
+    """
+    
+    def __init__(self, detector: PetDetector, tracker: PetActivityTracker,
+                 queue_size: int = 4, batch_size: Optional[int] = None):
+        self.detector = detector
+        self.tracker = tracker
+        self.queue_size = queue_size
+        self.batch_size = batch_size or getattr(detector, 'batch_size', 1)
+        self.running = False
+        self.frames_processed = 0
+    
+    def run(self, capture, max_frames: Optional[int] = None,
+            on_result: Optional[Callable] = None) -> int:
+        """
+        Process frames from a capture source until it ends or stop() is called.
+        
+        Args:
+            capture: Object with a ``read() -> (ret, frame)`` method
+            max_frames: Optional limit on the number of frames read
+            on_result: Optional callback receiving
+                ``(frame_number, frame, detections, activity_results)``
+        
+        Returns:
+            Number of frames processed by the tracking stage
+        """
+        return asyncio.run(self.run_async(capture, max_frames, on_result))
+    
+    async def run_async(self, capture, max_frames: Optional[int] = None,
+                        on_result: Optional[Callable] = None) -> int:
+        """Asynchronous version of run()."""
+        self.running = True
+        self.frames_processed = 0
+        
+        input_queue = asyncio.Queue(maxsize=self.queue_size)
+        output_queue = asyncio.Queue(maxsize=self.queue_size)
+        
+        capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="capture")
+        detect_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="detect")
+        
+        try:
+            await asyncio.gather(
+                self._capture_task(capture, input_queue, capture_executor, max_frames),
+                self._detect_task(input_queue, output_queue, detect_executor),
+                self._track_task(output_queue, on_result)
+            )
+        finally:
+            self.running = False
+            capture_executor.shutdown(wait=True)
+            detect_executor.shutdown(wait=True)
+        
+        return self.frames_processed
+    
+    def stop(self):
+        """Request the pipeline to stop after the frames already in flight."""
+        self.running = False
+    
+    async def _capture_task(self, capture, input_queue: asyncio.Queue,
+                            executor: ThreadPoolExecutor, max_frames: Optional[int]):
+        """Read frames from the capture source into the input queue."""
+        loop = asyncio.get_running_loop()
+        frame_number = 0
+        
+        try:
+            while self.running and (max_frames is None or frame_number < max_frames):
+                ret, frame = await loop.run_in_executor(executor, capture.read)
+                if not ret or frame is None:
+                    break
+                
+                await input_queue.put((frame_number, frame))
+                frame_number += 1
+        finally:
+            await input_queue.put(_END_OF_STREAM)
+    
+    async def _detect_task(self, input_queue: asyncio.Queue, output_queue: asyncio.Queue,
+                           executor: ThreadPoolExecutor):
+        """Run batched detection on frames from the input queue."""
+        loop = asyncio.get_running_loop()
+        finished = False
+        
+        while not finished:
+            # Wait for one frame, then take whatever else is ready up to the batch size
+            batch = [await input_queue.get()]
+            while len(batch) < self.batch_size and not input_queue.empty():
+                batch.append(input_queue.get_nowait())
+            
+            if batch[-1] is _END_OF_STREAM:
+                batch.pop()
+                finished = True
+            
+            if batch:
+                frame_numbers = [frame_number for frame_number, _ in batch]
+                frames = [frame for _, frame in batch]
+                
+                results = await loop.run_in_executor(
+                    executor, self.detector.detect_pets_batch, frames, frame_numbers
+                )
+                
+                for frame_number, frame, detections in zip(frame_numbers, frames, results):
+                    await output_queue.put((frame_number, frame, detections))
+        
+        await output_queue.put(_END_OF_STREAM)
+    
+    async def _track_task(self, output_queue: asyncio.Queue, on_result: Optional[Callable]):
+        """Update activity tracking with detections from the output queue."""
+        while True:
+            item = await output_queue.get()
+            if item is _END_OF_STREAM:
+                break
+            
+            frame_number, frame, detections = item
+            self.tracker.set_frame_shape(frame.shape[:2])
+            activity_results = self.tracker.process_detections(detections)
+            self.frames_processed += 1
+            
+            if on_result:
+                on_result(frame_number, frame, detections, activity_results)
+    
+    def get_status(self) -> Dict:
+        """Get pipeline status information."""
+        return {
+            'running': self.running,
+            'frames_processed': self.frames_processed,
+            'queue_size': self.queue_size,
+            'batch_size': self.batch_size
+        }
@@ -4,12 +4,12 @@ Pet activity tracking and zone monitoring.
 """
 import cv2
 import numpy as np
-import time
 from typing import List, Dict, Set, Tuple, Optional
 import datetime
 
-from ..data.models import Detection, Zone, BowlLocation, ZoneDuration
+from ..data.models import Detection, DetectionBatch, Zone, BowlLocation, ZoneDuration
 from ..data.statistics import ActivityStatistics
+from . import _tracker_jit
 
 
 class PetActivityTracker:
@@ -20,22 +20,102 @@ class PetActivityTracker:
         self.zones: List[Zone] = []
         self.bowls: Dict[str, BowlLocation] = {}
         
-        # Current state tracking
-        self.current_zones: Set[str] = set()
+        # Zones, their coordinates stacked as a (Z, 4) array for vectorized
+        # tests, and their name -> index map; update_zones replaces the tuple
+        # as a whole so the processing thread always reads a consistent set
+        self._zone_snapshot: Tuple[Tuple[Zone, ...], np.ndarray, Dict[str, int]] = (
+            (), np.empty((0, 4), dtype=np.float32), {}
+        )
+        
+        # Current state tracking; occupied zones are kept as indices into the
+        # snapshot they were found in and only turned into names at the API
+        # boundary
+        self._occupancy: Tuple[tuple, Set[int]] = (self._zone_snapshot, set())
         self.pet_activity_state: Dict[str, bool] = {}
         
         # Zone masks for efficient processing
         self.zone_mask = None
         self.frame_shape = None
+        
+        # Cached zone borders and labels, drawn onto frames as one sprite
+        self.zone_outlines = None
+        self._zone_outline_alpha = None
+        
+        # Cached zones and bowls together as a (colors, alpha) pair, drawn by
+        # draw_static_overlays; replaced as a whole so the Tk thread can
+        # invalidate it while a frame is being drawn
+        self.static_overlay = None
+        
+        # Reusable output buffer for drawing overlays
+        self._overlay_buf = None
+        
+        # Bowl names, centers (B, 2) and radii (B,) cached for vectorized tests
+        self._bowl_names: List[str] = []
+        self._bowl_centers = np.empty((0, 2), dtype=np.float32)
+        self._bowl_radii = np.empty(0, dtype=np.float32)
+        
+        # Compile membership kernels up front instead of on the first frame
+        _tracker_jit.warm_up()
+    
+    @property
+    def current_zones(self) -> Set[str]:
+        """Names of the occupied zones that are still monitored (a snapshot)."""
+        (zones, _, _), zone_ids = self._occupancy
+        name_to_id = self._zone_snapshot[2]
+        return {zones[zone_id].name for zone_id in list(zone_ids)} & name_to_id.keys()
     
     def update_zones(self, zones: List[Zone]):
-        """Update the list of monitored zones."""
-        self.zones = zones
+        """
+        Update the list of monitored zones.
+        
+        Safe to call while frames are being processed: occupancy is carried
+        over by zone name, and removed zones are exited, on the next frame.
+        """
+        zones = tuple(zones)
+        self._zone_snapshot = (
+            zones,
+            Zone.stack_coords(zones),
+            {zone.name: index for index, zone in enumerate(zones)}
+        )
+        self.zones = list(zones)
         self.zone_mask = None  # Invalidate cache
+        self.zone_outlines = None
+        self.static_overlay = None
+    
+    def _occupied_zone_ids(self, snapshot: tuple) -> Set[int]:
+        """
+        Return the occupied zone ids as indices into snapshot.
+        
+        Occupancy found against an older snapshot is re-interned by name;
+        zones that no longer exist are exited.
+        """
+        occupied_snapshot, zone_ids = self._occupancy
+        if occupied_snapshot is snapshot:
+            return zone_ids
+        
+        occupied_zones = occupied_snapshot[0]
+        name_to_id = snapshot[2]
+        remapped = set()
+        for zone_id in zone_ids:
+            zone_name = occupied_zones[zone_id].name
+            if zone_name in name_to_id:
+                remapped.add(name_to_id[zone_name])
+            else:
+                self.statistics.record_zone_exit(zone_name, "pet")
+        
+        self._occupancy = (snapshot, remapped)
+        return remapped
     
     def update_bowls(self, bowls: Dict[str, BowlLocation]):
-        """Update the bowl locations."""
+        """Update the bowl locations (call again after moving a bowl)."""
         self.bowls = bowls
+        self.static_overlay = None
+        self._refresh_bowl_arrays()
+    
+    def _refresh_bowl_arrays(self):
+        """Rebuild the cached bowl name, center and radius arrays."""
+        self._bowl_names = list(self.bowls)
+        self._bowl_centers, self._bowl_radii = BowlLocation.stack(self.bowls)
     
     def set_frame_shape(self, shape: Tuple[int, int]):
         """Set the video frame shape for heatmap initialization."""
@@ -49,8 +129,8 @@ class PetActivityTracker:
         Process a list of detections and update activity tracking.
         
         Args:
-            detections: List of pet detections
-            
+            detections: List of pet detections or a DetectionBatch
+        
         Returns:
             Dictionary with processing results
         """
@@ -61,31 +141,36 @@ class PetActivityTracker:
             'detections_processed': len(detections)
         }
         
+        # Read the zones once so an update from another thread can't change
+        # them part way through the frame
+        snapshot = self._zone_snapshot
+        current_zone_ids = self._occupied_zone_ids(snapshot)
+        
         if not detections:
             # Check for zone exits when no pets detected
-            self._check_zone_exits_all()
+            self._check_zone_exits_all(snapshot, current_zone_ids)
             self._end_all_bowl_activities()
             return results
         
-        # Track which zones are currently occupied
-        current_frame_zones = set()
+        # Work on parallel arrays so zone and bowl tests run for all detections at once
+        batch = DetectionBatch.from_detections(detections)
         
-        for detection in detections:
-            # Record the detection
-            self.statistics.record_detection(detection)
-            
-            # Check zone activities
-            zone_results = self._check_zone_activities(detection)
-            results['zone_activities'].extend(zone_results)
-            current_frame_zones.update([r['zone'] for r in zone_results if r['action'] == 'entry'])
-            
-            # Check bowl activities
-            bowl_results = self._check_bowl_activities(detection)
-            results['bowl_activities'].extend(bowl_results)
+        # Record the detections without creating a Detection object for each
+        self.statistics.record_detection(batch)
+        
+        # Check zone activities, collecting the ids of zones entered this frame
+        current_frame_zone_ids = set()
+        results['zone_activities'].extend(
+            self._check_zone_activities(batch, snapshot, current_zone_ids, current_frame_zone_ids)
+        )
+        
+        # Check bowl activities
+        results['bowl_activities'].extend(self._check_bowl_activities(batch))
         
         # Check for zone exits
-        exited_zones = self.current_zones - current_frame_zones
-        for zone_name in exited_zones:
+        exited_zone_ids = current_zone_ids - current_frame_zone_ids
+        for zone_id in exited_zone_ids:
+            zone_name = snapshot[0][zone_id].name
             self.statistics.record_zone_exit(zone_name, "pet")  # Generic pet type
             results['zone_activities'].append({
                 'action': 'exit',
@@ -93,86 +178,108 @@ class PetActivityTracker:
                 'pet_type': 'pet'
             })
         
-        # Update current zones
-        self.current_zones = current_frame_zones
+        # Update current zones in place rather than rebinding a new set
+        current_zone_ids.clear()
+        current_zone_ids.update(current_frame_zone_ids)
         
         return results
     
-    def _check_zone_activities(self, detection: Detection) -> List[Dict]:
-        """Check for zone-related activities."""
+    def _check_zone_activities(self, batch: DetectionBatch, snapshot: tuple,
+                               current_zone_ids: Set[int], entered_zone_ids: Set[int]) -> List[Dict]:
+        """Check for zone-related activities, adding entered zones to entered_zone_ids."""
         activities = []
-        center = detection.center
+        zones, zone_coords, _ = snapshot
+        if not zones or not len(batch):
+            return activities
         
-        for zone in self.zones:
-            if zone.point_in_zone(center):
-                # Pet is in this zone
-                if zone.name not in self.current_zones:
-                    # New zone entry
-                    self.statistics.record_zone_entry(zone.name, zone.zone_type, detection.pet_type)
-                    
-                    activity = {
-                        'action': 'entry',
-                        'zone': zone.name,
-                        'zone_type': zone.zone_type,
-                        'pet_type': detection.pet_type,
-                        'timestamp': detection.timestamp
-                    }
-                    
-                    # Check if it's a restricted zone for alerts
-                    if zone.zone_type == "restricted":
-                        activity['alert'] = True
-                    
-                    activities.append(activity)
+        # (N, Z) matrix of which detection centers fall inside which zones
+        inside = _tracker_jit.points_in_rects(batch.center, zone_coords)
+        
+        pet_types = batch.pet_types
+        entries = []
+        for detection_index, zone_index in np.argwhere(inside).tolist():
+            # Pet is in this zone
+            if zone_index not in current_zone_ids:
+                # New zone entry
+                zone = zones[zone_index]
+                entered_zone_ids.add(zone_index)
+                pet_type = pet_types[detection_index]
+                entries.append((zone.name, zone.zone_type, pet_type))
+                
+                activity = {
+                    'action': 'entry',
+                    'zone': zone.name,
+                    'zone_type': zone.zone_type,
+                    'pet_type': pet_type,
+                    'timestamp': batch.timestamp
+                }
+                
+                # Check if it's a restricted zone for alerts
+                if zone.zone_type == "restricted":
+                    activity['alert'] = True
+                
+                activities.append(activity)
+        
+        # Record the frame's entries with a single visit-count update
+        self.statistics.record_zone_entries_batch(entries)
         
         return activities
     
-    def _check_bowl_activities(self, detection: Detection) -> List[Dict]:
+    def _check_bowl_activities(self, batch: DetectionBatch) -> List[Dict]:
         """Check for feeding/drinking activities."""
         activities = []
-        center = detection.center
-        pet_size = detection.size
-        current_time = time.time()
+        if not self.bowls or not len(batch):
+            return activities
         
-        for bowl_name, bowl in self.bowls.items():
-            # Calculate interaction threshold based on pet size
-            threshold_factor = 1.0 + (pet_size / 100.0)  # Adjust based on pet size
+        # Interaction threshold grows with pet size; one squared-distance test
+        # for every (detection, bowl) pair
+        near = _tracker_jit.points_near_circles(
+            batch.center, batch.size, self._bowl_centers, self._bowl_radii
+        )
+        
+        # Only pairs that are near a bowl, or away from an active one, emit anything
+        active = np.array([bool(self.pet_activity_state.get(name)) for name in self._bowl_names])
+        pet_types = batch.pet_types
+        
+        for detection_index, bowl_index in np.argwhere(near | active):
+            bowl_name = self._bowl_names[bowl_index]
+            pet_type = pet_types[detection_index]
             
-            if bowl.is_near(center, threshold_factor):
+            if near[detection_index, bowl_index]:
                 # Pet is near the bowl
                 if bowl_name == "food":
-                    self.statistics.record_eating_event(detection.pet_type)
+                    self.statistics.record_eating_event(pet_type)
                     activities.append({
                         'action': 'eating',
                         'bowl': bowl_name,
-                        'pet_type': detection.pet_type,
-                        'timestamp': detection.timestamp
+                        'pet_type': pet_type,
+                        'timestamp': batch.timestamp
                     })
                 elif bowl_name == "water":
-                    self.statistics.record_drinking_event(detection.pet_type)
+                    self.statistics.record_drinking_event(pet_type)
                     activities.append({
                         'action': 'drinking',
                         'bowl': bowl_name,
-                        'pet_type': detection.pet_type,
-                        'timestamp': detection.timestamp
+                        'pet_type': pet_type,
+                        'timestamp': batch.timestamp
                     })
             else:
-                # Pet is away from the bowl - end activity
-                if bowl_name in self.pet_activity_state and self.pet_activity_state[bowl_name]:
-                    self.statistics.end_bowl_activity(bowl_name)
-                    activities.append({
-                        'action': 'finished',
-                        'bowl': bowl_name,
-                        'pet_type': detection.pet_type,
-                        'timestamp': detection.timestamp
-                    })
+                # Pet is away from an active bowl - end activity
+                self.statistics.end_bowl_activity(bowl_name)
+                activities.append({
+                    'action': 'finished',
+                    'bowl': bowl_name,
+                    'pet_type': pet_type,
+                    'timestamp': batch.timestamp
+                })
         
         return activities
     
-    def _check_zone_exits_all(self):
+    def _check_zone_exits_all(self, snapshot: tuple, current_zone_ids: Set[int]):
         """Check for zone exits when no pets are detected."""
-        for zone_name in list(self.current_zones):
-            self.statistics.record_zone_exit(zone_name, "pet")
-        self.current_zones.clear()
+        for zone_id in current_zone_ids:
+            self.statistics.record_zone_exit(snapshot[0][zone_id].name, "pet")
+        current_zone_ids.clear()
     
     def _end_all_bowl_activities(self):
         """End all bowl activities when no pets are detected."""
@@ -198,49 +305,68 @@ class PetActivityTracker:
             y2 = max(0, min(y2, height - 1))
             
             if x2 > x1 and y2 > y1:
-                # Draw semi-transparent rectangle
-                overlay = self.zone_mask.copy()
-                cv2.rectangle(overlay, (x1, y1), (x2, y2), zone.color, -1)
-                cv2.addWeighted(overlay, 0.3, self.zone_mask, 0.7, 0, self.zone_mask)
+                # Blend a semi-transparent fill into the zone's region only
+                roi = self.zone_mask[y1:y2 + 1, x1:x2 + 1]
+                fill = np.empty_like(roi)
+                fill[:] = zone.color
+                cv2.addWeighted(fill, 0.3, roi, 0.7, 0, roi)
                 
                 # Draw border
                 cv2.rectangle(self.zone_mask, (x1, y1), (x2, y2), zone.color, 2)
         
         return self.zone_mask
     
-    def draw_zones(self, frame: np.ndarray) -> np.ndarray:
-        """Draw zones on the frame."""
-        frame_copy = frame.copy()
+    def _create_zone_outlines(self, frame_shape: Tuple[int, int]):
+        """Render zone borders and labels once into a cached BGRA sprite."""
+        height, width = frame_shape
+        sprite = np.zeros((height, width, 4), dtype=np.uint8)
+        self._draw_zone_outlines(sprite)
+        
+        # Split into contiguous color and alpha planes for cv2.copyTo
+        self.zone_outlines = np.ascontiguousarray(sprite[:, :, :3])
+        self._zone_outline_alpha = np.ascontiguousarray(sprite[:, :, 3])
+    
+    def _create_static_overlay(self, frame_shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Render zones and then bowls once into a cached BGRA sprite and return it."""
+        height, width = frame_shape
+        sprite = np.zeros((height, width, 4), dtype=np.uint8)
+        self._draw_zone_outlines(sprite)
+        self._draw_bowl_markers(sprite, alpha=(255,))
         
+        overlay = (np.ascontiguousarray(sprite[:, :, :3]),
+                   np.ascontiguousarray(sprite[:, :, 3]))
+        self.static_overlay = overlay
+        return overlay
+    
+    def _draw_zone_outlines(self, sprite: np.ndarray):
+        """Draw zone borders and labels onto a BGRA sprite."""
         for zone in self.zones:
             x1, y1, x2, y2 = zone.coords
+            color = tuple(zone.color) + (255,)
             
             # Draw zone rectangle
-            cv2.rectangle(frame_copy, (x1, y1), (x2, y2), zone.color, 2)
+            cv2.rectangle(sprite, (x1, y1), (x2, y2), color, 2)
             
             # Draw zone label with background
             label = f"{zone.name} ({zone.zone_type})"
             label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)
             
             # Background for text
-            cv2.rectangle(frame_copy, (x1, y1 - 20), 
-                         (x1 + label_size[0], y1), zone.color, -1)
+            cv2.rectangle(sprite, (x1, y1 - 20), 
+                         (x1 + label_size[0], y1), color, -1)
             
             # Text
-            cv2.putText(frame_copy, label, (x1, y1 - 5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-        
-        return frame_copy
+            cv2.putText(sprite, label, (x1, y1 - 5), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255, 255), 2)
     
-    def draw_bowls(self, frame: np.ndarray) -> np.ndarray:
-        """Draw bowl locations on the frame."""
-        frame_copy = frame.copy()
-        
+    def _draw_bowl_markers(self, image: np.ndarray, alpha: Tuple[int, ...] = ()):
+        """Draw bowl circles and labels; pass alpha=(255,) for a BGRA sprite."""
         for bowl_name, bowl in self.bowls.items():
             x, y = bowl.position
+            color = tuple(bowl.color) + alpha
             
             # Draw bowl circle
-            cv2.circle(frame_copy, (int(x), int(y)), bowl.radius, bowl.color, 2)
+            cv2.circle(image, (int(x), int(y)), bowl.radius, color, 2)
             
             # Draw bowl label with background
             label = bowl_name.title()
@@ -250,15 +376,64 @@ class PetActivityTracker:
             label_y = int(y - bowl.radius - 10)
             
             # Background for text
-            cv2.rectangle(frame_copy, 
+            cv2.rectangle(image, 
                          (label_x - 2, label_y - label_size[1] - 2),
                          (label_x + label_size[0] + 2, label_y + 2), 
-                         bowl.color, -1)
+                         color, -1)
             
             # Text
-            cv2.putText(frame_copy, label, (label_x, label_y), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
+            cv2.putText(image, label, (label_x, label_y), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255) + alpha, 2)
+    
+    def _copy_to_overlay(self, frame: np.ndarray) -> np.ndarray:
+        """Copy a frame into the reusable overlay buffer and return the buffer."""
+        if self._overlay_buf is None or self._overlay_buf.shape != frame.shape:
+            self._overlay_buf = np.empty_like(frame)
+        
+        # draw_bowls(draw_zones(frame)) already hands us the buffer
+        if frame is not self._overlay_buf:
+            np.copyto(self._overlay_buf, frame)
+        return self._overlay_buf
+    
+    def draw_zones(self, frame: np.ndarray) -> np.ndarray:
+        """Draw zones on the frame."""
+        frame_copy = self._copy_to_overlay(frame)
+        if not self.zones:
+            return frame_copy
         
+        # Zones are static between updates, so only rebuild the sprite when
+        # it has been invalidated or the frame size changes
+        if self.zone_outlines is None or self.zone_outlines.shape != frame_copy.shape:
+            self._create_zone_outlines(frame_copy.shape[:2])
+        
+        cv2.copyTo(self.zone_outlines, self._zone_outline_alpha, frame_copy)
+        return frame_copy
+    
+    def draw_bowls(self, frame: np.ndarray) -> np.ndarray:
+        """Draw bowl locations on the frame."""
+        frame_copy = self._copy_to_overlay(frame)
+        self._draw_bowl_markers(frame_copy)
+        return frame_copy
+    
+    def draw_static_overlays(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Draw zones and bowls on the frame in one pass.
+        
+        Same result as draw_bowls(draw_zones(frame)), but both are rendered
+        once into a cached sprite. Call invalidate_cache() after moving a
+        bowl or zone in place; update_zones and update_bowls do it already.
+        """
+        frame_copy = self._copy_to_overlay(frame)
+        if not self.zones and not self.bowls:
+            return frame_copy
+        
+        # Read the cache once; it may be reset to None at any point
+        overlay = self.static_overlay
+        if overlay is None or overlay[0].shape != frame_copy.shape:
+            overlay = self._create_static_overlay(frame_copy.shape[:2])
+        
+        colors, alpha = overlay
+        cv2.copyTo(colors, alpha, frame_copy)
         return frame_copy
     
     def get_zone_by_name(self, name: str) -> Optional[Zone]:
@@ -274,15 +449,17 @@ class PetActivityTracker:
     
     def clear_zones(self):
         """Clear all zones."""
-        self.zones.clear()
-        self.zone_mask = None
-        self.current_zones.clear()
+        self.update_zones([])
     
     def clear_bowls(self):
         """Clear all bowls."""
         self.bowls.clear()
+        self.static_overlay = None
         self.pet_activity_state.clear()
+        self._refresh_bowl_arrays()
     
     def invalidate_cache(self):
         """Invalidate cached overlays."""
-        self.zone_mask = None
\ No newline at end of file
+        self.zone_mask = None
+        self.zone_outlines = None
+        self.static_overlay = None
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+backend/data/_heatmap_jit.py
+Compiled heatmap accumulation kernel for ActivityStatistics.
+"""
+import numpy as np
+
+# Numba is optional; fall back to NumPy without it
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _record_corners(delta: np.ndarray, x1: int, y1: int, x2: int, y2: int) -> bool:
+    """Record an already clipped box as four summed-area corner updates."""
+    if y2 > y1 and x2 > x1:
+        delta[y1, x1] += 1
+        delta[y1, x2] -= 1
+        delta[y2, x1] -= 1
+        delta[y2, x2] += 1
+        return True
+    return False
+
+
+def _accumulate_bbox_numpy(delta: np.ndarray, x1: int, y1: int, x2: int, y2: int,
+                           clip_hi: np.ndarray) -> bool:
+    """
+    Clip a box to the heatmap and record it as four summed-area corner updates.
+    
+    Args:
+        delta: int32 delta array of an (H, W) heatmap, at least (H, W) in size
+        x1, y1, x2, y2: Box corners in pixels (end coordinates exclusive)
+        clip_hi: (4,) int32 array of [W - 1, H - 1, W - 1, H - 1]
+        
+    Returns:
+        True if the clipped box was non-empty and recorded
+    """
+    # Clip all four coordinates with one NumPy call instead of eight compares
+    x1, y1, x2, y2 = np.clip(np.array((x1, y1, x2, y2), dtype=np.int32), 0, clip_hi).tolist()
+    return _record_corners(delta, x1, y1, x2, y2)
+
+
+if NUMBA_AVAILABLE:
+    _record_corners_jit = njit(cache=True)(_record_corners)
+    
+    @njit(cache=True, fastmath=True)
+    def accumulate_bbox(delta, x1, y1, x2, y2, clip_hi):
+        """Compiled _accumulate_bbox_numpy; the scalar clipping compiles to branchless selects."""
+        x1 = max(0, min(x1, clip_hi[0]))
+        y1 = max(0, min(y1, clip_hi[1]))
+        x2 = max(0, min(x2, clip_hi[2]))
+        y2 = max(0, min(y2, clip_hi[3]))
+        return _record_corners_jit(delta, x1, y1, x2, y2)
+    
+    # Compile at import so the first detection does not pay for it
+    accumulate_bbox(np.zeros((2, 2), dtype=np.int32), 0, 0, 1, 1, np.zeros(4, dtype=np.int32))
+else:
+    accumulate_bbox = _accumulate_bbox_numpy
@@ -2,9 +2,27 @@
 backend/data/models.py
 Data models for the Pet Activity Tracker application.
 """
-from dataclasses import dataclass
-from typing import Tuple, Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Tuple, Dict, List, Optional, Iterator
 import datetime
+import sys
+import time
+import numpy as np
+
+
+# COCO class ids of the supported pet types
+PET_CLASS_IDS = {'cat': 15, 'dog': 16}
+PET_TYPE_NAMES = {class_id: name for name, class_id in PET_CLASS_IDS.items()}
+
+# Offset from time.monotonic_ns() to wall-clock nanoseconds, captured once
+_MONOTONIC_EPOCH_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+
+def monotonic_to_datetime(timestamp) -> Optional[datetime.datetime]:
+    """Convert a time.monotonic_ns() detection timestamp to wall-clock time."""
+    if timestamp is None or isinstance(timestamp, datetime.datetime):
+        return timestamp
+    return datetime.datetime.fromtimestamp((timestamp + _MONOTONIC_EPOCH_OFFSET_NS) / 1e9)
 
 
 @dataclass
@@ -15,12 +33,70 @@ class Zone:
     zone_type: str  # 'restricted', 'normal', 'feeding', etc.
     color: Tuple[int, int, int]  # RGB color
 
+    def __post_init__(self):
+        """Intern the name, which keys the per-zone statistics dicts."""
+        self.name = sys.intern(self.name)
+
     def point_in_zone(self, point: Tuple[float, float]) -> bool:
         """Check if a point is inside this zone."""
         x, y = point
         x1, y1, x2, y2 = self.coords
         return x1 <= x <= x2 and y1 <= y <= y2
 
+    @staticmethod
+    def stack_coords(zones: List['Zone']) -> np.ndarray:
+        """Stack the coordinates of several zones into an (M, 4) float32 array."""
+        return np.array([zone.coords for zone in zones], dtype=np.float32).reshape(-1, 4)
+
+    @staticmethod
+    def batch_contains(points: np.ndarray, coords: np.ndarray) -> np.ndarray:
+        """
+        Vectorized point_in_zone for many points and zones at once.
+
+        Args:
+            points: (N, 2) array of (x, y) points
+            coords: (M, 4) array of zone coordinates, see stack_coords()
+
+        Returns:
+            (N, M) boolean array, True where point i lies in zone j
+        """
+        x = points[:, 0:1]
+        y = points[:, 1:2]
+        return ((x >= coords[:, 0]) & (x <= coords[:, 2]) &
+                (y >= coords[:, 1]) & (y <= coords[:, 3]))
+
+
+class ZoneIndex:
+    """
+    Spatial index answering point-in-zone queries without scanning every zone.
+
+    Zones are binned into horizontal stripes of height h; a zone is listed in
+    every stripe its y-range intersects, so a query only tests the zones of
+    the stripe containing the point.
+    """
+
+    def __init__(self, zones: List[Zone]):
+        self.zones = zones
+        self._size = len(zones)
+
+        max_height = max((zone.coords[3] - zone.coords[1] for zone in zones), default=0)
+        self.h = max(max_height / 4.0, 1.0)
+
+        self._buckets: Dict[int, List[Zone]] = {}
+        for zone in zones:
+            _, y1, _, y2 = zone.coords
+            for stripe in range(int(y1 // self.h), int(y2 // self.h) + 1):
+                self._buckets.setdefault(stripe, []).append(zone)
+
+    def is_stale(self, zones: List[Zone]) -> bool:
+        """Check whether the index was built from a different zone list."""
+        return zones is not self.zones or len(zones) != self._size
+
+    def zones_at(self, x: float, y: float) -> List[Zone]:
+        """Return the zones containing the point (x, y)."""
+        candidates = self._buckets.get(int(y // self.h), ())
+        return [zone for zone in candidates if zone.point_in_zone((x, y))]
+
 
 @dataclass
 class BowlLocation:
@@ -32,32 +108,156 @@ class BowlLocation:
 
     def is_near(self, point: Tuple[float, float], threshold_factor: float = 1.0) -> bool:
         """Check if a point is near this bowl."""
-        x, y = point
-        bowl_x, bowl_y = self.position
-        distance = ((x - bowl_x) ** 2 + (y - bowl_y) ** 2) ** 0.5
-        return distance <= self.radius * threshold_factor
+        # Compare squared distances to avoid the square root
+        dx = point[0] - self.position[0]
+        dy = point[1] - self.position[1]
+        r = self.radius * threshold_factor
+        return dx * dx + dy * dy <= r * r
+
+    @staticmethod
+    def stack(bowls: Dict[str, 'BowlLocation']) -> Tuple[np.ndarray, np.ndarray]:
+        """Stack bowl positions into a (K, 2) array and radii into a (K,) array."""
+        positions = np.array([bowl.position for bowl in bowls.values()], dtype=np.float32).reshape(-1, 2)
+        radii = np.array([bowl.radius for bowl in bowls.values()], dtype=np.float32)
+        return positions, radii
+
+
+def nearest_bowls(points: np.ndarray, positions: np.ndarray,
+                  radii_sq: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized BowlLocation.is_near for many points and bowls at once.
+
+    Args:
+        points: (N, 2) array of (x, y) points
+        positions: (K, 2) array of bowl positions, see BowlLocation.stack()
+        radii_sq: (K,) array of squared bowl radii
+
+    Returns:
+        (N, K) boolean array, True where point i is near bowl j, and an (N,)
+        array with the index of the nearest bowl in range (-1 if none)
+    """
+    d2 = ((points[:, None, :] - positions[None, :, :]) ** 2).sum(-1)
+    near = d2 <= radii_sq[None, :]
+    if positions.shape[0] == 0:
+        return near, np.full(len(points), -1, dtype=np.intp)
+
+    nearest = np.where(near, d2, np.inf).argmin(axis=1)
+    return near, np.where(near.any(axis=1), nearest, -1)
 
 
 @dataclass
 class Detection:
     """Represents a single pet detection."""
+    __slots__ = ('bbox', 'pet_type', 'confidence', 'timestamp', 'frame_number', '_center', '_size')
+
     bbox: Tuple[float, float, float, float]  # (x1, y1, x2, y2)
     pet_type: str  # 'cat' or 'dog'
     confidence: float
-    timestamp: datetime.datetime
+    timestamp: int  # time.monotonic_ns() when the frame was processed
     frame_number: int
 
+    def __post_init__(self):
+        """Compute center and size once; detections are not modified after creation."""
+        self.pet_type = sys.intern(self.pet_type)
+        x1, y1, x2, y2 = self.bbox
+        self._center = ((x1 + x2) / 2, (y1 + y2) / 2)
+        self._size = max(x2 - x1, y2 - y1)
+
+    @property
+    def datetime(self) -> datetime.datetime:
+        """Get the wall-clock time of the detection."""
+        return monotonic_to_datetime(self.timestamp)
+
     @property
     def center(self) -> Tuple[float, float]:
         """Get the center point of the detection."""
-        x1, y1, x2, y2 = self.bbox
-        return ((x1 + x2) / 2, (y1 + y2) / 2)
+        return self._center
 
     @property
     def size(self) -> float:
         """Get the approximate size of the detection."""
-        x1, y1, x2, y2 = self.bbox
-        return max(x2 - x1, y2 - y1)
+        return self._size
+
+
+@dataclass(eq=False)
+class DetectionBatch:
+    """
+    Structure-of-arrays container for pet detections.
+
+    Holds the same information as a list of Detection objects in parallel
+    NumPy arrays so zone, bowl and summary checks can be vectorized.
+    Iterating or indexing yields Detection objects for backward compatibility.
+    """
+    bbox: np.ndarray  # (N, 4) float32, rows of (x1, y1, x2, y2)
+    pet_type_id: np.ndarray  # (N,) uint8 COCO class ids
+    confidence: np.ndarray  # (N,) float32
+    frame_number: np.ndarray  # (N,) int32
+    timestamp: Optional[int] = None  # time.monotonic_ns()
+    center: np.ndarray = field(init=False)  # (N, 2) float32
+
+    def __post_init__(self):
+        """Compute detection centers for the whole batch."""
+        self.center = (self.bbox[:, 0:2] + self.bbox[:, 2:4]) * 0.5
+
+    @classmethod
+    def empty(cls, timestamp: Optional[int] = None) -> 'DetectionBatch':
+        """Create a batch with no detections."""
+        return cls(
+            bbox=np.empty((0, 4), dtype=np.float32),
+            pet_type_id=np.empty(0, dtype=np.uint8),
+            confidence=np.empty(0, dtype=np.float32),
+            frame_number=np.empty(0, dtype=np.int32),
+            timestamp=timestamp
+        )
+
+    @classmethod
+    def from_detections(cls, detections: List[Detection]) -> 'DetectionBatch':
+        """Build a batch from a list of Detection objects."""
+        if isinstance(detections, cls):
+            return detections
+        if not detections:
+            return cls.empty()
+
+        return cls(
+            bbox=np.array([d.bbox for d in detections], dtype=np.float32).reshape(-1, 4),
+            pet_type_id=np.array([PET_CLASS_IDS[d.pet_type] for d in detections], dtype=np.uint8),
+            confidence=np.array([d.confidence for d in detections], dtype=np.float32),
+            frame_number=np.array([d.frame_number for d in detections], dtype=np.int32),
+            timestamp=detections[0].timestamp
+        )
+
+    def __len__(self) -> int:
+        return len(self.confidence)
+
+    def __getitem__(self, index: int) -> Detection:
+        """Get a single detection as a Detection object."""
+        x1, y1, x2, y2 = self.bbox[index]
+        return Detection(
+            bbox=(float(x1), float(y1), float(x2), float(y2)),
+            pet_type=PET_TYPE_NAMES[int(self.pet_type_id[index])],
+            confidence=float(self.confidence[index]),
+            timestamp=self.timestamp,
+            frame_number=int(self.frame_number[index])
+        )
+
+    def __iter__(self) -> Iterator[Detection]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def datetime(self) -> Optional[datetime.datetime]:
+        """Get the wall-clock time of the batch."""
+        return monotonic_to_datetime(self.timestamp)
+
+    @property
+    def pet_types(self) -> List[str]:
+        """Get the pet type name of every detection."""
+        return [PET_TYPE_NAMES[int(class_id)] for class_id in self.pet_type_id]
+
+    @property
+    def size(self) -> np.ndarray:
+        """Get the approximate size of every detection."""
+        return np.maximum(self.bbox[:, 2] - self.bbox[:, 0], self.bbox[:, 3] - self.bbox[:, 1])
 
 
 @dataclass
@@ -69,31 +269,43 @@ class ActivityEvent:
     timestamp: datetime.datetime
     details: Optional[Dict] = None
 
+    def __post_init__(self):
+        """Intern the type strings; both come from small fixed vocabularies."""
+        self.event_type = sys.intern(self.event_type)
+        self.pet_type = sys.intern(self.pet_type)
+
 
 @dataclass
 class ZoneDuration:
     """Tracks time spent in zones."""
     zone_name: str
     total_time: float  # seconds
-    entry_time: Optional[datetime.datetime] = None
+    entry_time: Optional[float] = None  # time.monotonic() at the start of the visit
     visit_count: int = 0
 
+    @property
+    def entry_wallclock(self) -> Optional[datetime.datetime]:
+        """Get the wall-clock time the current visit started."""
+        if self.entry_time is None:
+            return None
+        return monotonic_to_datetime(int(self.entry_time * 1e9))
+
     def start_visit(self) -> None:
         """Start a new visit to this zone."""
-        self.entry_time = datetime.datetime.now()
+        self.entry_time = time.monotonic()
         self.visit_count += 1
 
     def end_visit(self) -> float:
         """End the current visit and return duration."""
-        if self.entry_time:
-            duration = (datetime.datetime.now() - self.entry_time).total_seconds()
+        if self.entry_time is not None:
+            duration = time.monotonic() - self.entry_time
             self.total_time += duration
             self.entry_time = None
             return duration
         return 0.0
 
 
-@dataclass
+@dataclass(frozen=True)
 class PerformanceSettings:
     """Performance optimization settings."""
     mode: str = "balanced"  # quality, balanced, performance, ultra
@@ -105,42 +317,45 @@ class PerformanceSettings:
 
     @classmethod
     def from_mode(cls, mode: str) -> 'PerformanceSettings':
-        """Create settings from performance mode."""
-        settings = {
-            "quality": cls(
-                mode="quality",
-                display_fps=60.0,
-                detection_cache_frames=1,
-                stats_update_frequency=5,
-                heatmap_update_frequency=5,
-                frame_skip_ratio=1
-            ),
-            "balanced": cls(
-                mode="balanced",
-                display_fps=30.0,
-                detection_cache_frames=3,
-                stats_update_frequency=10,
-                heatmap_update_frequency=10,
-                frame_skip_ratio=1
-            ),
-            "performance": cls(
-                mode="performance",
-                display_fps=20.0,
-                detection_cache_frames=5,
-                stats_update_frequency=20,
-                heatmap_update_frequency=15,
-                frame_skip_ratio=2
-            ),
-            "ultra": cls(
-                mode="ultra",
-                display_fps=10.0,
-                detection_cache_frames=10,
-                stats_update_frequency=30,
-                heatmap_update_frequency=20,
-                frame_skip_ratio=5
-            )
-        }
-        return settings.get(mode, settings["balanced"])
+        """Get the settings for a performance mode (shared, immutable instances)."""
+        return _MODE_TABLE.get(mode, _MODE_TABLE["balanced"])
+
+
+# Settings for each performance mode, built once at import
+_MODE_TABLE: Dict[str, PerformanceSettings] = {
+    "quality": PerformanceSettings(
+        mode="quality",
+        display_fps=60.0,
+        detection_cache_frames=1,
+        stats_update_frequency=5,
+        heatmap_update_frequency=5,
+        frame_skip_ratio=1
+    ),
+    "balanced": PerformanceSettings(
+        mode="balanced",
+        display_fps=30.0,
+        detection_cache_frames=3,
+        stats_update_frequency=10,
+        heatmap_update_frequency=10,
+        frame_skip_ratio=1
+    ),
+    "performance": PerformanceSettings(
+        mode="performance",
+        display_fps=20.0,
+        detection_cache_frames=5,
+        stats_update_frequency=20,
+        heatmap_update_frequency=15,
+        frame_skip_ratio=2
+    ),
+    "ultra": PerformanceSettings(
+        mode="ultra",
+        display_fps=10.0,
+        detection_cache_frames=10,
+        stats_update_frequency=30,
+        heatmap_update_frequency=20,
+        frame_skip_ratio=5
+    )
+}
 
 
 @dataclass
@@ -153,6 +368,19 @@ class AppConfig:
     alert_cooldown: int = 60
     email_config: Optional[Dict] = None
     model_path: str = "models/yolo12n.pt"
+    _zone_index: Optional[ZoneIndex] = field(default=None, init=False, repr=False, compare=False)
+    
+    def get_zones_for_point(self, point: Tuple[float, float]) -> List[Zone]:
+        """Get the zones containing a point, using a spatial index over the zones."""
+        # The index is rebuilt when the zone list is replaced or grows/shrinks;
+        # call invalidate_zone_index() after editing zone coordinates in place
+        if self._zone_index is None or self._zone_index.is_stale(self.zones):
+            self._zone_index = ZoneIndex(self.zones)
+        return self._zone_index.zones_at(*point)
+    
+    def invalidate_zone_index(self):
+        """Force the zone index to be rebuilt on the next lookup."""
+        self._zone_index = None
     
     def get_email_config_object(self):
         """Get EmailConfig object from email_config dict."""
@@ -4,19 +4,63 @@ Statistics tracking and management for pet activity.
 """
 import datetime
 import time
+import threading
+import itertools
 import numpy as np
-from collections import defaultdict, deque
-from typing import Dict, List, Optional, Tuple
+from collections import Counter, defaultdict, deque
+from typing import Dict, List, Optional, Tuple, Union
 import json
 
-from .models import ActivityEvent, ZoneDuration, Detection
+# orjson is optional; fall back to the standard json module without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from .models import ActivityEvent, ZoneDuration, Detection, DetectionBatch
+from ._heatmap_jit import accumulate_bbox
+
+
+def _format_log_entry(timestamp: Optional[datetime.datetime], message: str) -> str:
+    """Render an activity log entry as 'YYYY-MM-DD HH:MM:SS: message'."""
+    if timestamp is None:
+        return message
+    return f"{timestamp.isoformat(' ', 'seconds')}: {message}"
+
+
+def _parse_log_entry(entry) -> Tuple[Optional[datetime.datetime], str]:
+    """Split a rendered entry, or an exported (timestamp, message) pair, into (timestamp, message)."""
+    if isinstance(entry, (list, tuple)):
+        timestamp_str, message = entry
+        return (datetime.datetime.fromisoformat(timestamp_str) if timestamp_str else None), message
+    
+    timestamp_str, separator, message = entry.partition(': ')
+    if separator:
+        try:
+            return datetime.datetime.fromisoformat(timestamp_str), message
+        except ValueError:
+            pass
+    return None, entry
+
+
+def _json_default(value):
+    """Serialize the datetime and NumPy values json does not handle natively."""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
 
 class ActivityStatistics:
     """Manages and tracks pet activity statistics."""
     
+    HEATMAP_TILE = 64  # heatmap counts are stored in square tiles of this size
+    
     def __init__(self, max_log_size: int = 1000):
         self.max_log_size = max_log_size
+        self._heatmap_lock = threading.Lock()  # guards the delta buffer swap
         self.reset_statistics()
     
     def reset_statistics(self):
@@ -26,11 +70,11 @@ class ActivityStatistics:
             'drinking_events': 0,
             'restricted_zone_violations': 0,
             'total_detections': 0,
-            'activity_timeline': defaultdict(int),
-            'zone_visits': defaultdict(int)
+            'activity_timeline': np.zeros(24, dtype=np.int64),
+            'zone_visits': Counter()
         }
         
-        self.activity_log = deque(maxlen=self.max_log_size)
+        self.activity_log = deque(maxlen=self.max_log_size)  # (timestamp, message) tuples
         self.zone_durations = {}
         self.current_zones = set()
         self.pet_activity_state = {}
@@ -38,23 +82,75 @@ class ActivityStatistics:
         
         # For timeline tracking
         self.last_activity_hour = None
+        
+        # Start times of the last eating/drinking sessions, for session cooldowns
+        self._last_eating_time = 0.0
+        self._last_drinking_time = 0.0
+    
+    @property
+    def heatmap(self) -> Optional[np.ndarray]:
+        """Movement heatmap as a dense (H, W) copy of the counts folded so far."""
+        return self.heatmap_dense()
+    
+    @property
+    def has_heatmap(self) -> bool:
+        """Whether the heatmap is initialized, without stitching a dense copy."""
+        return self.heatmap_tiled is not None
+    
+    @heatmap.setter
+    def heatmap(self, value: Optional[np.ndarray]):
+        with self._heatmap_lock:
+            self._set_heatmap(value)
+    
+    def _set_heatmap(self, value: Optional[np.ndarray]):
+        """Replace the heatmap tiles and delta buffers; the caller holds the lock."""
+        self.heatmap_tiled = None
+        self._heatmap_shape = None
+        self._heatmap_delta = None
+        self._heatmap_spare = None
+        self._clip_hi = None
+        if value is not None:
+            height, width = value.shape
+            tile = self.HEATMAP_TILE
+            tiles_y = -(-height // tile)
+            tiles_x = -(-width // tile)
+            
+            # Pad to whole tiles and store tile by tile: (tiles_y, tiles_x, tile, tile)
+            padded = np.zeros((tiles_y * tile, tiles_x * tile), dtype=np.uint16)
+            padded[:height, :width] = value
+            self.heatmap_tiled = np.ascontiguousarray(
+                padded.reshape(tiles_y, tile, tiles_x, tile).transpose(0, 2, 1, 3)
+            )
+            self._heatmap_shape = (height, width)
+            self._heatmap_delta = np.zeros(padded.shape, dtype=np.int32)
+            self._heatmap_spare = np.zeros(padded.shape, dtype=np.int32)
+            self._clip_hi = np.array([width - 1, height - 1, width - 1, height - 1], dtype=np.int32)
+        self._heatmap_pending = False
+    
+    def heatmap_dense(self) -> Optional[np.ndarray]:
+        """Stitch the heatmap tiles into a dense (H, W) array."""
+        if self.heatmap_tiled is None:
+            return None
+        
+        tiles_y, tiles_x, tile, _ = self.heatmap_tiled.shape
+        height, width = self._heatmap_shape
+        dense = self.heatmap_tiled.transpose(0, 2, 1, 3).reshape(tiles_y * tile, tiles_x * tile)
+        return dense[:height, :width]
     
     def initialize_heatmap(self, frame_shape: Tuple[int, int]):
         """Initialize the movement heatmap."""
         height, width = frame_shape
-        self.heatmap = np.zeros((height, width), dtype=np.float32)
+        self.heatmap = np.zeros((height, width), dtype=np.uint16)
     
     def log_activity(self, message: str, event_type: str = "general"):
         """Log an activity with timestamp."""
         timestamp = datetime.datetime.now()
-        log_entry = f"{timestamp.strftime('%Y-%m-%d %H:%M:%S')}: {message}"
         
-        # Add to activity log
-        self.activity_log.append(log_entry)
+        # Add to activity log, formatted only when read
+        self.activity_log.append((timestamp, message))
         
         # Update timeline
-        hour = timestamp.hour
-        self.stats['activity_timeline'][hour] += 1
+        self.stats['activity_timeline'][timestamp.hour] += 1
         
         # Create activity event
         event = ActivityEvent(
@@ -66,38 +162,97 @@ class ActivityStatistics:
         
         return event
     
-    def record_detection(self, detection: Detection):
-        """Record a new pet detection."""
+    def record_detection(self, detection: Union[Detection, DetectionBatch]):
+        """Record a new pet detection, or all detections of a DetectionBatch."""
+        if isinstance(detection, DetectionBatch):
+            self._record_detection_batch(detection)
+            return
+        
         self.stats['total_detections'] += 1
         
         # Update heatmap if initialized
-        if self.heatmap is not None:
+        if self.heatmap_tiled is not None:
             self.update_heatmap(detection.bbox)
     
+    def _record_detection_batch(self, batch: DetectionBatch):
+        """Record a frame's detections straight from the batch arrays."""
+        self.stats['total_detections'] += len(batch)
+        
+        if self.heatmap_tiled is not None:
+            for bbox in batch.bbox.astype(np.int32).tolist():
+                self.update_heatmap(bbox)
+    
     def update_heatmap(self, bbox: Tuple[float, float, float, float]):
-        """Update the movement heatmap with detection."""
-        if self.heatmap is None:
+        """
+        Update the movement heatmap with detection.
+        
+        The box is recorded as four corner updates in a summed-area delta
+        array; the heatmap itself is only rebuilt when it is read.
+        """
+        if self.heatmap_tiled is None:
             return
         
         x1, y1, x2, y2 = map(int, bbox)
         
-        # Clip coordinates to frame boundaries
-        height, width = self.heatmap.shape
-        y1 = max(0, min(y1, height - 1))
-        y2 = max(0, min(y2, height - 1))
-        x1 = max(0, min(x1, width - 1))
-        x2 = max(0, min(x2, width - 1))
+        # Clip to frame boundaries and record the box corners
+        with self._heatmap_lock:
+            if accumulate_bbox(self._heatmap_delta, x1, y1, x2, y2, self._clip_hi):
+                self._heatmap_pending = True
+    
+    def fold_heatmap(self):
+        """Fold the detections recorded since the last fold into the heatmap."""
+        if self._heatmap_pending:
+            self._materialize_heatmap()
+    
+    def _materialize_heatmap(self):
+        """Fold pending box increments into the heatmap with two prefix sums."""
+        # Swap in the zeroed spare so detections keep landing in a clean buffer
+        # while the detached one is folded
+        with self._heatmap_lock:
+            if self._heatmap_spare is None:
+                return
+            tiled = self.heatmap_tiled
+            delta = self._heatmap_delta
+            self._heatmap_delta = self._heatmap_spare
+            self._heatmap_spare = None
+            self._heatmap_pending = False
+        
+        np.cumsum(delta, axis=0, out=delta)
+        np.cumsum(delta, axis=1, out=delta)
         
-        if y2 > y1 and x2 > x1:
-            self.heatmap[y1:y2, x1:x2] += 1
+        # Add one row of tiles at a time in int32, saturating so long sessions
+        # don't wrap the uint16 counts
+        tiles_y, tiles_x, tile, _ = tiled.shape
+        delta_tiles = delta.reshape(tiles_y, tile, tiles_x, tile).transpose(0, 2, 1, 3)
+        for row in range(tiles_y):
+            counts = delta_tiles[row]
+            counts += tiled[row]
+            np.minimum(counts, np.iinfo(np.uint16).max, out=counts)
+            tiled[row] = counts
+        
+        delta.fill(0)
+        with self._heatmap_lock:
+            if self.heatmap_tiled is tiled:
+                self._heatmap_spare = delta
+    
+    def get_heatmap_image(self) -> Optional[np.ndarray]:
+        """Get the heatmap, with pending detections folded in, scaled to uint8 for display."""
+        self.fold_heatmap()
+        heatmap = self.heatmap_dense()
+        if heatmap is None:
+            return None
+        
+        peak = int(heatmap.max())
+        if peak == 0:
+            return np.zeros(heatmap.shape, dtype=np.uint8)
+        return (heatmap.astype(np.float32) * (255.0 / peak)).astype(np.uint8)
     
     def record_eating_event(self, pet_type: str):
         """Record an eating event (session-based counting)."""
         current_time = time.time()
         
         # Check if this is a new eating session (cooldown-based)
-        last_eating_time = getattr(self, '_last_eating_time', 0)
-        if current_time - last_eating_time > 30:  # 30 second cooldown between sessions
+        if current_time - self._last_eating_time > 30:  # 30 second cooldown between sessions
             self.stats['eating_events'] += 1
             self.log_activity(f"{pet_type} started eating session #{self.stats['eating_events']}", "eating")
             self._last_eating_time = current_time
@@ -110,8 +265,7 @@ class ActivityStatistics:
         current_time = time.time()
         
         # Check if this is a new drinking session (cooldown-based)
-        last_drinking_time = getattr(self, '_last_drinking_time', 0)
-        if current_time - last_drinking_time > 30:  # 30 second cooldown between sessions
+        if current_time - self._last_drinking_time > 30:  # 30 second cooldown between sessions
             self.stats['drinking_events'] += 1
             self.log_activity(f"{pet_type} started drinking session #{self.stats['drinking_events']}", "drinking")
             self._last_drinking_time = current_time
@@ -121,8 +275,20 @@ class ActivityStatistics:
     
     def record_zone_entry(self, zone_name: str, zone_type: str, pet_type: str):
         """Record entry into a zone."""
-        self.stats['zone_visits'][zone_name] += 1
+        self.record_zone_entries_batch([(zone_name, zone_type, pet_type)])
+    
+    def record_zone_entries_batch(self, entries: List[Tuple[str, str, str]]):
+        """Record the (zone_name, zone_type, pet_type) zone entries of one frame."""
+        if not entries:
+            return
         
+        self.stats['zone_visits'].update([entry[0] for entry in entries])
+        
+        for zone_name, zone_type, pet_type in entries:
+            self._start_zone_visit(zone_name, zone_type, pet_type)
+    
+    def _start_zone_visit(self, zone_name: str, zone_type: str, pet_type: str):
+        """Start timing a zone visit and log the entry."""
         # Initialize zone duration tracking if needed
         if zone_name not in self.zone_durations:
             self.zone_durations[zone_name] = ZoneDuration(zone_name, 0.0)
@@ -159,18 +325,22 @@ class ActivityStatistics:
         """Get formatted zone statistics."""
         zone_stats = []
         
+        # Read the clock once for every zone still occupied
+        now = time.monotonic()
+        zone_durations = self.zone_durations
+        current_zones = self.current_zones
+        
         for zone_name, visits in self.stats['zone_visits'].items():
             duration_info = "N/A"
             total_seconds = 0
             
-            if zone_name in self.zone_durations:
-                zone_duration = self.zone_durations[zone_name]
+            zone_duration = zone_durations.get(zone_name)
+            if zone_duration is not None:
                 total_seconds = zone_duration.total_time
                 
                 # Add current duration if pet is still in zone
-                if zone_name in self.current_zones and zone_duration.entry_time:
-                    current_duration = (datetime.datetime.now() - zone_duration.entry_time).total_seconds()
-                    total_seconds += current_duration
+                if zone_name in current_zones and zone_duration.entry_time is not None:
+                    total_seconds += now - zone_duration.entry_time
                 
                 # Format duration
                 minutes, seconds = divmod(int(total_seconds), 60)
@@ -194,17 +364,45 @@ class ActivityStatistics:
     
     def get_activity_timeline(self) -> Dict[int, int]:
         """Get activity timeline by hour."""
-        return dict(self.stats['activity_timeline'])
+        return {hour: int(count) for hour, count in enumerate(self.stats['activity_timeline']) if count}
     
     def get_recent_activities(self, count: int = 50) -> List[str]:
         """Get recent activity log entries."""
-        return list(self.activity_log)[-count:]
+        recent = list(itertools.islice(reversed(self.activity_log), count))
+        return [_format_log_entry(timestamp, message) for timestamp, message in reversed(recent)]
     
     def export_to_dict(self) -> Dict:
         """Export statistics to dictionary for saving."""
+        return self._export_data([_format_log_entry(timestamp, message)
+                                  for timestamp, message in self.activity_log])
+    
+    def to_json_bytes(self) -> bytes:
+        """
+        Serialize the statistics to UTF-8 JSON.
+        
+        Uses orjson when available. The activity log is written as
+        [timestamp, message] pairs, leaving datetime formatting to the encoder.
+        """
+        data = self._export_data(list(self.activity_log))
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(data, default=_json_default).encode('utf-8')
+    
+    @classmethod
+    def from_json_bytes(cls, data: bytes, max_log_size: int = 1000) -> 'ActivityStatistics':
+        """Create statistics from JSON written by to_json_bytes()."""
+        statistics = cls(max_log_size=max_log_size)
+        statistics.import_from_dict(orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data))
+        return statistics
+    
+    def _export_data(self, activity_log: List) -> Dict:
+        """Build the export dictionary around already converted log entries."""
+        stats = dict(self.stats)
+        stats['activity_timeline'] = self.stats['activity_timeline'].tolist()
+        
         return {
-            'stats': dict(self.stats),
-            'activity_log': list(self.activity_log),
+            'stats': stats,
+            'activity_log': activity_log,
             'zone_durations': {
                 name: {
                     'total_time': duration.total_time,
@@ -219,13 +417,17 @@ class ActivityStatistics:
         if 'stats' in data:
             # Convert defaultdict back to regular dict and then to defaultdict
             for key, value in data['stats'].items():
-                if isinstance(value, dict):
+                if key == 'activity_timeline':
+                    self.stats[key] = self._timeline_to_array(value)
+                elif key == 'zone_visits':
+                    self.stats[key] = Counter(value)
+                elif isinstance(value, dict):
                     self.stats[key] = defaultdict(int, value)
                 else:
                     self.stats[key] = value
         
         if 'activity_log' in data:
-            self.activity_log.extend(data['activity_log'])
+            self.activity_log.extend(_parse_log_entry(entry) for entry in data['activity_log'])
         
         if 'zone_durations' in data:
             for name, duration_data in data['zone_durations'].items():
@@ -235,6 +437,16 @@ class ActivityStatistics:
                     visit_count=duration_data.get('visit_count', 0)
                 )
     
+    @staticmethod
+    def _timeline_to_array(timeline) -> np.ndarray:
+        """Convert an exported timeline (24-item list or older hour dict) to an array."""
+        if isinstance(timeline, dict):
+            array = np.zeros(24, dtype=np.int64)
+            for hour, count in timeline.items():
+                array[int(hour)] = count
+            return array
+        return np.asarray(timeline, dtype=np.int64).reshape(24)
+    
     def get_summary_report(self) -> Dict:
         """Get a comprehensive summary report."""
         zone_stats = self.get_zone_statistics()
@@ -0,0 +1,59 @@
+"""
+backend/services/_sound_jit.py
+Compiled tone synthesis kernel for SoundAlertService.
+"""
+import math
+import numpy as np
+
+# Numba is optional; fall back to NumPy without it
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _synth_tone_numpy(n: int, step: float, scale: float) -> np.ndarray:
+    """Return an (n, 2) int16 stereo buffer of scale * sin(step * i)."""
+    wave = np.arange(n, dtype=np.float32)
+    wave *= np.float32(step)
+    np.sin(wave, out=wave)
+    wave *= np.float32(scale)
+    
+    stereo = np.empty((n, 2), dtype=np.int16)
+    stereo[:, 0] = wave
+    stereo[:, 1] = stereo[:, 0]
+    return stereo
+
+
+def _synth_tone_recurrence(n: int, step: float, scale: float) -> np.ndarray:
+    """
+    Return an (n, 2) int16 stereo buffer of scale * sin(step * i).
+    
+    Uses the oscillator recurrence sin(x + w) = 2 cos(w) sin(x) - sin(x - w),
+    so each sample costs one multiply-add instead of a sine evaluation, and
+    writes both channels in the same pass.
+    """
+    out = np.empty((n, 2), dtype=np.int16)
+    c = 2.0 * math.cos(step)
+    previous = -math.sin(step)  # sin(-w)
+    current = 0.0  # sin(0)
+    for i in range(n):
+        sample = np.int16(scale * current)
+        out[i, 0] = sample
+        out[i, 1] = sample
+        previous, current = current, c * current - previous
+    return out
+
+
+if NUMBA_AVAILABLE:
+    synth_tone = njit(cache=True)(_synth_tone_recurrence)
+else:
+    # The recurrence is only worth it compiled; a Python loop is far slower than np.sin
+    synth_tone = _synth_tone_numpy
+
+
+def warm_up():
+    """Compile the kernel so the first alert does not pay for it."""
+    if NUMBA_AVAILABLE:
+        synth_tone(1, 0.1, 1.0)
@@ -4,8 +4,8 @@ Email notification service for pet activity alerts - FIXED VERSION.
 """
 import smtplib
 import time
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import queue
+from email.message import EmailMessage
 from typing import Dict, Optional
 import threading
 from dataclasses import dataclass
@@ -35,7 +35,18 @@ class EmailConfig:
 
 
 class EmailNotificationService:
-    """Handles email notifications for pet activity alerts."""
+    """
+    Handles email notifications for pet activity alerts.
+    
+    Alerts are queued and sent by a single worker thread over one SMTP
+    connection that is kept open between alerts, so a burst of alerts pays
+    for the TLS handshake and login only once.
+    """
+    
+    KEEPALIVE_INTERVAL = 60  # seconds between NOOPs on an idle connection
+    MAX_SEND_ATTEMPTS = 3
+    RECONNECT_DELAY = 1.0  # initial backoff, doubled after each failed attempt
+    MAX_QUEUED_ALERTS = 50  # alerts beyond this are dropped until the queue drains
     
     def __init__(self, config: Optional[EmailConfig] = None):
         self.config = config
@@ -43,8 +54,19 @@ class EmailNotificationService:
         self.last_alert_times: Dict[str, float] = {}
         self.cooldown_period = 300  # 5 minutes default cooldown
         
+        # Persistent SMTP connection, only touched while holding the lock
+        self._server: Optional[smtplib.SMTP] = None
+        self._server_lock = threading.Lock()
+        
+        # Bounded alert queue drained by the worker thread
+        self._queue = queue.Queue(maxsize=self.MAX_QUEUED_ALERTS)
+        self._worker = threading.Thread(target=self._drain, name="email", daemon=True)
+        self._worker.start()
+        
     def configure(self, config: EmailConfig):
         """Configure email settings."""
+        # Settings may have changed, reconnect on the next alert
+        self._close_connection()
         self.config = config
         self.enabled = config.enabled
         if hasattr(config, 'cooldown_period'):
@@ -66,7 +88,7 @@ class EmailNotificationService:
             bypass_cooldown: Whether to bypass cooldown period
             
         Returns:
-            True if email was sent successfully, False otherwise
+            True if the email was queued for sending, False otherwise
         """
         if not self.enabled or not self.config:
             return False
@@ -75,13 +97,12 @@ class EmailNotificationService:
         if not bypass_cooldown and self._is_in_cooldown(alert_type):
             return False
         
-        # Send email in background thread
-        thread = threading.Thread(
-            target=self._send_email_async,
-            args=(subject, message, alert_type),
-            daemon=True
-        )
-        thread.start()
+        # Hand the email to the worker thread without blocking the caller
+        try:
+            self._queue.put_nowait((subject, message, alert_type))
+        except queue.Full:
+            print(f"⚠ Email queue full, dropping alert: {subject}")
+            return False
         
         return True
     
@@ -91,26 +112,95 @@ class EmailNotificationService:
         last_time = self.last_alert_times.get(alert_type, 0)
         return (current_time - last_time) < self.cooldown_period
     
+    def _drain(self):
+        """Worker loop sending queued alerts until shutdown() is called."""
+        while True:
+            try:
+                item = self._queue.get(timeout=self.KEEPALIVE_INTERVAL)
+            except queue.Empty:
+                self._keepalive()
+                continue
+            
+            try:
+                if item is None:
+                    break
+                self._send_email_async(*item)
+            finally:
+                self._queue.task_done()
+        
+        self._close_connection()
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Return the open SMTP connection, logging in if needed. Caller holds the lock."""
+        if self._server is None:
+            server = smtplib.SMTP(self.config.smtp_server, self.config.smtp_port)
+            try:
+                server.starttls()
+                server.login(self.config.sender_email, self.config.sender_password)
+            except Exception:
+                server.close()
+                raise
+            self._server = server
+        return self._server
+    
+    def _close_connection(self):
+        """Close the persistent SMTP connection if one is open."""
+        with self._server_lock:
+            server, self._server = self._server, None
+        
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+    
+    def _keepalive(self):
+        """Send a NOOP on the idle connection, dropping it if the server has gone away."""
+        with self._server_lock:
+            if self._server is None:
+                return
+            try:
+                self._server.noop()
+                return
+            except (smtplib.SMTPException, OSError):
+                pass
+        self._close_connection()
+    
+    def _deliver(self, msg: EmailMessage):
+        """Send a message over the persistent connection, reconnecting with backoff."""
+        delay = self.RECONNECT_DELAY
+        for attempt in range(self.MAX_SEND_ATTEMPTS):
+            try:
+                with self._server_lock:
+                    self._connect().send_message(msg)
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._close_connection()
+                if attempt == self.MAX_SEND_ATTEMPTS - 1:
+                    raise
+                time.sleep(delay)
+                delay *= 2
+            except Exception:
+                # Start from a fresh connection on the next alert
+                self._close_connection()
+                raise
+    
     def _send_email_async(self, subject: str, message: str, alert_type: str):
-        """Send email asynchronously."""
+        """Send a queued email from the worker thread."""
         try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.config.sender_email
-            msg['To'] = self.config.recipient_email
-            msg['Subject'] = subject
-            
             # Add timestamp to message
             timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
             full_message = f"Alert Time: {timestamp}\n\n{message}"
             
-            msg.attach(MIMEText(full_message, 'plain'))
+            # Create plain-text message
+            msg = EmailMessage()
+            msg['From'] = self.config.sender_email
+            msg['To'] = self.config.recipient_email
+            msg['Subject'] = subject
+            msg.set_content(full_message)
             
-            # Send email with detailed error handling
-            with smtplib.SMTP(self.config.smtp_server, self.config.smtp_port) as server:
-                server.starttls()
-                server.login(self.config.sender_email, self.config.sender_password)
-                server.send_message(msg)
+            # Send over the persistent connection
+            self._deliver(msg)
             
             # Update last alert time
             self.last_alert_times[alert_type] = time.time()
@@ -155,16 +245,15 @@ class EmailNotificationService:
             return False, "Email service not configured or disabled"
         
         try:
-            # Create test message
-            msg = MIMEMultipart()
-            msg['From'] = self.config.sender_email
-            msg['To'] = self.config.recipient_email
-            msg['Subject'] = "Pet Activity Tracker - Test Email"
-            
             timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
             test_message = f"Test Time: {timestamp}\n\nThis is a test email from the Pet Activity Tracker. If you receive this, email notifications are working correctly!"
             
-            msg.attach(MIMEText(test_message, 'plain'))
+            # Create plain-text test message
+            msg = EmailMessage()
+            msg['From'] = self.config.sender_email
+            msg['To'] = self.config.recipient_email
+            msg['Subject'] = "Pet Activity Tracker - Test Email"
+            msg.set_content(test_message)
             
             # Send email with detailed error handling and timeout
             with smtplib.SMTP(self.config.smtp_server, self.config.smtp_port, timeout=10) as server:
@@ -247,4 +336,18 @@ class EmailNotificationService:
     def enable(self):
         """Enable email notifications (if configured)."""
         if self.config:
-            self.enabled = True
\ No newline at end of file
+            self.enabled = True
+    
+    def shutdown(self, wait: bool = True, timeout: float = 10.0):
+        """
+        Stop the worker after it sends any queued alerts, then close the connection.
+        
+        Args:
+            wait: Whether to block until the worker has finished
+            timeout: Maximum seconds to wait for the worker
+        """
+        if not self._worker.is_alive():
+            return
+        self._queue.put(None)
+        if wait:
+            self._worker.join(timeout)
\ No newline at end of file
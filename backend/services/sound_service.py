@@ -6,25 +6,54 @@ import time
 import platform
 import threading
 import numpy as np
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+from . import _sound_jit
 
 
 class SoundAlertService:
-    """Handles sound notifications for pet activity alerts."""
+    """
+    Handles sound notifications for pet activity alerts.
+    
+    Tones are streamed through a sounddevice (PortAudio) output callback when
+    sounddevice is installed, generating small blocks on demand. Otherwise
+    they are rendered into pygame Sound buffers.
+    """
+    
+    SAMPLE_RATE = 44100
+    BLOCK_SIZE = 512
     
     def __init__(self):
         self.initialized = False
         self.sound_available = False
         self.pygame = None
+        
+        # Callback stream and the tones it is playing, as
+        # [phase, phase_step, samples_remaining, amplitude] lists
+        self._stream = None
+        self._active_tones = []
+        self._tones_lock = threading.Lock()
+        self._block_index = np.arange(self.BLOCK_SIZE, dtype=np.float32)
+        self._mix = np.empty(self.BLOCK_SIZE, dtype=np.float32)
+        self._wave = np.empty(self.BLOCK_SIZE, dtype=np.float32)
         self.enabled = True
         self.last_alert_time = 0
         self.alert_cooldown = 2.0  # seconds
         
+        # Generated tones keyed by (duration, frequency); alerts reuse a small fixed set
+        self._tone_cache: Dict[Tuple[float, int], object] = {}
+    
     def initialize(self) -> bool:
         """Initialize the sound system."""
         if self.initialized:
             return self.sound_available
         
+        if self._open_stream():
+            self.initialized = True
+            self.sound_available = True
+            print("✓ Sound system initialized successfully (sounddevice)")
+            return True
+        
         try:
             # Import pygame
             import pygame
@@ -40,17 +69,20 @@ class SoundAlertService:
             
             # Initialize mixer
             self.pygame.mixer.pre_init(
-                frequency=44100, 
+                frequency=self.SAMPLE_RATE, 
                 size=-16, 
                 channels=2, 
                 buffer=512
             )
             self.pygame.mixer.init()
             
+            # Compile tone synthesis now rather than on the first alert
+            _sound_jit.warm_up()
+            
             self.initialized = True
             self.sound_available = True
             print("✓ Sound system initialized successfully")
-            
+        
         except Exception as e:
             print(f"⚠ Sound system initialization failed: {e}")
             self.initialized = True
@@ -58,6 +90,69 @@ class SoundAlertService:
         
         return self.sound_available
     
+    def _open_stream(self) -> bool:
+        """Open a sounddevice output stream fed by _audio_callback, if possible."""
+        try:
+            import sounddevice
+            self._stream = sounddevice.OutputStream(
+                samplerate=self.SAMPLE_RATE,
+                channels=2,
+                dtype='int16',
+                blocksize=self.BLOCK_SIZE,
+                callback=self._audio_callback
+            )
+            self._stream.start()
+            return True
+        except Exception:
+            # sounddevice or PortAudio missing, or no output device; use pygame
+            self._stream = None
+            return False
+    
+    def _audio_callback(self, outdata: np.ndarray, frames: int, time_info, status):
+        """Fill one output block by summing the active tones."""
+        if frames != len(self._block_index):
+            self._block_index = np.arange(frames, dtype=np.float32)
+            self._mix = np.empty(frames, dtype=np.float32)
+            self._wave = np.empty(frames, dtype=np.float32)
+        mix = self._mix
+        mix.fill(0)
+        
+        # Synthesize in float32, already scaled to the int16 range; the phase
+        # stays wrapped to [0, 2*pi) so float32 keeps enough precision
+        with self._tones_lock:
+            for tone in self._active_tones:
+                phase, step, remaining, amplitude = tone
+                count = min(frames, remaining)
+                wave = self._wave[:count]
+                np.multiply(self._block_index[:count], np.float32(step), out=wave)
+                wave += np.float32(phase)
+                np.sin(wave, out=wave)
+                wave *= np.float32(amplitude * 32767)
+                mix[:count] += wave
+                tone[0] = (phase + step * count) % (2 * np.pi)
+                tone[2] = remaining - count
+            self._active_tones = [tone for tone in self._active_tones if tone[2] > 0]
+        
+        np.clip(mix, -32768, 32767, out=mix)
+        outdata[:, 0] = mix
+        outdata[:, 1] = outdata[:, 0]
+    
+    def _start_tone(self, duration: float, frequency: int, amplitude: float = 0.5):
+        """Add a tone to the stream; playback starts with the next block."""
+        step = 2 * np.pi * frequency / self.SAMPLE_RATE
+        with self._tones_lock:
+            self._active_tones.append([0.0, step, int(self.SAMPLE_RATE * duration), amplitude])
+    
+    def stop_alerts(self):
+        """Stop any tones currently playing."""
+        with self._tones_lock:
+            self._active_tones = []
+        if self.pygame and self.initialized and self._stream is None:
+            try:
+                self.pygame.mixer.stop()
+            except Exception:
+                pass
+    
     def play_alert(self, duration: float = 2.0, frequency: int = 440) -> bool:
         """
         Play an alert sound.
@@ -65,7 +160,7 @@ class SoundAlertService:
         Args:
             duration: Duration of the alert in seconds
             frequency: Frequency of the tone in Hz
-            
+        
         Returns:
             True if sound was played successfully
         """
@@ -88,40 +183,87 @@ class SoundAlertService:
             self._system_bell()
             return False
         
-        # Play sound in background thread
-        thread = threading.Thread(
-            target=self._play_tone,
-            args=(duration, frequency),
-            daemon=True
-        )
-        thread.start()
+        # The stream mixes tones itself, so starting one never blocks
+        if self._stream is not None:
+            self._start_tone(duration, frequency)
+            return True
+        
+        # pygame plays asynchronously, and the tone cache keeps the Sound alive
+        # while it plays, so nothing has to wait for it to finish
+        try:
+            self._get_tone(duration, frequency).play()
+        except Exception as e:
+            print(f"Error playing tone: {e}")
+            self._system_bell()
+            return False
         
         return True
     
+    def _get_tone(self, duration: float, frequency: int):
+        """Get the pygame Sound for a tone, generating it on first use."""
+        key = (round(duration, 3), frequency)
+        sound = self._tone_cache.get(key)
+        if sound is None:
+            sound = self._make_sound(self._synthesize_tone(duration, frequency))
+            self._tone_cache[key] = sound
+        return sound
+    
+    def _make_sound(self, stereo: np.ndarray):
+        """Wrap an (N, 2) int16 buffer in a pygame Sound."""
+        # When the mixer runs in the format we asked for, hand the samples over
+        # directly; otherwise let sndarray negotiate the conversion
+        if self.pygame.mixer.get_init() == (self.SAMPLE_RATE, -16, 2):
+            return self.pygame.mixer.Sound(buffer=np.ascontiguousarray(stereo))
+        return self.pygame.sndarray.make_sound(stereo)
+    
+    @staticmethod
+    def _synthesize_tone(duration: float, frequency: int,
+                         sample_rate: int = 44100, amplitude: float = 0.5) -> np.ndarray:
+        """Generate a sine tone as an (N, 2) int16 stereo buffer."""
+        return _sound_jit.synth_tone(
+            int(sample_rate * duration),
+            2 * np.pi * frequency / sample_rate,
+            amplitude * 32767
+        )
+    
     def _play_tone(self, duration: float, frequency: int):
-        """Play a tone using pygame."""
+        """Play a tone and wait for it to finish."""
         try:
-            # Generate tone
-            sample_rate = 44100
-            amplitude = 0.5
-            
-            # Create waveform
-            t = np.linspace(0, duration, int(sample_rate * duration), False)
-            wave = amplitude * np.sin(frequency * 2 * np.pi * t)
-            
-            # Convert to 16-bit integers
-            wave_normalized = np.int16(wave * 32767)
-            
-            # Create stereo wave
-            stereo_wave = np.column_stack((wave_normalized, wave_normalized))
+            if self._stream is not None:
+                self._start_tone(duration, frequency)
+                time.sleep(duration)
+                return
             
             # Play sound
-            sound = self.pygame.sndarray.make_sound(stereo_wave)
-            sound.play()
+            self._get_tone(duration, frequency).play()
             
             # Wait for completion
             time.sleep(duration)
+        
+        except Exception as e:
+            print(f"Error playing tone: {e}")
+            self._system_bell()
+    
+    def _play_sequence(self, frequencies, tone_duration: float = 0.2, gap: float = 0.1):
+        """Play short tones one after another, separated by gaps, and wait for them to finish."""
+        try:
+            if self._stream is not None:
+                for freq in frequencies:
+                    self._start_tone(tone_duration, freq)
+                    time.sleep(tone_duration + gap)
+                return
+            
+            # Render the whole sequence into one buffer so timing follows the samples
+            silence = np.zeros((int(self.SAMPLE_RATE * gap), 2), dtype=np.int16)
+            parts = []
+            for freq in frequencies:
+                parts.append(self._synthesize_tone(tone_duration, freq))
+                parts.append(silence)
+            buffer = np.concatenate(parts)
             
+            self._make_sound(buffer).play()
+            time.sleep(len(buffer) / self.SAMPLE_RATE)
+        
         except Exception as e:
             print(f"Error playing tone: {e}")
             self._system_bell()
@@ -183,16 +325,27 @@ class SoundAlertService:
             'enabled': self.enabled,
             'platform': platform.system(),
             'cooldown': self.alert_cooldown,
-            'pygame_available': self.pygame is not None
+            'pygame_available': self.pygame is not None,
+            'streaming': self._stream is not None
         }
     
     def shutdown(self):
         """Shutdown the sound system."""
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+            self._active_tones = []
         if self.pygame and self.initialized:
             try:
                 self.pygame.mixer.quit()
             except Exception:
                 pass
+        # Cached sounds belong to the closed mixer
+        self._tone_cache.clear()
         self.initialized = False
         self.sound_available = False
     
@@ -200,25 +353,15 @@ class SoundAlertService:
         """Play startup notification."""
         if self.initialize():
             # Play ascending tones
-            def startup_sequence():
-                frequencies = [440, 523, 659, 784]  # A, C, E, G
-                for freq in frequencies:
-                    self._play_tone(0.2, freq)
-                    time.sleep(0.1)
-            
-            thread = threading.Thread(target=startup_sequence, daemon=True)
+            frequencies = [440, 523, 659, 784]  # A, C, E, G
+            thread = threading.Thread(target=self._play_sequence, args=(frequencies,), daemon=True)
             thread.start()
     
     def play_shutdown_sound(self):
         """Play shutdown notification."""
         if self.sound_available:
             # Play descending tones
-            def shutdown_sequence():
-                frequencies = [784, 659, 523, 440]  # G, E, C, A
-                for freq in frequencies:
-                    self._play_tone(0.2, freq)
-                    time.sleep(0.1)
-            
-            thread = threading.Thread(target=shutdown_sequence, daemon=True)
+            frequencies = [784, 659, 523, 440]  # G, E, C, A
+            thread = threading.Thread(target=self._play_sequence, args=(frequencies,), daemon=True)
             thread.start()
             time.sleep(1)  # Wait for completion before shutdown
\ No newline at end of file
@@ -3,22 +3,47 @@ backend/utils/io_utils.py
 Input/Output utilities for configuration and data management.
 """
 import cv2
+import csv
 import json
 import pickle
 import os
 import datetime
+import importlib.util
 from typing import Dict, List, Any, Optional
-import pandas as pd
 
 from ..data.models import Zone, BowlLocation, AppConfig, PerformanceSettings
 from ..data.statistics import ActivityStatistics
 
-# Check if pandas is available
+# Check if pandas is available without importing it; the CSV exporters
+# import it on first use so other reports don't pay its startup cost
+PANDAS_AVAILABLE = importlib.util.find_spec('pandas') is not None
+
+# orjson is optional; fall back to the standard json module without it
 try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    PANDAS_AVAILABLE = False
+    ORJSON_AVAILABLE = False
+
+# Reports and exports can run to megabytes; write them in large chunks
+_WRITE_BUFFER = 1 << 20
+
+
+def _dump_json(data: Any, f):
+    """Write data as indented JSON to a file opened in binary mode."""
+    if ORJSON_AVAILABLE:
+        f.write(orjson.dumps(data, default=str,
+                             option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        f.write(json.dumps(data, indent=4, default=str).encode('utf-8'))
+
+
+def _load_json(f) -> Any:
+    """Read JSON from a file opened in binary mode."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(f.read())
+    return json.load(f)
+
 
 class ConfigurationManager:
     """Manages application configuration saving and loading."""
@@ -26,20 +51,26 @@ class ConfigurationManager:
     def __init__(self, default_config_path: str = "config/default_config.json"):
         self.default_config_path = default_config_path
         self.ensure_config_directory()
+        
+        # Parsed contents of the last loaded file, keyed by (path, mtime, size)
+        self._cache = None
+        self._cache_key = None
     
     def ensure_config_directory(self):
         """Ensure configuration directory exists."""
         config_dir = os.path.dirname(self.default_config_path)
-        if config_dir and not os.path.exists(config_dir):
-            os.makedirs(config_dir)
+        if config_dir:
+            os.makedirs(config_dir, exist_ok=True)
     
-    def save_config(self, config: AppConfig, file_path: Optional[str] = None) -> bool:
+    def save_config(self, config: AppConfig, file_path: Optional[str] = None,
+                    timestamp: Optional[datetime.datetime] = None) -> bool:
         """
         Save application configuration to JSON file.
         
         Args:
             config: AppConfig object to save
             file_path: Optional custom file path
+            timestamp: Optional creation time to record (defaults to now)
             
         Returns:
             True if saved successfully
@@ -48,10 +79,10 @@ class ConfigurationManager:
             file_path = self.default_config_path
         
         try:
-            config_dict = self._config_to_dict(config)
+            config_dict = self._config_to_dict(config, timestamp)
             
-            with open(file_path, 'w') as f:
-                json.dump(config_dict, f, indent=4, default=str)
+            with open(file_path, 'wb') as f:
+                _dump_json(config_dict, f)
             
             print(f"✓ Configuration saved to {file_path}")
             return True
@@ -78,8 +109,17 @@ class ConfigurationManager:
             return None
         
         try:
-            with open(file_path, 'r') as f:
-                config_dict = json.load(f)
+            # Reparse only when the file has changed since the last load. The
+            # AppConfig is still rebuilt each time, since callers modify it.
+            stat = os.stat(file_path)
+            key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+            if key == self._cache_key:
+                config_dict = self._cache
+            else:
+                with open(file_path, 'rb') as f:
+                    config_dict = _load_json(f)
+                self._cache = config_dict
+                self._cache_key = key
             
             config = self._dict_to_config(config_dict)
             print(f"✓ Configuration loaded from {file_path}")
@@ -89,8 +129,11 @@ class ConfigurationManager:
             print(f"✗ Failed to load configuration: {e}")
             return None
     
-    def _config_to_dict(self, config: AppConfig) -> Dict:
+    def _config_to_dict(self, config: AppConfig,
+                        timestamp: Optional[datetime.datetime] = None) -> Dict:
         """Convert AppConfig to dictionary."""
+        if timestamp is None:
+            timestamp = datetime.datetime.now()
         return {
             'zones': [
                 {
@@ -121,30 +164,34 @@ class ConfigurationManager:
             'email_config': config.email_config,
             'model_path': config.model_path,
             'version': '1.0',
-            'created_at': datetime.datetime.now().isoformat()
+            'created_at': timestamp.isoformat()
         }
     
     def _dict_to_config(self, config_dict: Dict) -> AppConfig:
         """Convert dictionary to AppConfig."""
-        # Load zones
+        # Load zones; unpacking the fixed-length lists also checks their shape
         zones = []
         for zone_data in config_dict.get('zones', []):
+            x1, y1, x2, y2 = zone_data['coords']
+            r, g, b = zone_data['color']
             zone = Zone(
                 name=zone_data['name'],
-                coords=tuple(zone_data['coords']),
+                coords=(x1, y1, x2, y2),
                 zone_type=zone_data['zone_type'],
-                color=tuple(zone_data['color'])
+                color=(r, g, b)
             )
             zones.append(zone)
         
         # Load bowls
         bowls = {}
         for name, bowl_data in config_dict.get('bowls', {}).items():
+            x, y = bowl_data['position']
+            r, g, b = bowl_data.get('color', (255, 0, 0))
             bowl = BowlLocation(
                 name=bowl_data['name'],
-                position=tuple(bowl_data['position']),
+                position=(x, y),
                 radius=bowl_data.get('radius', 30),
-                color=tuple(bowl_data.get('color', (255, 0, 0)))
+                color=(r, g, b)
             )
             bowls[name] = bowl
         
@@ -194,7 +241,7 @@ class ReportGenerator:
             report_data = self.statistics.get_summary_report()
             timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            with open(file_path, 'w') as f:
+            with open(file_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER) as f:
                 f.write("Pet Activity Tracker - Comprehensive Report\n")
                 f.write("=" * 50 + "\n")
                 f.write(f"Generated: {timestamp}\n\n")
@@ -232,18 +279,22 @@ class ReportGenerator:
             print(f"Failed to generate text report: {e}")
             return False
     
-    def generate_json_report(self, file_path: str) -> bool:
-        """Generate a JSON report with all data."""
+    def generate_json_report(self, file_path: str,
+                             timestamp: Optional[datetime.datetime] = None) -> bool:
+        """Generate a JSON report with all data, stamped with timestamp (defaults to now)."""
+        if timestamp is None:
+            timestamp = datetime.datetime.now()
+        
         try:
             report_data = self.statistics.export_to_dict()
             report_data['metadata'] = {
-                'generated_at': datetime.datetime.now().isoformat(),
+                'generated_at': timestamp.isoformat(),
                 'report_type': 'comprehensive_json',
                 'version': '1.0'
             }
             
-            with open(file_path, 'w') as f:
-                json.dump(report_data, f, indent=4, default=str)
+            with open(file_path, 'wb') as f:
+                _dump_json(report_data, f)
             
             return True
             
@@ -264,48 +315,39 @@ class ReportGenerator:
             
             report_data = self.statistics.get_summary_report()
             
-            # Create DataFrame with various statistics
-            data = []
-            
-            # Add summary stats
+            # Build each section column-wise and stack them
             summary = report_data['summary']
-            for key, value in summary.items():
-                data.append({
-                    'Category': 'Summary',
-                    'Metric': key.replace('_', ' ').title(),
-                    'Value': value,
-                    'Unit': 'count' if 'count' in key or key.endswith('s') else 'other'
-                })
-            
-            # Add zone statistics
-            for zone_stat in report_data['zone_statistics']:
-                data.append({
-                    'Category': 'Zone',
-                    'Metric': f"{zone_stat['name']} - Visits",
-                    'Value': zone_stat['visits'],
-                    'Unit': 'count'
-                })
-                data.append({
-                    'Category': 'Zone',
-                    'Metric': f"{zone_stat['name']} - Duration",
-                    'Value': zone_stat['total_seconds'],
-                    'Unit': 'seconds'
-                })
-            
-            # Add timeline data
-            timeline = report_data['activity_timeline']
-            for hour, count in timeline.items():
-                if count > 0:
-                    data.append({
-                        'Category': 'Timeline',
-                        'Metric': f"Hour {hour:02d}",
-                        'Value': count,
-                        'Unit': 'activities'
-                    })
+            summary_df = pd.DataFrame({
+                'Category': 'Summary',
+                'Metric': [key.replace('_', ' ').title() for key in summary],
+                'Value': list(summary.values()),
+                'Unit': ['count' if 'count' in key or key.endswith('s') else 'other'
+                         for key in summary]
+            })
+            
+            # Each zone contributes a visits row followed by a duration row
+            zone_stats = report_data['zone_statistics']
+            zone_df = pd.DataFrame({
+                'Category': 'Zone',
+                'Metric': [f"{zone_stat['name']} - {label}"
+                           for zone_stat in zone_stats for label in ('Visits', 'Duration')],
+                'Value': [value for zone_stat in zone_stats
+                          for value in (zone_stat['visits'], zone_stat['total_seconds'])],
+                'Unit': ['count', 'seconds'] * len(zone_stats)
+            }, columns=['Category', 'Metric', 'Value', 'Unit'])
+            
+            timeline = {hour: count for hour, count in report_data['activity_timeline'].items() if count > 0}
+            timeline_df = pd.DataFrame({
+                'Category': 'Timeline',
+                'Metric': [f"Hour {hour:02d}" for hour in timeline],
+                'Value': list(timeline.values()),
+                'Unit': 'activities'
+            }, columns=['Category', 'Metric', 'Value', 'Unit'])
             
             # Create and save DataFrame
-            df = pd.DataFrame(data)
-            df.to_csv(file_path, index=False)
+            df = pd.concat([summary_df, zone_df, timeline_df], ignore_index=True)
+            with open(file_path, 'w', newline='', encoding='utf-8', buffering=_WRITE_BUFFER) as f:
+                df.to_csv(f, index=False)
             
             return True
             
@@ -319,117 +361,119 @@ class ReportGenerator:
             report_data = self.statistics.get_summary_report()
             timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Pet Activity Report</title>
-                <style>
-                    body {{ font-family: Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }}
-                    .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                    h1, h2 {{ color: #333; border-bottom: 2px solid #4CAF50; padding-bottom: 10px; }}
-                    .summary {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 20px; margin: 20px 0; }}
-                    .stat-card {{ background: #f8f9fa; padding: 15px; border-radius: 8px; border-left: 4px solid #4CAF50; }}
-                    .stat-value {{ font-size: 2em; font-weight: bold; color: #2196F3; }}
-                    .stat-label {{ color: #666; margin-top: 5px; }}
-                    table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
-                    th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-                    th {{ background-color: #4CAF50; color: white; }}
-                    tr:nth-child(even) {{ background-color: #f2f2f2; }}
-                    .alert {{ color: #d32f2f; font-weight: bold; }}
-                    .timeline {{ margin: 20px 0; }}
-                    .activity-log {{ background: #f8f9fa; padding: 15px; border-radius: 8px; max-height: 300px; overflow-y: auto; }}
-                    .activity-item {{ margin: 5px 0; padding: 5px; border-left: 3px solid #2196F3; padding-left: 10px; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <h1>🐾 Pet Activity Report</h1>
-                    <p><strong>Generated:</strong> {timestamp}</p>
-                    
-                    <h2>Summary Statistics</h2>
-                    <div class="summary">
-            """
-            
-            # Add summary cards
-            summary = report_data['summary']
-            for key, value in summary.items():
-                if value is not None:
-                    label = key.replace('_', ' ').title()
-                    alert_class = ' alert' if 'violation' in key else ''
-                    html_content += f"""
-                        <div class="stat-card">
-                            <div class="stat-value{alert_class}">{value}</div>
-                            <div class="stat-label">{label}</div>
+            # Stream the report to the file section by section
+            with open(file_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER) as f:
+                w = f.write
+                
+                w(f"""
+                <!DOCTYPE html>
+                <html>
+                <head>
+                    <title>Pet Activity Report</title>
+                    <style>
+                        body {{ font-family: Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }}
+                        .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
+                        h1, h2 {{ color: #333; border-bottom: 2px solid #4CAF50; padding-bottom: 10px; }}
+                        .summary {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 20px; margin: 20px 0; }}
+                        .stat-card {{ background: #f8f9fa; padding: 15px; border-radius: 8px; border-left: 4px solid #4CAF50; }}
+                        .stat-value {{ font-size: 2em; font-weight: bold; color: #2196F3; }}
+                        .stat-label {{ color: #666; margin-top: 5px; }}
+                        table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
+                        th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
+                        th {{ background-color: #4CAF50; color: white; }}
+                        tr:nth-child(even) {{ background-color: #f2f2f2; }}
+                        .alert {{ color: #d32f2f; font-weight: bold; }}
+                        .timeline {{ margin: 20px 0; }}
+                        .activity-log {{ background: #f8f9fa; padding: 15px; border-radius: 8px; max-height: 300px; overflow-y: auto; }}
+                        .activity-item {{ margin: 5px 0; padding: 5px; border-left: 3px solid #2196F3; padding-left: 10px; }}
+                    </style>
+                </head>
+                <body>
+                    <div class="container">
+                        <h1>🐾 Pet Activity Report</h1>
+                        <p><strong>Generated:</strong> {timestamp}</p>
+                        
+                        <h2>Summary Statistics</h2>
+                        <div class="summary">
+                """)
+                
+                # Add summary cards
+                summary = report_data['summary']
+                for key, value in summary.items():
+                    if value is not None:
+                        label = key.replace('_', ' ').title()
+                        alert_class = ' alert' if 'violation' in key else ''
+                        w(f"""
+                            <div class="stat-card">
+                                <div class="stat-value{alert_class}">{value}</div>
+                                <div class="stat-label">{label}</div>
+                            </div>
+                        """)
+                
+                w("""
                         </div>
-                    """
-            
-            html_content += """
-                    </div>
-                    
-                    <h2>Zone Activity</h2>
-                    <table>
-                        <tr><th>Zone Name</th><th>Visits</th><th>Total Duration</th></tr>
-            """
-            
-            # Add zone statistics
-            for zone_stat in report_data['zone_statistics']:
-                html_content += f"""
-                    <tr>
-                        <td>{zone_stat['name']}</td>
-                        <td>{zone_stat['visits']}</td>
-                        <td>{zone_stat['duration']}</td>
-                    </tr>
-                """
-            
-            html_content += """
-                    </table>
-                    
-                    <h2>Activity Timeline</h2>
-                    <div class="timeline">
-            """
-            
-            # Add timeline
-            timeline = report_data['activity_timeline']
-            if timeline:
-                for hour in range(24):
-                    count = timeline.get(hour, 0)
-                    if count > 0:
-                        width = min(100, (count / max(timeline.values())) * 100)
-                        html_content += f"""
-                            <div style="margin: 5px 0;">
-                                <span style="display: inline-block; width: 60px;">{hour:02d}:00</span>
-                                <div style="display: inline-block; width: 200px; background: #e0e0e0; border-radius: 3px;">
-                                    <div style="width: {width}%; background: #4CAF50; height: 20px; border-radius: 3px; display: flex; align-items: center; padding-left: 5px; color: white; font-size: 12px;">
-                                        {count}
+                        
+                        <h2>Zone Activity</h2>
+                        <table>
+                            <tr><th>Zone Name</th><th>Visits</th><th>Total Duration</th></tr>
+                """)
+                
+                # Add zone statistics
+                for zone_stat in report_data['zone_statistics']:
+                    w(f"""
+                        <tr>
+                            <td>{zone_stat['name']}</td>
+                            <td>{zone_stat['visits']}</td>
+                            <td>{zone_stat['duration']}</td>
+                        </tr>
+                    """)
+                
+                w("""
+                        </table>
+                        
+                        <h2>Activity Timeline</h2>
+                        <div class="timeline">
+                """)
+                
+                # Add timeline
+                timeline = report_data['activity_timeline']
+                if timeline:
+                    peak = max(timeline.values())
+                    for hour in range(24):
+                        count = timeline.get(hour, 0)
+                        if count > 0:
+                            width = min(100, (count / peak) * 100)
+                            w(f"""
+                                <div style="margin: 5px 0;">
+                                    <span style="display: inline-block; width: 60px;">{hour:02d}:00</span>
+                                    <div style="display: inline-block; width: 200px; background: #e0e0e0; border-radius: 3px;">
+                                        <div style="width: {width}%; background: #4CAF50; height: 20px; border-radius: 3px; display: flex; align-items: center; padding-left: 5px; color: white; font-size: 12px;">
+                                            {count}
+                                        </div>
                                     </div>
                                 </div>
-                            </div>
-                        """
-            else:
-                html_content += "<p>No activity data available</p>"
-            
-            html_content += """
-                    </div>
-                    
-                    <h2>Recent Activities</h2>
-                    <div class="activity-log">
-            """
-            
-            # Add recent activities
-            for activity in report_data['recent_activities'][-20:]:  # Last 20
-                alert_class = 'style="border-left-color: #d32f2f; background: #ffebee;"' if 'ALERT' in activity else ''
-                html_content += f'<div class="activity-item" {alert_class}>{activity}</div>'
-            
-            html_content += """
+                            """)
+                else:
+                    w("<p>No activity data available</p>")
+                
+                w("""
+                        </div>
+                        
+                        <h2>Recent Activities</h2>
+                        <div class="activity-log">
+                """)
+                
+                # Add recent activities
+                for activity in report_data['recent_activities'][-20:]:  # Last 20
+                    alert_class = 'style="border-left-color: #d32f2f; background: #ffebee;"' if 'ALERT' in activity else ''
+                    w(f'<div class="activity-item" {alert_class}>{activity}</div>')
+                
+                w("""
+                        </div>
                     </div>
-                </div>
-            </body>
-            </html>
-            """
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+                </body>
+                </html>
+                """)
             
             return True
             
@@ -451,25 +495,24 @@ class DataExporter:
         try:
             import pandas as pd
             
-            # Convert statistics to DataFrame
-            stats_data = []
+            # Flatten statistics into columns; nested dicts give one row per entry
+            categories, metrics, values = [], [], []
             for key, value in statistics.stats.items():
+                if key == 'activity_timeline':
+                    # Stored as a 24-slot array; export the active hours as before
+                    value = statistics.get_activity_timeline()
                 if isinstance(value, dict):
-                    for sub_key, sub_value in value.items():
-                        stats_data.append({
-                            'category': key,
-                            'metric': sub_key,
-                            'value': sub_value
-                        })
+                    categories.extend([key] * len(value))
+                    metrics.extend(value.keys())
+                    values.extend(value.values())
                 else:
-                    stats_data.append({
-                        'category': 'general',
-                        'metric': key,
-                        'value': value
-                    })
-            
-            df = pd.DataFrame(stats_data)
-            df.to_csv(file_path, index=False)
+                    categories.append('general')
+                    metrics.append(key)
+                    values.append(value)
+            
+            df = pd.DataFrame({'category': categories, 'metric': metrics, 'value': values})
+            with open(file_path, 'w', newline='', encoding='utf-8', buffering=_WRITE_BUFFER) as f:
+                df.to_csv(f, index=False)
             return True
             
         except Exception as e:
@@ -480,27 +523,16 @@ class DataExporter:
     def export_activity_log_csv(statistics: ActivityStatistics, file_path: str) -> bool:
         """Export activity log to CSV."""
         try:
-            activities = list(statistics.activity_log)
-            
-            # Parse timestamp and message from each log entry
-            data = []
-            for activity in activities:
-                if ': ' in activity:
-                    timestamp_str, message = activity.split(': ', 1)
-                    data.append({
-                        'timestamp': timestamp_str,
-                        'message': message,
-                        'is_alert': 'ALERT' in message
-                    })
-                else:
-                    data.append({
-                        'timestamp': '',
-                        'message': activity,
-                        'is_alert': False
-                    })
-            
-            df = pd.DataFrame(data)
-            df.to_csv(file_path, index=False)
+            # Log entries are stored as (timestamp, message) tuples
+            with open(file_path, 'w', newline='', encoding='utf-8', buffering=_WRITE_BUFFER) as f:
+                writer = csv.writer(f)
+                writer.writerow(['timestamp', 'message', 'is_alert'])
+                for timestamp, message in statistics.activity_log:
+                    writer.writerow([
+                        timestamp.isoformat(' ', 'seconds') if timestamp else '',
+                        message,
+                        'ALERT' in message
+                    ])
             return True
             
         except Exception as e:
@@ -512,18 +544,20 @@ class DataExporter:
                                backup_dir: str) -> bool:
         """Create a complete backup of application data."""
         try:
+            # One timestamp for the directory name and every file in the bundle
+            now = datetime.datetime.now()
+            
             # Create backup directory
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = os.path.join(backup_dir, f"pet_tracker_backup_{timestamp}")
+            backup_path = os.path.join(backup_dir, f"pet_tracker_backup_{now:%Y%m%d_%H%M%S}")
             os.makedirs(backup_path, exist_ok=True)
             
             # Save configuration
             config_manager = ConfigurationManager()
-            config_manager.save_config(config, os.path.join(backup_path, "config.json"))
+            config_manager.save_config(config, os.path.join(backup_path, "config.json"), timestamp=now)
             
             # Save statistics
             report_generator = ReportGenerator(statistics)
-            report_generator.generate_json_report(os.path.join(backup_path, "statistics.json"))
+            report_generator.generate_json_report(os.path.join(backup_path, "statistics.json"), timestamp=now)
             
             # Export CSV data
             DataExporter.export_statistics_csv(statistics, os.path.join(backup_path, "stats.csv"))
@@ -531,12 +565,13 @@ class DataExporter:
             
             # Create backup info file
             backup_info = {
-                'created_at': datetime.datetime.now().isoformat(),
+                'created_at': now.isoformat(),
                 'version': '1.0',
                 'files': ['config.json', 'statistics.json', 'stats.csv', 'activities.csv']
             }
             
-            with open(os.path.join(backup_path, "backup_info.json"), 'w') as f:
+            with open(os.path.join(backup_path, "backup_info.json"), 'w',
+                      encoding='utf-8', buffering=_WRITE_BUFFER) as f:
                 json.dump(backup_info, f, indent=4)
             
             print(f"✓ Backup created at: {backup_path}")
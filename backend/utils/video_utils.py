@@ -4,23 +4,71 @@ Video processing utilities for the Pet Activity Tracker.
 """
 import cv2
 import numpy as np
-from typing import Tuple, Optional, Union
-import time
+from typing import Callable, List, Tuple, Optional, Union
 import threading
-import queue
+import time
+import platform
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+
+from . import _blur_jit
+
+# GPU (NVDEC) decoding is optional and needs torch/torchvision built with CUDA
+try:
+    import torch
+    from torchvision.io import VideoReader
+    NVDEC_AVAILABLE = True
+except ImportError:
+    NVDEC_AVAILABLE = False
+
+# CUDA frame processing needs an OpenCV build with the cuda module and a device
+try:
+    CUDA_AVAILABLE = cv2.cuda.getCudaEnabledDeviceCount() > 0
+except (AttributeError, cv2.error):
+    CUDA_AVAILABLE = False
+
+# Pause before retrying a camera read that failed
+CAMERA_RETRY_DELAY = 0.05
+
+# Kernel size from which the recursive blur beats cv2.GaussianBlur (measured on 1080p frames)
+IIR_BLUR_MIN_KERNEL = 61
 
 
 class VideoCapture:
-    """Enhanced video capture with threading and buffering."""
+    """
+    Enhanced video capture with threading and buffering.
+    
+    Threaded capture decodes into a ring of preallocated frame slots. The
+    capture thread is the only writer of _head and read() the only writer of
+    _tail, so the two sides hand frames over without a lock. The ring has one
+    slot more than buffer_size so the slot being decoded into is never the
+    one being copied out. When buffer_size frames are already waiting, a
+    camera's new frames are grabbed but not decoded, so they are skipped
+    cheaply; a file is not read further until read() frees a slot.
+    
+    Scales registered with register_scale() before start_capture() are
+    produced once per decoded frame, with INTER_AREA, into rings parallel to
+    the frame ring; read_scaled() returns the copy matching the last read().
+    """
     
     def __init__(self, source: Union[str, int], buffer_size: int = 10):
         self.source = source
         self.buffer_size = buffer_size
         self.cap = None
-        self.frame_queue = queue.Queue(maxsize=buffer_size)
         self.running = False
         self.capture_thread = None
         
+        # Frame ring: frames published (_head) and consumed (_tail) so far
+        self._slots = []
+        self._head = 0
+        self._tail = 0
+        self._frame_ready = threading.Event()
+        self._slot_free = threading.Event()
+        
+        # Downscaled rings, one per registered ratio
+        self._scales = []
+        self._scaled = {}
+        
         # Video properties
         self.width = 0
         self.height = 0
@@ -35,6 +83,10 @@ class VideoCapture:
             if not self.cap.isOpened():
                 return False
             
+            # Keep the driver from queueing stale camera frames
+            if isinstance(self.source, int):
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            
             # Get video properties
             self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -48,8 +100,29 @@ class VideoCapture:
             return False
     
     def start_capture(self):
-        """Start threaded frame capture."""
+        """Start threaded frame capture (does nothing if it is already running)."""
+        if self.running and self.capture_thread and self.capture_thread.is_alive():
+            return
+        
         if self.cap and self.cap.isOpened():
+            # Decode straight into reusable buffers once the frame size is known
+            if self.width > 0 and self.height > 0:
+                self._slots = [np.empty((self.height, self.width, 3), dtype=np.uint8)
+                               for _ in range(self.buffer_size + 1)]
+            else:
+                self._slots = [None] * (self.buffer_size + 1)
+            self._scaled = {}
+            for ratio in self._scales:
+                if self.width > 0 and self.height > 0:
+                    size = (int(self.height * ratio), int(self.width * ratio), 3)
+                    self._scaled[ratio] = [np.empty(size, dtype=np.uint8)
+                                           for _ in range(self.buffer_size + 1)]
+                else:
+                    self._scaled[ratio] = [None] * (self.buffer_size + 1)
+            self._head = 0
+            self._tail = 0
+            self._frame_ready.clear()
+            
             self.running = True
             self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
             self.capture_thread.start()
@@ -60,49 +133,119 @@ class VideoCapture:
         if self.capture_thread:
             self.capture_thread.join(timeout=1.0)
         
-        # Clear the queue
-        while not self.frame_queue.empty():
-            try:
-                self.frame_queue.get_nowait()
-            except queue.Empty:
-                break
+        # Drop buffered frames
+        self._slots = []
+        self._scaled = {}
+        self._head = 0
+        self._tail = 0
+    
+    def register_scale(self, ratio: float):
+        """Have the capture thread also produce frames scaled by ratio; call before start_capture()."""
+        if ratio not in self._scales:
+            self._scales.append(ratio)
     
     def _capture_loop(self):
-        """Threaded frame capture loop."""
+        """Threaded frame capture loop; the blocking read paces it."""
+        slots = self._slots
+        scaled = list(self._scaled.items())
+        count = len(slots)
+        live = isinstance(self.source, int)
         while self.running and self.cap and self.cap.isOpened():
-            ret, frame = self.cap.read()
+            if self._head - self._tail >= self.buffer_size:
+                if live:
+                    # Advance the camera without decoding; the frame
+                    # would only be dropped
+                    if not self.cap.grab():
+                        time.sleep(CAMERA_RETRY_DELAY)
+                else:
+                    # Files can wait for the reader; clearing first means a
+                    # set() cannot be missed
+                    self._slot_free.clear()
+                    if self._head - self._tail >= self.buffer_size:
+                        self._slot_free.wait(timeout=0.1)
+                continue
+            
+            index = self._head % count
+            slot = slots[index]
+            if slot is None:
+                ret, frame = self.cap.read()
+            else:
+                ret, frame = self.cap.read(slot)
             
             if not ret:
-                break
+                if not live:
+                    break  # End of file
+                
+                # Cameras drop frames now and then; keep trying until stopped
+                time.sleep(CAMERA_RETRY_DELAY)
+                continue
             
-            # Add frame to queue, removing old frames if full
-            if self.frame_queue.full():
-                try:
-                    self.frame_queue.get_nowait()
-                except queue.Empty:
-                    pass
+            # read() only fills the slot when the frame size matches; keep
+            # whatever it returned so the next pass reuses that buffer
+            slots[index] = frame
             
-            try:
-                self.frame_queue.put(frame, timeout=0.01)
-            except queue.Full:
-                pass
+            # Scale once here instead of once per consumer
+            if scaled:
+                height, width = frame.shape[:2]
+                for ratio, buffers in scaled:
+                    size = (int(width * ratio), int(height * ratio))
+                    buffers[index] = cv2.resize(frame, size, dst=buffers[index],
+                                                interpolation=cv2.INTER_AREA)
             
-            time.sleep(0.001)  # Small delay to prevent CPU overload
+            # Publish the frame
+            self._head += 1
+            self._frame_ready.set()
     
     def read(self) -> Tuple[bool, Optional[np.ndarray]]:
-        """Read the latest frame."""
+        """
+        Read the latest frame.
+        
+        In threaded mode this waits until a frame is ready, and only fails
+        once capture has been stopped or the stream has ended and every
+        buffered frame has been read.
+        """
         if not self.running:
             # Direct read for non-threaded mode
             if self.cap and self.cap.isOpened():
                 return self.cap.read()
             return False, None
         
-        # Get latest frame from queue
-        try:
-            frame = self.frame_queue.get(timeout=0.1)
-            return True, frame
-        except queue.Empty:
-            return False, None
+        slots = self._slots
+        count = len(slots)
+        # Wait for a frame; clearing first means a set() cannot be missed
+        while self._tail == self._head:
+            self._frame_ready.clear()
+            if self._tail != self._head:
+                break
+            if not self._frame_ready.wait(timeout=0.1):
+                if not self.running or not self.capture_thread.is_alive():
+                    # The thread may have published a last frame before exiting
+                    if self._tail != self._head:
+                        break
+                    return False, None
+        
+        # The capture thread stays under buffer_size frames ahead of _tail,
+        # so it never decodes into this slot while it is being copied
+        frame = slots[self._tail % count].copy()
+        self._tail += 1
+        self._slot_free.set()
+        return True, frame
+    
+    def read_scaled(self, ratio: float) -> Optional[np.ndarray]:
+        """
+        Return the last frame from read() scaled by a registered ratio.
+        
+        Returns None when capture is not threaded, the ratio was not
+        registered, or nothing has been read yet.
+        """
+        buffers = self._scaled.get(ratio)
+        if not self.running or buffers is None or self._tail == 0:
+            return None
+        
+        # read() has moved past this slot, but the capture thread cannot reach
+        # it again until the next read()
+        frame = buffers[(self._tail - 1) % len(buffers)]
+        return None if frame is None else frame.copy()
     
     def release(self):
         """Release the video capture."""
@@ -135,8 +278,121 @@ class VideoCapture:
         }
 
 
+class NvdecCapture(VideoCapture):
+    """
+    Video file capture decoded on the GPU with NVDEC.
+    
+    read() returns frames as HWC uint8 BGR CUDA tensors, which PetDetector
+    resizes and runs on-device, skipping CPU decode and the host-to-device
+    upload. Falls back to OpenCV decoding when NVDEC is unavailable or the
+    source is a camera.
+    """
+    
+    def __init__(self, source: Union[str, int], buffer_size: int = 10, device: str = "cuda"):
+        super().__init__(source, buffer_size)
+        self.device = device
+        self.reader = None
+        self.frame_index = 0
+    
+    def open(self) -> bool:
+        """Open the video source, preferring GPU decoding."""
+        if not NVDEC_AVAILABLE or not isinstance(self.source, str) or not torch.cuda.is_available():
+            print("⚠ NVDEC decoding unavailable, using OpenCV")
+            return super().open()
+        
+        try:
+            self.reader = VideoReader(self.source, "video", device=self.device)
+            metadata = self.reader.get_metadata()["video"]
+            self.fps = metadata["fps"][0]
+            self.total_frames = int(metadata["duration"][0] * self.fps)
+            
+            # Frame size is only known after decoding the first frame
+            first = self._to_bgr_hwc(next(self.reader)["data"])
+            self.height, self.width = first.shape[:2]
+            self.reader.seek(0)
+            self.frame_index = 0
+            
+            print(f"✓ NVDEC decoding enabled: {self.source}")
+            return True
+            
+        except Exception as e:
+            print(f"⚠ NVDEC decoding failed, using OpenCV: {e}")
+            self.reader = None
+            return super().open()
+    
+    def _to_bgr_hwc(self, frame: "torch.Tensor") -> "torch.Tensor":
+        """Convert a decoded RGB frame to the HWC BGR layout OpenCV produces."""
+        if frame.shape[0] == 3 and frame.shape[-1] != 3:
+            frame = frame.permute(1, 2, 0)
+        return frame.flip(-1)
+    
+    def read(self) -> Tuple[bool, Optional[Union[np.ndarray, "torch.Tensor"]]]:
+        """Read the next frame."""
+        if self.reader is None:
+            return super().read()
+        
+        try:
+            frame = next(self.reader)["data"]
+        except StopIteration:
+            return False, None
+        
+        self.frame_index += 1
+        return True, self._to_bgr_hwc(frame)
+    
+    def release(self):
+        """Release the video capture."""
+        self.reader = None
+        super().release()
+    
+    def get_position(self) -> int:
+        """Get current frame position."""
+        if self.reader is not None:
+            return self.frame_index
+        return super().get_position()
+    
+    def set_position(self, frame_number: int) -> bool:
+        """Set frame position."""
+        if self.reader is None:
+            return super().set_position(frame_number)
+        
+        self.reader.seek(frame_number / self.fps if self.fps else 0)
+        self.frame_index = frame_number
+        return True
+
+
+@lru_cache(maxsize=128)
+def _measure_text(text: str, font_scale: float) -> Tuple[int, int]:
+    """Measure overlay text; overlays redraw the same few strings every frame."""
+    return cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2)[0]
+
+
 class FrameProcessor:
-    """Processes video frames with various optimizations."""
+    """
+    Processes video frames with various optimizations.
+    
+    With use_gpu set, upload() wraps frames in cv2.UMat so the transforms
+    below run through OpenCV's OpenCL backend and the pixels stay on the
+    device between them; download() brings the result back as an ndarray.
+    crop_frame needs the frame's shape and only accepts ndarrays.
+    """
+    
+    use_gpu = False
+    
+    @staticmethod
+    def upload(frame: np.ndarray) -> Union[np.ndarray, "cv2.UMat"]:
+        """Move a frame to the OpenCL device when GPU processing is enabled and available."""
+        if FrameProcessor.use_gpu and cv2.ocl.haveOpenCL():
+            return cv2.UMat(frame)
+        return frame
+    
+    @staticmethod
+    def download(frame: Union[np.ndarray, "cv2.UMat"]) -> np.ndarray:
+        """Return a frame as an ndarray, copying it back from the device if needed."""
+        if isinstance(frame, cv2.UMat):
+            return frame.get()
+        if CUDA_AVAILABLE and isinstance(frame, cv2.cuda_GpuMat):
+            return frame.download()
+        return frame
     
     @staticmethod
     def resize_frame(frame: np.ndarray, scale: float) -> np.ndarray:
@@ -144,6 +400,10 @@ class FrameProcessor:
         if scale == 1.0:
             return frame
         
+        if isinstance(frame, cv2.UMat):
+            # UMat does not expose its shape; let OpenCV derive the size
+            return cv2.resize(frame, None, fx=scale, fy=scale)
+        
         height, width = frame.shape[:2]
         new_width = int(width * scale)
         new_height = int(height * scale)
@@ -160,19 +420,53 @@ class FrameProcessor:
         """Crop frame to specified region."""
         h, w = frame.shape[:2]
         
-        # Ensure coordinates are within bounds
-        x = max(0, min(x, w - 1))
-        y = max(0, min(y, h - 1))
-        width = min(width, w - x)
-        height = min(height, h - y)
+        # Ensure coordinates are within bounds (inline tests beat min/max calls)
+        x = 0 if x < 0 else (w - 1 if x >= w else x)
+        y = 0 if y < 0 else (h - 1 if y >= h else y)
+        if width > w - x:
+            width = w - x
+        if height > h - y:
+            height = h - y
         
         return frame[y:y+height, x:x+width]
     
+    @staticmethod
+    def crop_frames_batch(frame: np.ndarray, rects: np.ndarray) -> List[np.ndarray]:
+        """Crop many (x, y, width, height) regions at once, clamped like crop_frame."""
+        h, w = frame.shape[:2]
+        rects = np.asarray(rects, dtype=np.int64)
+        
+        xs = np.clip(rects[:, 0], 0, w - 1)
+        ys = np.clip(rects[:, 1], 0, h - 1)
+        x2s = xs + np.minimum(rects[:, 2], w - xs)
+        y2s = ys + np.minimum(rects[:, 3], h - ys)
+        
+        return [frame[y:y2, x:x2] for x, y, x2, y2 in zip(xs.tolist(), ys.tolist(),
+                                                         x2s.tolist(), y2s.tolist())]
+    
     @staticmethod
     def apply_gaussian_blur(frame: np.ndarray, kernel_size: int = 5) -> np.ndarray:
         """Apply Gaussian blur to reduce noise."""
+        # OpenCV's cost grows with the kernel; the recursive filter's does not
+        if (kernel_size >= IIR_BLUR_MIN_KERNEL and _blur_jit.NUMBA_AVAILABLE
+                and isinstance(frame, np.ndarray)):
+            # The sigma cv2.GaussianBlur derives from the kernel size
+            sigma = 0.3 * ((kernel_size - 1) * 0.5 - 1) + 0.8
+            return _blur_jit.gaussian_blur(frame, sigma)
         return cv2.GaussianBlur(frame, (kernel_size, kernel_size), 0)
     
+    @staticmethod
+    def apply_gaussian_blur_iir(frame: np.ndarray, sigma: float) -> np.ndarray:
+        """
+        Apply a recursive (Young-van Vliet) Gaussian blur.
+        
+        Costs the same for any sigma, which pays off for wide blurs. Falls
+        back to cv2.GaussianBlur when Numba is unavailable.
+        """
+        if not _blur_jit.NUMBA_AVAILABLE or not isinstance(frame, np.ndarray):
+            return cv2.GaussianBlur(frame, (0, 0), sigma)
+        return _blur_jit.gaussian_blur(frame, sigma)
+    
     @staticmethod
     def enhance_contrast(frame: np.ndarray, alpha: float = 1.5, beta: int = 0) -> np.ndarray:
         """Enhance frame contrast and brightness."""
@@ -183,14 +477,28 @@ class FrameProcessor:
         """Convert frame colorspace."""
         return cv2.cvtColor(frame, conversion)
     
+    @staticmethod
+    def enhance_contrast_gray(frame: np.ndarray, alpha: float = 1.5, beta: int = 0) -> np.ndarray:
+        """
+        Convert a BGR frame to grayscale with enhanced contrast.
+        
+        Converting first means the contrast pass touches one channel instead
+        of three. Saturation then applies to the gray value rather than to
+        each color channel, so very bright or dark pixels can differ from
+        enhance_contrast followed by convert_colorspace.
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.convertScaleAbs(gray, dst=gray, alpha=alpha, beta=beta)
+    
     @staticmethod
     def add_timestamp(frame: np.ndarray, timestamp: str, 
-                     position: Tuple[int, int] = (10, 30)) -> np.ndarray:
-        """Add timestamp overlay to frame."""
-        frame_copy = frame.copy()
+                     position: Tuple[int, int] = (10, 30),
+                     inplace: bool = False) -> np.ndarray:
+        """Add timestamp overlay to frame, drawing on it directly if inplace."""
+        frame_copy = frame if inplace else cv2.copyTo(frame, None)  # also copies UMat frames
         
         # Add background for better readability
-        text_size = cv2.getTextSize(timestamp, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
+        text_size = _measure_text(timestamp, 0.7)
         cv2.rectangle(frame_copy, 
                      (position[0] - 5, position[1] - text_size[1] - 5),
                      (position[0] + text_size[0] + 5, position[1] + 5),
@@ -207,13 +515,14 @@ class FrameProcessor:
                         position: Tuple[int, int],
                         font_scale: float = 0.7,
                         color: Tuple[int, int, int] = (255, 255, 255),
-                        background_color: Optional[Tuple[int, int, int]] = (0, 0, 0)) -> np.ndarray:
-        """Add text overlay with optional background."""
-        frame_copy = frame.copy()
+                        background_color: Optional[Tuple[int, int, int]] = (0, 0, 0),
+                        inplace: bool = False) -> np.ndarray:
+        """Add text overlay with optional background, drawing on the frame directly if inplace."""
+        frame_copy = frame if inplace else cv2.copyTo(frame, None)  # also copies UMat frames
         
         if background_color:
             # Add background
-            text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2)[0]
+            text_size = _measure_text(text, font_scale)
             cv2.rectangle(frame_copy,
                          (position[0] - 5, position[1] - text_size[1] - 5),
                          (position[0] + text_size[0] + 5, position[1] + 5),
@@ -224,16 +533,174 @@ class FrameProcessor:
                    cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, 2)
         
         return frame_copy
+    
+    @staticmethod
+    def make_overlay_drawer(text: str, position: Tuple[int, int],
+                            font_scale: float = 0.7,
+                            color: Tuple[int, int, int] = (255, 255, 255),
+                            background_color: Optional[Tuple[int, int, int]] = (0, 0, 0)):
+        """
+        Build a function that draws a fixed text overlay onto a frame in place.
+        
+        The background rectangle is measured once here rather than on every
+        frame, which suits labels that never change.
+        """
+        text_width, text_height = _measure_text(text, font_scale)
+        top_left = (position[0] - 5, position[1] - text_height - 5)
+        bottom_right = (position[0] + text_width + 5, position[1] + 5)
+        
+        def draw(frame: np.ndarray) -> np.ndarray:
+            if background_color:
+                cv2.rectangle(frame, top_left, bottom_right, background_color, -1)
+            cv2.putText(frame, text, position,
+                       cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, 2)
+            return frame
+        
+        return draw
+
+
+@dataclass(frozen=True)
+class FrameOps:
+    """
+    FrameProcessor operations with their parameters fixed for a whole stream.
+    
+    Target size, blur implementation and overlay colors are resolved once
+    when the object is built, so per-frame calls skip the shape arithmetic
+    and dispatch that the FrameProcessor static methods repeat each time.
+    """
+    frame_size: Tuple[int, int]  # (width, height) of incoming frames
+    scale: float = 1.0
+    kernel: int = 5
+    font_scale: float = 0.7
+    bg_color: Optional[Tuple[int, int, int]] = (0, 0, 0)
+    fg_color: Tuple[int, int, int] = (255, 255, 255)
+    output_size: Tuple[int, int] = field(init=False)
+    _resize: Optional[Callable] = field(init=False, repr=False, compare=False)
+    _blur: Callable = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        width, height = self.frame_size
+        output_size = (int(width * self.scale), int(height * self.scale))
+        object.__setattr__(self, 'output_size', output_size)
+        
+        if self.scale == 1.0:
+            resize = None
+        else:
+            resize = partial(cv2.resize, dsize=output_size)
+        object.__setattr__(self, '_resize', resize)
+        
+        if self.kernel >= IIR_BLUR_MIN_KERNEL and _blur_jit.NUMBA_AVAILABLE:
+            sigma = 0.3 * ((self.kernel - 1) * 0.5 - 1) + 0.8
+            blur = partial(_blur_jit.gaussian_blur, sigma=sigma)
+        else:
+            blur = partial(cv2.GaussianBlur, ksize=(self.kernel, self.kernel), sigmaX=0)
+        object.__setattr__(self, '_blur', blur)
+    
+    def resize(self, frame: np.ndarray) -> np.ndarray:
+        """Resize a frame of frame_size by scale."""
+        if self._resize is None:
+            return frame
+        return self._resize(frame)
+    
+    def blur(self, frame: np.ndarray) -> np.ndarray:
+        """Apply the Gaussian blur chosen for kernel."""
+        return self._blur(frame)
+    
+    def add_text(self, frame: np.ndarray, text: str, position: Tuple[int, int],
+                 inplace: bool = False) -> np.ndarray:
+        """Add text overlay in this object's font scale and colors."""
+        return FrameProcessor.add_overlay_text(frame, text, position, self.font_scale,
+                                               self.fg_color, self.bg_color, inplace)
+    
+    def make_overlay_drawer(self, text: str, position: Tuple[int, int]):
+        """Build an in-place drawer for a fixed label in this object's font scale and colors."""
+        return FrameProcessor.make_overlay_drawer(text, position, self.font_scale,
+                                                  self.fg_color, self.bg_color)
+
+
+class FrameProcessorCUDA:
+    """
+    FrameProcessor transforms on an NVIDIA GPU through OpenCV's cuda module.
+    
+    Frames are uploaded once as cv2.cuda_GpuMat, transformed on the device
+    and downloaded at the end. All work is queued on one cv2.cuda_Stream so
+    uploads, kernels and downloads run asynchronously to the caller; only
+    download() waits. Requires CUDA_AVAILABLE.
+    """
+    
+    def __init__(self):
+        if not CUDA_AVAILABLE:
+            raise RuntimeError("CUDA-enabled OpenCV is not available")
+        self.stream = cv2.cuda_Stream()
+        self._blur_filters = {}
+    
+    def upload(self, frame: np.ndarray) -> "cv2.cuda_GpuMat":
+        """Copy a frame to the device."""
+        gpu_frame = cv2.cuda_GpuMat()
+        gpu_frame.upload(frame, self.stream)
+        return gpu_frame
+    
+    def download(self, frame: "cv2.cuda_GpuMat") -> np.ndarray:
+        """Copy a frame back to the host, waiting for queued work to finish."""
+        host_frame = frame.download(self.stream)
+        self.stream.waitForCompletion()
+        return host_frame
+    
+    def resize_frame(self, frame: "cv2.cuda_GpuMat", scale: float) -> "cv2.cuda_GpuMat":
+        """Resize frame by scale factor."""
+        if scale == 1.0:
+            return frame
+        
+        width, height = frame.size()
+        return self.resize_to_dimensions(frame, int(width * scale), int(height * scale))
+    
+    def resize_to_dimensions(self, frame: "cv2.cuda_GpuMat", width: int, height: int) -> "cv2.cuda_GpuMat":
+        """Resize frame to specific dimensions."""
+        return cv2.cuda.resize(frame, (width, height), stream=self.stream)
+    
+    def apply_gaussian_blur(self, frame: "cv2.cuda_GpuMat", kernel_size: int = 5) -> "cv2.cuda_GpuMat":
+        """Apply Gaussian blur to reduce noise."""
+        # Filters are built per frame type and kernel size, then reused
+        key = (frame.type(), kernel_size)
+        blur = self._blur_filters.get(key)
+        if blur is None:
+            blur = cv2.cuda.createGaussianFilter(frame.type(), frame.type(),
+                                                 (kernel_size, kernel_size), 0)
+            self._blur_filters[key] = blur
+        return blur.apply(frame, stream=self.stream)
+    
+    def enhance_contrast(self, frame: "cv2.cuda_GpuMat", alpha: float = 1.5, beta: int = 0) -> "cv2.cuda_GpuMat":
+        """Enhance frame contrast and brightness, matching cv2.convertScaleAbs."""
+        scaled = frame.convertTo(cv2.CV_16S, alpha, beta, self.stream)
+        scaled = cv2.cuda.abs(scaled, stream=self.stream)
+        return scaled.convertTo(cv2.CV_8U, self.stream)
+    
+    def convert_colorspace(self, frame: "cv2.cuda_GpuMat", conversion: int) -> "cv2.cuda_GpuMat":
+        """Convert frame colorspace."""
+        return cv2.cuda.cvtColor(frame, conversion, stream=self.stream)
 
 
 class VideoWriter:
-    """Enhanced video writer for saving processed videos."""
+    """
+    Enhanced video writer for saving processed videos.
     
-    def __init__(self, output_path: str, fps: float, frame_size: Tuple[int, int]):
+    Frames of the wrong size are resized into a buffer reused across frames.
+    With strict_size set, the caller guarantees every frame already matches
+    frame_size and the size check is skipped.
+    
+    On Linux and Windows, open() first asks the FFmpeg backend for a
+    hardware H.264 encoder (VAAPI, NVENC or QuickSync, whichever is present)
+    and only falls back to the software codecs if none can be opened.
+    """
+    
+    def __init__(self, output_path: str, fps: float, frame_size: Tuple[int, int],
+                 strict_size: bool = False):
         self.output_path = output_path
         self.fps = fps
         self.frame_size = frame_size
+        self.strict_size = strict_size
         self.writer = None
+        self._resized = None
         
         # Video codec (try different codecs for compatibility)
         self.codecs = [
@@ -244,24 +711,58 @@ class VideoWriter:
     
     def open(self) -> bool:
         """Open video writer."""
+        if self._open_hw_encoder():
+            return True
+        
         for codec in self.codecs:
             try:
                 self.writer = cv2.VideoWriter(
                     self.output_path, codec, self.fps, self.frame_size
                 )
                 if self.writer.isOpened():
+                    width, height = self.frame_size
+                    self._resized = np.empty((height, width, 3), dtype=np.uint8)
                     return True
             except Exception:
                 continue
         
         return False
     
+    def _open_hw_encoder(self) -> bool:
+        """Try a hardware-accelerated H.264 writer through the FFmpeg backend."""
+        if platform.system() not in ('Linux', 'Windows'):
+            return False
+        
+        try:
+            params = [
+                cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+                cv2.VIDEOWRITER_PROP_HW_ACCELERATION_USE_OPENCL, 1,
+            ]
+            writer = cv2.VideoWriter(
+                self.output_path, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*'avc1'),
+                self.fps, self.frame_size, params
+            )
+        except (AttributeError, cv2.error):
+            # OpenCV older than 4.5.2 has no hardware acceleration properties
+            return False
+        
+        if not writer.isOpened():
+            return False
+        
+        self.writer = writer
+        width, height = self.frame_size
+        self._resized = np.empty((height, width, 3), dtype=np.uint8)
+        return True
+    
     def write_frame(self, frame: np.ndarray) -> bool:
         """Write a frame to the video."""
         if self.writer and self.writer.isOpened():
-            # Ensure frame is the correct size
-            if frame.shape[:2][::-1] != self.frame_size:
-                frame = cv2.resize(frame, self.frame_size)
+            # Frames processed on the device come back to the host only here
+            frame = FrameProcessor.download(frame)
+            
+            # Ensure frame is the correct size, resizing into the reused buffer
+            if not self.strict_size and frame.shape[:2][::-1] != tuple(self.frame_size):
+                frame = cv2.resize(frame, tuple(self.frame_size), dst=self._resized)
             
             self.writer.write(frame)
             return True
@@ -272,13 +773,18 @@ class VideoWriter:
         if self.writer:
             self.writer.release()
             self.writer = None
+        self._resized = None
 
 
+@lru_cache(maxsize=32)
 def calculate_display_scale(frame_size: Tuple[int, int], 
                           display_size: Tuple[int, int]) -> Tuple[float, int, int]:
     """
     Calculate optimal scale and offsets for displaying frame in given size.
     
+    Results are cached, since the frame and display sizes rarely change
+    between frames.
+    
     Args:
         frame_size: (width, height) of source frame
         display_size: (width, height) of display area
@@ -335,28 +841,59 @@ def convert_coordinates(x: float, y: float,
     return new_x, new_y
 
 
-def estimate_video_memory_usage(width: int, height: int, fps: float, 
-                               duration_seconds: float) -> dict:
+def convert_coordinates_batch(points: np.ndarray,
+                              from_size: Tuple[int, int],
+                              to_size: Tuple[int, int],
+                              offset: Tuple[int, int] = (0, 0)) -> np.ndarray:
+    """
+    Convert an (N, 2) array of (x, y) points between coordinate systems.
+    
+    Vectorized form of convert_coordinates for converting many points at once.
+    """
+    scale = np.array([to_size[0] / from_size[0], to_size[1] / from_size[1]])
+    return points * scale + np.asarray(offset)
+
+
+def estimate_video_memory_usage(width, height, fps, duration_seconds,
+                               codec_ratio: float = 1.0) -> dict:
     """
     Estimate memory usage for video processing.
     
+    Arguments may be scalars or arrays; arrays broadcast, so many candidate
+    resolutions and frame rates can be compared in one call. codec_ratio is
+    the encoded size relative to raw frames (about 0.02 for H.264); it
+    scales the on-disk size and the share of the video held in memory.
+    
     Returns:
-        Dictionary with memory estimates in MB
+        Dictionary with memory estimates in MB, as floats for scalar
+        arguments and arrays otherwise
     """
+    width = np.asarray(width, dtype=np.float64)
+    height = np.asarray(height, dtype=np.float64)
+    
     # Bytes per frame (3 channels, 8 bits each)
     bytes_per_frame = width * height * 3
     
     # Estimates
     single_frame_mb = bytes_per_frame / (1024 * 1024)
-    total_frames = fps * duration_seconds
-    total_video_mb = (bytes_per_frame * total_frames) / (1024 * 1024)
+    total_frames = np.asarray(fps, dtype=np.float64) * duration_seconds
+    total_video_mb = single_frame_mb * total_frames
+    disk_mb = total_video_mb * codec_ratio
     
     # Buffer estimates (assuming 30 frame buffer)
-    buffer_mb = (bytes_per_frame * 30) / (1024 * 1024)
+    buffer_mb = single_frame_mb * 30
+    
+    # 10% of the (encoded) video + buffer + overhead
+    recommended_ram_mb = disk_mb * 0.1 + buffer_mb + 100
+    
+    def _round(value):
+        value = np.round(value, 2)
+        return float(value) if value.ndim == 0 else value
     
     return {
-        'single_frame_mb': round(single_frame_mb, 2),
-        'total_video_mb': round(total_video_mb, 2),
-        'buffer_mb': round(buffer_mb, 2),
-        'recommended_ram_mb': round(total_video_mb * 0.1 + buffer_mb + 100, 2)  # 10% of video + buffer + overhead
-    }
\ No newline at end of file
+        'single_frame_mb': _round(single_frame_mb),
+        'total_video_mb': _round(total_video_mb),
+        'disk_mb': _round(disk_mb),
+        'buffer_mb': _round(buffer_mb),
+        'recommended_ram_mb': _round(recommended_ram_mb)
+    }
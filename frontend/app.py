@@ -6,10 +6,10 @@ import tkinter as tk
 from tkinter import messagebox, filedialog
 import threading
 import time
-import queue
-import gc
-import pandas as pd
+import logging
 import os
+from collections import deque
+import numpy as np
 
 # Backend imports
 from backend.core.detector import PetDetector
@@ -38,6 +38,38 @@ except ImportError:
     STYLING_AVAILABLE = False
     print("Warning: Modern styling not available")
 
+logger = logging.getLogger(__name__)
+
+# Activity log lines kept in the Text widget; older lines are dropped
+LOG_MAX_LINES = 2000
+
+
+class LatestFrameSlot:
+    """
+    Single-slot handoff from the processing thread to the Tk main thread.
+    
+    publish() overwrites whatever frame is waiting, so take() always gets
+    the newest one and stale frames never queue up. The overwritten frame
+    is returned so its buffer can be reused.
+    """
+    
+    def __init__(self):
+        self._frame = None
+        self._lock = threading.Lock()
+    
+    def publish(self, frame):
+        """Replace the waiting frame, returning the one it replaced (or None)."""
+        with self._lock:
+            replaced, self._frame = self._frame, frame
+        return replaced
+    
+    def take(self):
+        """Remove and return the waiting frame, or None if there is none."""
+        with self._lock:
+            frame, self._frame = self._frame, None
+        return frame
+
+
 class PetTrackerApplication:
     """Main application class that orchestrates all components."""
     
@@ -55,15 +87,39 @@ class PetTrackerApplication:
         self.running = False
         self.video_capture = None
         self.processing_thread = None
+        
+        # Incremented on every start, so a processing thread from an earlier
+        # run can tell it has been superseded; the lock keeps that check and
+        # the capture start/stop that follows it together
+        self._tracking_run = 0
+        self._capture_lock = threading.Lock()
+        self._last_frame_shape = None
+        self._drag_flush_pending = False
+        
+        # Pace video files at their own frame rate instead of processing
+        # them as fast as detection allows
+        self.realtime_playback = False
         self.shutdown_event = threading.Event()
         
-        # Frame processing queues
-        self.frame_queue = queue.Queue(maxsize=30)
-        self.processed_frame_queue = queue.Queue(maxsize=10)
+        # Latest processed frame, waiting for the display
+        self.processed_frame_slot = LatestFrameSlot()
         
-        # Performance tracking
+        # Display snapshot buffers, recycled once the display has shown them
+        self._frame_pool = deque(maxlen=4)
+        
+        # Set while an _update_display call is queued on the Tk event loop
+        self._display_pending = False
+        
+        # Activity log lines waiting to be written to the Text widget, which
+        # only the Tk thread may touch
+        self._pending_log = deque(maxlen=1000)
+        
+        # Performance tracking; the processing thread writes _latest_fps and
+        # the display update shows it when it changes
         self.fps_counter = 0
-        self.last_fps_time = time.time()
+        self.last_fps_time = time.monotonic()
+        self._latest_fps = 0.0
+        self._shown_fps = 0.0
         
         # GUI components
         self.root = None
@@ -272,18 +328,9 @@ class PetTrackerApplication:
             messagebox.showwarning("Warning", "Please load a video source first")
             return
         
-        # Clear processing queues
-        while not self.frame_queue.empty():
-            try:
-                self.frame_queue.get_nowait()
-            except queue.Empty:
-                break
-        
-        while not self.processed_frame_queue.empty():
-            try:
-                self.processed_frame_queue.get_nowait()
-            except queue.Empty:
-                break
+        # Drop any frame left from the previous run
+        self.processed_frame_slot.take()
+        self._display_pending = False
         
         # Reset detector cache
         self.detector.clear_cache()
@@ -292,8 +339,15 @@ class PetTrackerApplication:
         self.running = True
         self.shutdown_event.clear()
         
+        # Decode on the capture thread so reading overlaps with inference;
+        # after a quick pause/resume it may still be running
+        with self._capture_lock:
+            self._tracking_run += 1
+            self.video_capture.start_capture()
+        
         # Start processing thread
-        self.processing_thread = threading.Thread(target=self._processing_loop, daemon=True)
+        self.processing_thread = threading.Thread(target=self._processing_loop,
+                                                  args=(self._tracking_run,), daemon=True)
         self.processing_thread.start()
         
         # Update GUI
@@ -302,6 +356,7 @@ class PetTrackerApplication:
     
     def _pause_tracking(self):
         """Pause pet tracking."""
+        # The processing thread stops capture as it exits
         self.running = False
         self.control_panel.set_tracking_state(False, paused=True)
         self.status_bar.config(text="Tracking paused")
@@ -320,19 +375,40 @@ class PetTrackerApplication:
             self.video_capture.release()
             self.video_capture = None
         
+        # Write anything logged after the last display update
+        self._flush_activity_log()
+        
         # Update GUI
         self.control_panel.set_tracking_state(False)
         self.status_bar.config(text="Tracking stopped")
-        
-        # Force garbage collection
-        gc.collect()
     
-    def _processing_loop(self):
+    def _processing_loop(self, run: int):
         """Main processing loop running in background thread."""
+        try:
+            self._process_frames(run)
+        finally:
+            # Stop decoding ahead while paused, unless tracking has already
+            # been resumed with this capture
+            capture = self.video_capture
+            with self._capture_lock:
+                if capture and run == self._tracking_run:
+                    capture.stop_capture()
+    
+    def _process_frames(self, run: int):
+        """Read, detect, track and publish frames until tracking stops."""
         frame_number = 0
-        last_fps_update = time.time()
+        last_fps_update = time.monotonic()
+        
+        # Camera reads already block at the sensor's rate; files are only
+        # paced when real-time playback is enabled
+        capture = self.video_capture
+        if self.realtime_playback and not isinstance(capture.source, int) and capture.fps > 0:
+            frame_interval = 1.0 / capture.fps
+        else:
+            frame_interval = 0.0
+        next_frame_time = time.monotonic()
         
-        while self.running and not self.shutdown_event.is_set():
+        while self.running and run == self._tracking_run and not self.shutdown_event.is_set():
             try:
                 # Read frame from video capture
                 ret, frame = self.video_capture.read()
@@ -345,8 +421,11 @@ class PetTrackerApplication:
                         self.root.after(0, lambda: self._stop_tracking())
                         break
                 
-                # Set frame shape for tracker
-                self.tracker.set_frame_shape(frame.shape[:2])
+                # Set frame shape for tracker (only changes with the source)
+                shape = frame.shape[:2]
+                if shape != self._last_frame_shape:
+                    self.tracker.set_frame_shape(shape)
+                    self._last_frame_shape = shape
                 
                 # Detect pets
                 detections = self.detector.detect_pets(frame, frame_number)
@@ -360,60 +439,89 @@ class PetTrackerApplication:
                 # Draw overlays
                 processed_frame = self._draw_all_overlays(frame, detections)
                 
-                # Add to processed frame queue
-                if not self.processed_frame_queue.full():
-                    self.processed_frame_queue.put(processed_frame)
+                # Hand the frame to the display (the overlay buffer is reused,
+                # so publish a snapshot of it), replacing any it has not shown
+                snapshot = self._get_pool_buffer(processed_frame)
+                np.copyto(snapshot, processed_frame)
+                replaced = self.processed_frame_slot.publish(snapshot)
+                if replaced is not None:
+                    self._frame_pool.append(replaced)
                 
-                # Update display
-                self.root.after_idle(self._update_display)
+                # Update display, unless an update is already queued; it
+                # will pick up this frame from the slot
+                if not self._display_pending:
+                    self._display_pending = True
+                    self.root.after_idle(self._update_display)
                 
                 # Update FPS counter
                 self.fps_counter += 1
-                current_time = time.time()
+                current_time = time.monotonic()
                 if current_time - last_fps_update >= 1.0:
-                    fps = self.fps_counter / (current_time - last_fps_update)
-                    self.root.after(0, lambda f=fps: self.control_panel.update_fps(f))
+                    self._latest_fps = self.fps_counter / (current_time - last_fps_update)
                     self.fps_counter = 0
                     last_fps_update = current_time
                 
                 frame_number += 1
                 
-                # Small delay to prevent CPU overload
-                time.sleep(0.001)
+                # Wait only when ahead of schedule; when behind, restart the
+                # schedule from now rather than rushing to catch up
+                if frame_interval:
+                    next_frame_time += frame_interval
+                    delay = next_frame_time - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        next_frame_time = time.monotonic()
                 
             except Exception as e:
-                print(f"Processing error: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Processing error: %s", e)
                 time.sleep(0.1)
     
+    def _get_pool_buffer(self, frame):
+        """Take a pooled buffer shaped like frame, allocating one if none fits."""
+        while self._frame_pool:
+            try:
+                buf = self._frame_pool.pop()
+            except IndexError:
+                break
+            if buf.shape == frame.shape:
+                return buf
+        return np.empty_like(frame)
+    
     def _draw_all_overlays(self, frame, detections):
         """Draw all overlays on the frame."""
         # Draw detections
         if detections:
             frame = self.detector.draw_detections(frame, detections)
         
-        # Draw zones
-        frame = self.tracker.draw_zones(frame)
-        
-        # Draw bowls
-        frame = self.tracker.draw_bowls(frame)
+        # Draw zones and bowls (cached until either changes)
+        frame = self.tracker.draw_static_overlays(frame)
         
         return frame
     
     def _update_display(self):
         """Update video display with latest processed frame."""
-        if not self.processed_frame_queue.empty():
-            try:
-                frame = self.processed_frame_queue.get_nowait()
-                self.video_display.update_frame(frame)
-                
-                # Update statistics panel periodically
-                if self.fps_counter % 30 == 0:  # Every 30 frames
-                    self.statistics_panel.update_display()
-                
-            except queue.Empty:
-                pass
+        # Clear before taking the frame, so a frame published after this
+        # point schedules another update
+        self._display_pending = False
+        self._flush_activity_log()
+        
+        frame = self.processed_frame_slot.take()
+        if frame is not None:
+            self.video_display.update_frame(frame)
+            
+            # update_frame keeps its own copy, so the buffer can be reused
+            self._frame_pool.append(frame)
+            
+            # Update statistics panel periodically
+            if self.fps_counter % 30 == 0:  # Every 30 frames
+                self.statistics_panel.update_display()
+        
+        # Show the FPS measured over the last second
+        fps = self._latest_fps
+        if fps != self._shown_fps:
+            self._shown_fps = fps
+            self.control_panel.update_fps(fps)
     
     def _handle_activity_alerts(self, activity_results):
         """Handle alerts from activity detection."""
@@ -456,11 +564,32 @@ class PetTrackerApplication:
         return None
     
     def _add_to_activity_log(self, message):
-        """Add message to activity log."""
+        """Add message to activity log (safe to call from the processing thread)."""
         timestamp = time.strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {message}"
+        self._pending_log.append(f"[{timestamp}] {message}\n")
+        
+        # Messages from the processing thread are written by the next
+        # display update
+        if threading.current_thread() is threading.main_thread():
+            self._flush_activity_log()
+    
+    def _flush_activity_log(self):
+        """Write pending log lines to the Text widget in one insert."""
+        entries = []
+        while True:
+            try:
+                entries.append(self._pending_log.popleft())
+            except IndexError:
+                break
+        if not entries:
+            return
         
-        self.log_text.insert(tk.END, log_entry + "\n")
+        self.log_text.insert(tk.END, "".join(entries))
+        
+        # The widget always ends with an empty line after the last entry
+        line_count = int(self.log_text.index("end-1c").split(".")[0]) - 1
+        if line_count > LOG_MAX_LINES:
+            self.log_text.delete("1.0", f"{line_count - LOG_MAX_LINES + 1}.0")
         self.log_text.see(tk.END)
     
     def _send_alert(self, alert_type, subject, message):
@@ -511,8 +640,9 @@ class PetTrackerApplication:
         if self.video_capture:
             self.video_capture.release()
         
-        # Create new capture
-        self.video_capture = VideoCapture(source)
+        # Create new capture; a short ring keeps the frames handed to the
+        # detector fresh when it runs slower than the source
+        self.video_capture = VideoCapture(source, buffer_size=2)
         
         if not self.video_capture.open():
             messagebox.showerror("Error", "Could not open video source")
@@ -524,6 +654,9 @@ class PetTrackerApplication:
         # Get first frame for display
         ret, frame = self.video_capture.read()
         if ret:
+            self._last_frame_shape = frame.shape[:2]
+            self.tracker.set_frame_shape(self._last_frame_shape)
+            
             # Draw initial overlays
             frame_with_overlays = self._draw_all_overlays(frame, [])
             self.video_display.update_frame(frame_with_overlays)
@@ -570,12 +703,20 @@ class PetTrackerApplication:
                     # Temporarily update position for visual feedback
                     self.config.bowls[bowl_name].position = (int(new_position[0]), int(new_position[1]))
                     
-                    # Update the draggable items for the video display
-                    self._update_video_draggable_items()
+                    # Update the draggable items once Tk is idle, not on
+                    # every motion event
+                    if not self._drag_flush_pending:
+                        self._drag_flush_pending = True
+                        self.root.after_idle(self._flush_drag)
         
         # Update cursor position display
         self.status_bar.config(text=f"Dragging to: ({int(video_coords[0])}, {int(video_coords[1])})")
     
+    def _flush_drag(self):
+        """Push the latest dragged bowl positions to the video display."""
+        self._drag_flush_pending = False
+        self._update_video_draggable_items()
+    
     def _on_video_release(self, event, dragging_item, final_position):
         """Handle video canvas mouse release after dragging."""
         if dragging_item and dragging_item['type'] == 'bowl':
@@ -613,6 +754,9 @@ class PetTrackerApplication:
     
     def _update_video_draggable_items(self):
         """Update the video display with current draggable items (bowls)."""
+        # Bowls may have been moved in place; redraw the cached overlay
+        self.tracker.invalidate_cache()
+        
         draggable_items = {}
         
         # Add bowls as draggable items
@@ -806,14 +950,14 @@ class PetTrackerApplication:
     # Visualization methods
     def _show_heatmap(self):
         """Show movement heatmap."""
-        if self.statistics.heatmap is None:
+        if not self.statistics.has_heatmap:
             messagebox.showwarning("Warning", "No heatmap data available")
             return
         
         import matplotlib.pyplot as plt
         
         plt.figure(figsize=(10, 8))
-        plt.imshow(self.statistics.heatmap, cmap='hot', interpolation='nearest')
+        plt.imshow(self.statistics.get_heatmap_image(), cmap='hot', interpolation='nearest')
         plt.colorbar(label='Activity Intensity')
         plt.title('Pet Movement Heatmap')
         plt.xlabel('X Position')
@@ -919,6 +1063,7 @@ class PetTrackerApplication:
         
         # Shutdown services
         self.sound_service.shutdown()
+        self.email_service.shutdown()
         
         # Close GUI
         self.root.quit()
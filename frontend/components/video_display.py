@@ -9,6 +9,8 @@ import numpy as np
 from PIL import Image, ImageTk
 from typing import Callable, Optional, Tuple
 
+from backend.utils.video_utils import calculate_display_scale
+
 
 class VideoDisplayPanel:
     """Video display panel with zoom, pan, and overlay support."""
@@ -30,6 +32,7 @@ class VideoDisplayPanel:
         self.canvas_height = 450
         self.current_frame = None
         self.current_photo = None
+        self._photo_size = None
         
         # Coordinate transformation
         self.scale_x = 1.0
@@ -37,6 +40,9 @@ class VideoDisplayPanel:
         self.offset_x = 0
         self.offset_y = 0
         
+        # Canvas size, updated on <Configure> rather than queried every frame
+        self._canvas_size = (self.canvas_width, self.canvas_height)
+        
         # Video properties
         self.video_width = 0
         self.video_height = 0
@@ -78,6 +84,7 @@ class VideoDisplayPanel:
         self.canvas.bind("<ButtonRelease-1>", self._on_release)
         self.canvas.bind("<Button-3>", self._on_right_click)
         self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Configure>", self._on_configure)
         
         # Video controls
         self._create_controls()
@@ -119,9 +126,6 @@ class VideoDisplayPanel:
         self.current_frame = frame.copy()
         self.video_height, self.video_width = frame.shape[:2]
         
-        # Convert to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
         # Calculate display parameters
         self._calculate_display_parameters()
         
@@ -130,20 +134,32 @@ class VideoDisplayPanel:
         display_height = int(self.video_height * self.scale_y)
         
         if display_width > 0 and display_height > 0:
-            frame_resized = cv2.resize(frame_rgb, (display_width, display_height))
+            # Resize before converting to RGB so the conversion only
+            # touches the pixels that are displayed
+            frame_resized = cv2.resize(frame, (display_width, display_height))
+            frame_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
+            image = Image.fromarray(frame_rgb)
             
-            # Convert to PhotoImage
-            image = Image.fromarray(frame_resized)
-            self.current_photo = ImageTk.PhotoImage(image=image)
+            # Blit into the existing PhotoImage while the size is unchanged,
+            # rather than building a new Tk image every frame
+            size = (display_width, display_height)
+            if self.current_photo is None or self._photo_size != size:
+                self.current_photo = ImageTk.PhotoImage(image=image)
+                self._photo_size = size
+                self.canvas.delete("video")
+            else:
+                self.current_photo.paste(image)
             
             # Update canvas
-            self.canvas.delete("video")
-            self.canvas.create_image(
-                self.offset_x, self.offset_y,
-                image=self.current_photo,
-                anchor="nw",
-                tags="video"
-            )
+            if self.canvas.find_withtag("video"):
+                self.canvas.coords("video", self.offset_x, self.offset_y)
+            else:
+                self.canvas.create_image(
+                    self.offset_x, self.offset_y,
+                    image=self.current_photo,
+                    anchor="nw",
+                    tags="video"
+                )
             
             # Update info
             self._update_info_display()
@@ -153,30 +169,17 @@ class VideoDisplayPanel:
         if self.video_width == 0 or self.video_height == 0:
             return
         
-        # Get current canvas size
-        self.canvas.update_idletasks()
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
-        
-        if canvas_width <= 1 or canvas_height <= 1:
-            canvas_width = self.canvas_width
-            canvas_height = self.canvas_height
-        
-        # Calculate scale to fit
-        scale_x = canvas_width / self.video_width
-        scale_y = canvas_height / self.video_height
-        scale = min(scale_x, scale_y)
-        
-        # Apply scale
+        # Scale to fit and centering offsets; cached per (video, canvas) size
+        scale, self.offset_x, self.offset_y = calculate_display_scale(
+            (self.video_width, self.video_height), self._canvas_size
+        )
         self.scale_x = scale
         self.scale_y = scale
-        
-        # Calculate offsets for centering
-        scaled_width = self.video_width * self.scale_x
-        scaled_height = self.video_height * self.scale_y
-        
-        self.offset_x = (canvas_width - scaled_width) / 2
-        self.offset_y = (canvas_height - scaled_height) / 2
+    
+    def _on_configure(self, event):
+        """Remember the canvas size when the window is resized."""
+        if event.width > 1 and event.height > 1:
+            self._canvas_size = (event.width, event.height)
     
     def _update_info_display(self):
         """Update the information display."""
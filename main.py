@@ -9,6 +9,7 @@ to track pet activities, zone violations, and feeding behaviors.
 import sys
 import os
 import platform
+import importlib.util
 import tkinter as tk
 from tkinter import messagebox
 
@@ -31,9 +32,9 @@ def check_dependencies():
     missing_packages = []
     
     for module_name, package_name in required_packages.items():
-        try:
-            __import__(module_name)
-        except ImportError:
+        # Only locate the package; importing pandas and friends here would
+        # add their startup cost even when they are never used
+        if importlib.util.find_spec(module_name) is None:
             missing_packages.append(package_name)
     
     if missing_packages:
@@ -2,7 +2,7 @@
 Mock implementation of pet detector for testing.
 """
 import numpy as np
-import datetime
+import time
 from typing import List, Optional, Tuple
 from unittest.mock import Mock
 
@@ -88,6 +88,18 @@ class MockPetDetector:
         
         return detections
     
+    def detect_pets_batch(self, frames: List[np.ndarray], 
+                          frame_numbers: List[int]) -> List[List[Detection]]:
+        """Mock batched detection that bypasses the cache like the real detector."""
+        results = []
+        for frame, frame_number in zip(frames, frame_numbers):
+            self.detection_count += 1
+            if self.detection_patterns:
+                results.append(self._get_pattern_detections(frame_number))
+            else:
+                results.append(self._generate_random_detections(frame, frame_number))
+        return results
+    
     def _can_use_cached_detections(self, frame_number: int) -> bool:
         """Check if cached detections can be used."""
         if self.last_detection_frame is None:
@@ -105,7 +117,7 @@ class MockPetDetector:
         detections = self.detection_patterns[pattern_index]
         
         # Update frame numbers and timestamps
-        current_time = datetime.datetime.now()
+        current_time = time.monotonic_ns()
         updated_detections = []
         
         for detection in detections:
@@ -153,7 +165,7 @@ class MockPetDetector:
                 bbox=(x1, y1, x2, y2),
                 pet_type=pet_type,
                 confidence=confidence,
-                timestamp=datetime.datetime.now(),
+                timestamp=time.monotonic_ns(),
                 frame_number=frame_number
             )
             
@@ -210,7 +222,7 @@ class MockPetDetector:
             bbox=bbox,
             pet_type=pet_type,
             confidence=confidence,
-            timestamp=datetime.datetime.now(),
+            timestamp=time.monotonic_ns(),
             frame_number=frame_number
         )
     
@@ -223,7 +235,7 @@ class MockPetDetector:
             bbox=bbox,
             pet_type="cat",
             confidence=confidence,
-            timestamp=datetime.datetime.now(),
+            timestamp=time.monotonic_ns(),
             frame_number=frame_number
         )
     
@@ -236,7 +248,7 @@ class MockPetDetector:
             bbox=bbox,
             pet_type="dog",
             confidence=confidence,
-            timestamp=datetime.datetime.now(),
+            timestamp=time.monotonic_ns(),
             frame_number=frame_number
         )
     
@@ -256,7 +268,7 @@ class MockPetDetector:
                 bbox=bbox,
                 pet_type=pet_type,
                 confidence=0.8 + (i * 0.02),  # Slightly varying confidence
-                timestamp=datetime.datetime.now(),
+                timestamp=time.monotonic_ns(),
                 frame_number=start_frame + i
             )
             detections.append(detection)
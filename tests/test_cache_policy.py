@@ -0,0 +1,88 @@
+"""
+Unit tests for the detection cache policies.
+"""
+import unittest
+import numpy as np
+import sys
+import os
+
+# Import the modules to test
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.core.cache_policy import FrameSkipPolicy, MovementPolicy
+from backend.data.models import DetectionBatch
+
+
+def _batch(centers):
+    """Helper to build a batch of 10x10 boxes around the given centers."""
+    centers = np.array(centers, dtype=np.float32).reshape(-1, 2)
+    bbox = np.hstack([centers - 5, centers + 5])
+    count = len(centers)
+    return DetectionBatch(
+        bbox=bbox,
+        pet_type_id=np.full(count, 15, dtype=np.uint8),
+        confidence=np.full(count, 0.8, dtype=np.float32),
+        frame_number=np.zeros(count, dtype=np.int32)
+    )
+
+
+class TestFrameSkipPolicy(unittest.TestCase):
+    """Test cases for FrameSkipPolicy."""
+    
+    def test_skips_between_intervals(self):
+        """Test that only every Nth frame outside the cache window is processed."""
+        policy = FrameSkipPolicy(interval=3, cache_frames=3)
+        
+        self.assertFalse(policy.should_skip(0, None))
+        self.assertTrue(policy.should_skip(1, 0))
+        self.assertTrue(policy.should_skip(2, 0))
+        self.assertFalse(policy.should_skip(3, 0))
+    
+    def test_cache_window(self):
+        """Test that the cache window applies on interval frames."""
+        policy = FrameSkipPolicy(interval=1, cache_frames=5)
+        
+        self.assertTrue(policy.should_skip(4, 0))
+        self.assertFalse(policy.should_skip(5, 0))
+
+
+class TestMovementPolicy(unittest.TestCase):
+    """Test cases for MovementPolicy."""
+    
+    def test_detects_every_frame_while_moving(self):
+        """Test that moving pets disable the cache."""
+        policy = MovementPolicy(cache_frames=5, movement_threshold=20.0)
+        
+        policy.update(_batch([(100, 100)]))
+        self.assertFalse(policy.should_skip(1, 0))
+        
+        policy.update(_batch([(150, 100)]))
+        self.assertFalse(policy.should_skip(2, 1))
+    
+    def test_uses_cache_while_still(self):
+        """Test that stationary pets allow the cache window."""
+        policy = MovementPolicy(cache_frames=5, movement_threshold=20.0)
+        
+        policy.update(_batch([(100, 100), (300, 200)]))
+        policy.update(_batch([(302, 201), (104, 98)]))
+        
+        self.assertTrue(policy.should_skip(3, 1))
+        self.assertFalse(policy.should_skip(6, 1))
+        
+        # A new pet appearing counts as movement
+        policy.update(_batch([(100, 100), (300, 200), (50, 50)]))
+        self.assertFalse(policy.should_skip(7, 6))
+    
+    def test_reset(self):
+        """Test that reset forgets previous positions."""
+        policy = MovementPolicy(cache_frames=5)
+        policy.update(_batch([(100, 100)]))
+        policy.update(_batch([(100, 100)]))
+        
+        policy.reset()
+        
+        self.assertFalse(policy.should_skip(1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,7 +14,7 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from backend.core.detector import PetDetector
-from backend.data.models import Detection, PerformanceSettings
+from backend.data.models import Detection, DetectionBatch, PerformanceSettings
 
 
 class TestPetDetector(unittest.TestCase):
@@ -36,26 +36,24 @@ class TestPetDetector(unittest.TestCase):
         os.unlink(self.temp_model_file.name)
     
     def _create_mock_box(self, class_id, confidence, bbox):
-        """Helper to create a properly structured mock box."""
-        mock_box = Mock()
-        mock_box.cls = [class_id]
-        mock_box.conf = [confidence]
-        
-        # Create the chain of mocks for xyxy
-        xyxy_tensor = Mock()
-        xyxy_tensor.cpu.return_value.numpy.return_value = np.array(bbox)
-        mock_box.xyxy = [xyxy_tensor]
-        
-        return mock_box
+        """Helper to describe a single detected box."""
+        return class_id, confidence, bbox
+    
+    def _create_mock_tensor(self, values):
+        """Helper to create a mock tensor supporting .cpu().numpy()."""
+        tensor = Mock()
+        tensor.cpu.return_value.numpy.return_value = np.array(values, dtype=np.float32)
+        return tensor
     
     def _create_mock_result(self, boxes_list=None):
-        """Helper to create a mock result with proper boxes structure."""
+        """Helper to create a mock result with a packed boxes.data tensor."""
         mock_result = Mock()
         if boxes_list is None or len(boxes_list) == 0:
             mock_result.boxes = None
         else:
-            # Make boxes iterable by setting it to the list directly
-            mock_result.boxes = boxes_list
+            rows = [list(bbox) + [confidence, class_id] for class_id, confidence, bbox in boxes_list]
+            mock_result.boxes = Mock()
+            mock_result.boxes.data = self._create_mock_tensor(rows)
         return mock_result
     
     @patch('backend.core.detector.YOLO')
@@ -71,6 +69,23 @@ class TestPetDetector(unittest.TestCase):
         self.assertEqual(detector.model_path, self.temp_model_file.name)
         self.assertEqual(detector.confidence_threshold, 0.6)
         self.assertEqual(detector.pet_classes, {'cat': 15, 'dog': 16})
+        self.assertFalse(detector._use_umat)
+        mock_yolo.assert_called_once_with(self.temp_model_file.name)
+    
+    @patch('backend.core.detector.YOLO')
+    def test_detector_prefers_tensorrt_engine(self, mock_yolo):
+        """Test that an available TensorRT engine is used instead of the .pt weights."""
+        engine_model = Mock()
+        with patch.object(PetDetector, '_load_tensorrt_engine', return_value=engine_model):
+            detector = PetDetector(self.temp_model_file.name)
+        
+        self.assertIs(detector.model, engine_model)
+        mock_yolo.assert_not_called()
+        
+        # Disabling TensorRT loads the PyTorch weights directly
+        with patch.object(PetDetector, '_load_tensorrt_engine') as mock_engine:
+            PetDetector(self.temp_model_file.name, use_tensorrt=False)
+        mock_engine.assert_not_called()
         mock_yolo.assert_called_once_with(self.temp_model_file.name)
     
     def test_detector_initialization_missing_model(self):
@@ -134,7 +149,7 @@ class TestPetDetector(unittest.TestCase):
         # Verify detection
         self.assertEqual(len(detections1), 1)
         self.assertEqual(detections1[0].pet_type, 'cat')
-        self.assertEqual(detections1[0].confidence, 0.8)
+        self.assertAlmostEqual(detections1[0].confidence, 0.8, places=5)
         
         # Second detection within cache window (should use cache)
         detections2 = detector.detect_pets(frame, frame_number=2)
@@ -158,7 +173,7 @@ class TestPetDetector(unittest.TestCase):
         detections = detector.detect_pets(frame, frame_number=1)
         
         self.assertEqual(len(detections), 0)
-        self.assertEqual(detector.cached_detections, [])
+        self.assertEqual(len(detector.cached_detections), 0)
     
     @patch('backend.core.detector.YOLO')
     def test_detect_pets_multiple_animals(self, mock_yolo):
@@ -184,8 +199,80 @@ class TestPetDetector(unittest.TestCase):
         self.assertEqual(len(detections), 2)
         self.assertEqual(detections[0].pet_type, 'cat')
         self.assertEqual(detections[1].pet_type, 'dog')
-        self.assertEqual(detections[0].confidence, 0.8)
-        self.assertEqual(detections[1].confidence, 0.7)
+        self.assertAlmostEqual(detections[0].confidence, 0.8, places=5)
+        self.assertAlmostEqual(detections[1].confidence, 0.7, places=5)
+    
+    @patch('backend.core.detector.YOLO')
+    def test_detect_pets_returns_batch(self, mock_yolo):
+        """Test detections are returned as a structure-of-arrays batch."""
+        mock_yolo.return_value = self.yolo_mock
+        detector = PetDetector(self.temp_model_file.name)
+        detector.update_performance_settings(PerformanceSettings.from_mode("quality"))
+        
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        self.yolo_mock.return_value = [self._create_mock_result([
+            self._create_mock_box(0, 0.9, [10, 10, 20, 20]),     # Person, ignored
+            self._create_mock_box(16, 0.7, [75, 75, 150, 150])   # Dog
+        ])]
+        
+        detections = detector.detect_pets(frame, frame_number=0)
+        
+        self.assertIsInstance(detections, DetectionBatch)
+        self.assertEqual(len(detections), 1)
+        self.assertEqual(detections.bbox.shape, (1, 4))
+        # Coordinates are scaled back from the 0.75 processing scale
+        np.testing.assert_allclose(detections.bbox[0], [100, 100, 200, 200])
+        np.testing.assert_allclose(detections.center[0], [150, 150])
+        self.assertEqual(detections.pet_types, ['dog'])
+        self.assertEqual(detections[0].frame_number, 0)
+        
+        # Timestamps are monotonic nanoseconds, resolved to wall clock on demand
+        self.assertIsInstance(detections[0].timestamp, int)
+        wall_clock = detections[0].datetime
+        self.assertIsInstance(wall_clock, datetime.datetime)
+        self.assertLess(abs((datetime.datetime.now() - wall_clock).total_seconds()), 5)
+    
+    @patch('backend.core.detector.YOLO')
+    def test_detect_pets_batch(self, mock_yolo):
+        """Test batched detection runs the model once for all frames."""
+        mock_yolo.return_value = self.yolo_mock
+        detector = PetDetector(self.temp_model_file.name)
+        
+        frames = [np.zeros((480, 640, 3), dtype=np.uint8) for _ in range(3)]
+        
+        # One result per frame: cat, nothing, dog
+        self.yolo_mock.return_value = [
+            self._create_mock_result([self._create_mock_box(15, 0.8, [100, 100, 200, 200])]),
+            self._create_mock_result([]),
+            self._create_mock_result([self._create_mock_box(16, 0.6, [50, 50, 80, 80])])
+        ]
+        
+        results = detector.detect_pets_batch(frames, [10, 11, 12])
+        
+        self.assertEqual(self.yolo_mock.call_count, 1)
+        self.assertEqual(len(self.yolo_mock.call_args[0][0]), 3)
+        self.assertEqual(self.yolo_mock.call_args[1]['classes'], [15, 16])
+        self.assertEqual([len(r) for r in results], [1, 0, 1])
+        self.assertEqual(results[0][0].pet_type, 'cat')
+        self.assertEqual(results[0][0].frame_number, 10)
+        self.assertEqual(results[2][0].pet_type, 'dog')
+        self.assertEqual(results[2][0].frame_number, 12)
+    
+    @patch('backend.core.detector.YOLO')
+    def test_buffer_frame(self, mock_yolo):
+        """Test frames are buffered until a full batch is available."""
+        mock_yolo.return_value = self.yolo_mock
+        detector = PetDetector(self.temp_model_file.name, batch_size=2)
+        self.yolo_mock.return_value = [self._create_mock_result([]), self._create_mock_result([])]
+        
+        # Frames of different sizes should be padded to a common shape
+        self.assertIsNone(detector.buffer_frame(np.zeros((480, 640, 3), dtype=np.uint8), 0))
+        results = detector.buffer_frame(np.zeros((240, 320, 3), dtype=np.uint8), 1)
+        
+        self.assertEqual(len(results), 2)
+        batch = self.yolo_mock.call_args[0][0]
+        self.assertEqual(batch[0].shape, batch[1].shape)
+        self.assertEqual(detector.flush_frame_buffer(), [])
     
     @patch('backend.core.detector.YOLO')
     def test_draw_detections(self, mock_yolo):
@@ -248,7 +335,7 @@ class TestPetDetector(unittest.TestCase):
         detector.clear_cache()
         
         self.assertIsNone(detector.last_detection_frame)
-        self.assertEqual(detector.cached_detections, [])
+        self.assertEqual(len(detector.cached_detections), 0)
     
     @patch('backend.core.detector.YOLO')
     def test_get_model_info(self, mock_yolo):
@@ -284,6 +371,24 @@ class TestPetDetector(unittest.TestCase):
             # Access private method for testing
             actual_scale = detector._get_processing_scale()
             self.assertEqual(actual_scale, expected_scale, f"Failed for mode: {mode}")
+    
+    @patch('backend.core.detector.YOLO')
+    def test_resize_buffer_reuse(self, mock_yolo):
+        """Test that resized frames reuse one buffer until the shape changes."""
+        mock_yolo.return_value = self.yolo_mock
+        detector = PetDetector(self.temp_model_file.name)
+        
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        first = detector._prepare_frames([frame], 0.5)[0]
+        second = detector._prepare_frames([frame], 0.5)[0]
+        
+        self.assertEqual(first.shape, (240, 320, 3))
+        self.assertIs(first, second)
+        
+        # A new scale needs a new buffer
+        third = detector._prepare_frames([frame], 0.25)[0]
+        self.assertEqual(third.shape, (120, 160, 3))
+        self.assertIsNot(third, first)
 
 
 class TestDetectorIntegration(unittest.TestCase):
@@ -300,26 +405,24 @@ class TestDetectorIntegration(unittest.TestCase):
         os.unlink(self.temp_model_file.name)
     
     def _create_mock_box(self, class_id, confidence, bbox):
-        """Helper to create a properly structured mock box."""
-        mock_box = Mock()
-        mock_box.cls = [class_id]
-        mock_box.conf = [confidence]
-        
-        # Create the chain of mocks for xyxy
-        xyxy_tensor = Mock()
-        xyxy_tensor.cpu.return_value.numpy.return_value = np.array(bbox)
-        mock_box.xyxy = [xyxy_tensor]
-        
-        return mock_box
+        """Helper to describe a single detected box."""
+        return class_id, confidence, bbox
+    
+    def _create_mock_tensor(self, values):
+        """Helper to create a mock tensor supporting .cpu().numpy()."""
+        tensor = Mock()
+        tensor.cpu.return_value.numpy.return_value = np.array(values, dtype=np.float32)
+        return tensor
     
     def _create_mock_result(self, boxes_list=None):
-        """Helper to create a mock result with proper boxes structure."""
+        """Helper to create a mock result with a packed boxes.data tensor."""
         mock_result = Mock()
         if boxes_list is None or len(boxes_list) == 0:
             mock_result.boxes = None
         else:
-            # Make boxes iterable by setting it to the list directly
-            mock_result.boxes = boxes_list
+            rows = [list(bbox) + [confidence, class_id] for class_id, confidence, bbox in boxes_list]
+            mock_result.boxes = Mock()
+            mock_result.boxes.data = self._create_mock_tensor(rows)
         return mock_result
     
     @patch('backend.core.detector.YOLO')
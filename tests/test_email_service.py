@@ -5,7 +5,7 @@ import unittest
 from unittest.mock import Mock, patch, MagicMock
 import time
 import smtplib
-from email.mime.multipart import MIMEMultipart
+from email.message import EmailMessage
 
 from backend.services.email_service import EmailNotificationService, EmailConfig
 
@@ -77,6 +77,11 @@ class TestEmailNotificationService(unittest.TestCase):
             smtp_port=587
         )
     
+    def tearDown(self):
+        """Stop the worker, sending anything still queued to a mock server."""
+        with patch('backend.services.email_service.smtplib.SMTP'):
+            self.email_service.shutdown()
+    
     def test_service_initialization(self):
         """Test service initialization."""
         self.assertIsNone(self.email_service.config)
@@ -136,17 +141,17 @@ class TestEmailNotificationService(unittest.TestCase):
     def test_send_email_success(self, mock_smtp):
         """Test successful email sending."""
         # Configure mock
-        mock_server = MagicMock()
-        mock_smtp.return_value.__enter__.return_value = mock_server
+        mock_server = mock_smtp.return_value
         
         self.email_service.configure(self.test_config)
         
-        # Send alert
+        # Send alert and wait for the worker to send it
         result = self.email_service.send_alert(
             "test_alert",
             "Test Subject",
             "Test message content"
         )
+        self.email_service._queue.join()
         
         self.assertTrue(result)
         
@@ -155,6 +160,65 @@ class TestEmailNotificationService(unittest.TestCase):
         mock_server.starttls.assert_called_once()
         mock_server.login.assert_called_once_with("test@example.com", "testpassword")
         mock_server.send_message.assert_called_once()
+        
+        # Verify the plain-text message
+        msg = mock_server.send_message.call_args[0][0]
+        self.assertIsInstance(msg, EmailMessage)
+        self.assertEqual(msg['Subject'], "Test Subject")
+        self.assertEqual(msg.get_content_type(), "text/plain")
+        self.assertIn("Test message content", msg.get_content())
+    
+    @patch('backend.services.email_service.smtplib.SMTP')
+    def test_connection_reused_between_alerts(self, mock_smtp):
+        """Test that queued alerts share one SMTP connection."""
+        self.email_service.configure(self.test_config)
+        
+        for alert_type in ("first", "second", "third"):
+            self.email_service.send_alert(alert_type, "Subject", "Message")
+        self.email_service._queue.join()
+        
+        mock_smtp.assert_called_once()
+        mock_smtp.return_value.login.assert_called_once()
+        self.assertEqual(mock_smtp.return_value.send_message.call_count, 3)
+    
+    @patch('backend.services.email_service.smtplib.SMTP')
+    def test_reconnect_after_disconnect(self, mock_smtp):
+        """Test that a dropped connection is re-established and the alert resent."""
+        self.email_service.RECONNECT_DELAY = 0
+        self.email_service.configure(self.test_config)
+        mock_smtp.return_value.send_message.side_effect = [
+            smtplib.SMTPServerDisconnected("Connection closed"), None
+        ]
+        
+        self.email_service.send_alert("test_alert", "Subject", "Message")
+        self.email_service._queue.join()
+        
+        self.assertEqual(mock_smtp.call_count, 2)
+        self.assertEqual(mock_smtp.return_value.send_message.call_count, 2)
+        self.assertIn("test_alert", self.email_service.last_alert_times)
+    
+    def test_send_alert_queue_full(self):
+        """Test that alerts are dropped instead of piling up when the queue is full."""
+        self.email_service.configure(self.test_config)
+        self.email_service.shutdown()  # Stop the worker so nothing drains the queue
+        
+        for _ in range(EmailNotificationService.MAX_QUEUED_ALERTS):
+            self.assertTrue(self.email_service.send_alert("test", "Subject", "Message", bypass_cooldown=True))
+        
+        result = self.email_service.send_alert("test", "Subject", "Message", bypass_cooldown=True)
+        self.assertFalse(result)
+    
+    @patch('backend.services.email_service.smtplib.SMTP')
+    def test_shutdown_closes_connection(self, mock_smtp):
+        """Test that shutdown sends pending alerts and closes the connection."""
+        self.email_service.configure(self.test_config)
+        self.email_service.send_alert("test_alert", "Subject", "Message")
+        
+        self.email_service.shutdown()
+        
+        self.assertFalse(self.email_service._worker.is_alive())
+        mock_smtp.return_value.send_message.assert_called_once()
+        mock_smtp.return_value.quit.assert_called_once()
     
     @patch('backend.services.email_service.smtplib.SMTP')
     def test_send_email_failure(self, mock_smtp):
@@ -345,6 +409,11 @@ class TestEmailServiceIntegration(unittest.TestCase):
         """Set up integration test fixtures."""
         self.email_service = EmailNotificationService()
     
+    def tearDown(self):
+        """Stop the worker, sending anything still queued to a mock server."""
+        with patch('backend.services.email_service.smtplib.SMTP'):
+            self.email_service.shutdown()
+    
     def test_complete_workflow(self):
         """Test complete email service workflow."""
         # 1. Start with unconfigured service
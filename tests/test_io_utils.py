@@ -3,9 +3,11 @@ Unit tests for I/O utilities and configuration management.
 """
 import unittest
 import tempfile
+import csv
 import os
 import json
 import shutil
+import datetime
 from unittest.mock import Mock, patch, MagicMock
 
 from backend.utils.io_utils import ConfigurationManager, ReportGenerator, DataExporter
@@ -97,6 +99,24 @@ class TestConfigurationManager(unittest.TestCase):
         self.assertEqual(loaded_config.confidence_threshold, 0.7)
         self.assertEqual(loaded_config.alert_cooldown, 120)
     
+    def test_load_config_reuses_parsed_file(self):
+        """Test that an unchanged file is not parsed again but still yields a fresh config."""
+        self.config_manager.save_config(self.test_config)
+        first = self.config_manager.load_config()
+        
+        with patch('backend.utils.io_utils._load_json') as mock_load:
+            second = self.config_manager.load_config()
+            mock_load.assert_not_called()
+        
+        self.assertIsNot(first, second)
+        self.assertEqual(second.zones[0].name, "test_zone")
+        
+        # Saving changes the file, so the next load parses it again
+        self.test_config.confidence_threshold = 0.9
+        self.config_manager.save_config(self.test_config)
+        os.utime(self.config_path, ns=(0, 0))
+        self.assertEqual(self.config_manager.load_config().confidence_threshold, 0.9)
+    
     def test_load_config_nonexistent_file(self):
         """Test loading configuration from nonexistent file."""
         nonexistent_path = os.path.join(self.temp_dir, "nonexistent.json")
@@ -186,9 +206,9 @@ class TestReportGenerator(unittest.TestCase):
         
         # Add activity log entries
         self.statistics.activity_log.extend([
-            "2024-01-01 09:00:00: Pet detected",
-            "2024-01-01 09:05:00: Pet entered kitchen",
-            "2024-01-01 09:10:00: ALERT: Pet entered restricted zone"
+            (datetime.datetime(2024, 1, 1, 9, 0), "Pet detected"),
+            (datetime.datetime(2024, 1, 1, 9, 5), "Pet entered kitchen"),
+            (datetime.datetime(2024, 1, 1, 9, 10), "ALERT: Pet entered restricted zone")
         ])
     
     def tearDown(self):
@@ -233,18 +253,20 @@ class TestReportGenerator(unittest.TestCase):
         self.assertEqual(data['stats']['eating_events'], 5)
     
     @patch('backend.utils.io_utils.PANDAS_AVAILABLE', True)
-    @patch('pandas.DataFrame')
-    def test_generate_csv_report(self, mock_dataframe):
+    @patch('pandas.concat')
+    def test_generate_csv_report(self, mock_concat):
         """Test generating CSV report."""
         mock_df = Mock()
-        mock_dataframe.return_value = mock_df
+        mock_concat.return_value = mock_df
         
         file_path = os.path.join(self.temp_dir, "test_report.csv")
         result = self.report_generator.generate_csv_report(file_path)
         
         self.assertTrue(result)
-        mock_dataframe.assert_called_once()
-        mock_df.to_csv.assert_called_once_with(file_path, index=False)
+        mock_concat.assert_called_once()
+        mock_df.to_csv.assert_called_once()
+        self.assertEqual(mock_df.to_csv.call_args[0][0].name, file_path)
+        self.assertFalse(mock_df.to_csv.call_args[1]['index'])
 
     @patch('backend.utils.io_utils.PANDAS_AVAILABLE', False)
     def test_generate_csv_report_no_pandas(self):
@@ -296,8 +318,8 @@ class TestDataExporter(unittest.TestCase):
         self.statistics.stats['eating_events'] = 5
         self.statistics.stats['zone_visits']['kitchen'] = 10
         self.statistics.activity_log.extend([
-            "2024-01-01 09:00:00: Pet detected",
-            "2024-01-01 09:05:00: ALERT: Restricted zone entry"
+            (datetime.datetime(2024, 1, 1, 9, 0), "Pet detected"),
+            (datetime.datetime(2024, 1, 1, 9, 5), "ALERT: Restricted zone entry")
         ])
     
     def tearDown(self):
@@ -316,7 +338,16 @@ class TestDataExporter(unittest.TestCase):
         
         self.assertTrue(result)
         mock_dataframe.assert_called_once()
-        mock_df.to_csv.assert_called_once_with(file_path, index=False)
+        mock_df.to_csv.assert_called_once()
+        self.assertEqual(mock_df.to_csv.call_args[0][0].name, file_path)
+        self.assertFalse(mock_df.to_csv.call_args[1]['index'])
+        
+        # Columns are passed whole, with nested stats flattened into rows
+        columns = mock_dataframe.call_args[0][0]
+        self.assertEqual(list(columns), ['category', 'metric', 'value'])
+        self.assertEqual(len(columns['category']), len(columns['metric']))
+        self.assertEqual(len(columns['category']), len(columns['value']))
+        self.assertNotIn('activity_timeline', columns['metric'])
     
     @patch('backend.utils.io_utils.PANDAS_AVAILABLE', False)
     def test_export_statistics_csv_no_pandas(self):
@@ -326,25 +357,21 @@ class TestDataExporter(unittest.TestCase):
         
         self.assertFalse(result)
     
-    @patch('backend.utils.io_utils.PANDAS_AVAILABLE', True)
-    @patch('pandas.DataFrame')
-    def test_export_activity_log_csv(self, mock_dataframe):
+    def test_export_activity_log_csv(self):
         """Test exporting activity log to CSV."""
-        mock_df = Mock()
-        mock_dataframe.return_value = mock_df
-        
         file_path = os.path.join(self.temp_dir, "activity.csv")
         result = DataExporter.export_activity_log_csv(self.statistics, file_path)
         
         self.assertTrue(result)
-        mock_dataframe.assert_called_once()
         
         # Check that data was parsed correctly
-        call_args = mock_dataframe.call_args[0][0]
-        self.assertTrue(len(call_args) > 0)
-        self.assertIn('timestamp', call_args[0])
-        self.assertIn('message', call_args[0])
-        self.assertIn('is_alert', call_args[0])
+        with open(file_path, 'r', newline='') as f:
+            rows = list(csv.DictReader(f))
+        
+        self.assertEqual(len(rows), len(self.statistics.activity_log))
+        self.assertIn('timestamp', rows[0])
+        self.assertIn('message', rows[0])
+        self.assertIn('is_alert', rows[0])
     
     def test_backup_application_data(self):
         """Test creating application data backup."""
@@ -376,6 +403,15 @@ class TestDataExporter(unittest.TestCase):
         self.assertIn('created_at', backup_info)
         self.assertIn('version', backup_info)
         self.assertIn('files', backup_info)
+        
+        # Every file in the bundle carries the same timestamp
+        with open(os.path.join(backup_path, "config.json"), 'r') as f:
+            config_data = json.load(f)
+        with open(os.path.join(backup_path, "statistics.json"), 'r') as f:
+            stats_data = json.load(f)
+        
+        self.assertEqual(config_data['created_at'], backup_info['created_at'])
+        self.assertEqual(stats_data['metadata']['generated_at'], backup_info['created_at'])
     
     def test_export_failure_handling(self):
         """Test export failure handling."""
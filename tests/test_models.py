@@ -0,0 +1,149 @@
+"""
+Unit tests for the data model classes.
+"""
+import unittest
+import dataclasses
+import numpy as np
+import sys
+import os
+
+# Import the modules to test
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.data.models import (Zone, ZoneIndex, BowlLocation, AppConfig, Detection,
+                                 PerformanceSettings, nearest_bowls)
+
+
+class TestZone(unittest.TestCase):
+    """Test cases for Zone."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.zones = [
+            Zone("kitchen", (100, 100, 300, 200), "restricted", (255, 0, 0)),
+            Zone("living_room", (250, 150, 600, 300), "normal", (0, 255, 0))
+        ]
+    
+    def test_batch_contains_matches_point_in_zone(self):
+        """Test that the vectorized test agrees with point_in_zone."""
+        points = np.array([
+            [150, 150],   # Kitchen only
+            [275, 175],   # Both zones
+            [500, 250],   # Living room only
+            [50, 50],     # Neither
+            [100, 200]    # Kitchen corner (inclusive)
+        ], dtype=np.float32)
+        
+        mask = Zone.batch_contains(points, Zone.stack_coords(self.zones))
+        
+        self.assertEqual(mask.shape, (5, 2))
+        for i, point in enumerate(points):
+            for j, zone in enumerate(self.zones):
+                self.assertEqual(mask[i, j], zone.point_in_zone(tuple(point)))
+    
+    def test_zone_name_interned(self):
+        """Test that zone names built at runtime are interned."""
+        name = "".join(["kit", "chen"])
+        zone = Zone(name, (0, 0, 10, 10), "normal", (0, 0, 0))
+        
+        self.assertIs(zone.name, sys.intern("kitchen"))
+    
+    def test_stack_coords_empty(self):
+        """Test stacking coordinates of no zones."""
+        coords = Zone.stack_coords([])
+        
+        self.assertEqual(coords.shape, (0, 4))
+        self.assertEqual(Zone.batch_contains(np.zeros((3, 2)), coords).shape, (3, 0))
+    
+    def test_zone_index_matches_point_in_zone(self):
+        """Test that the stripe index finds the same zones as a linear scan."""
+        index = ZoneIndex(self.zones)
+        
+        for x in range(0, 700, 25):
+            for y in range(0, 400, 25):
+                expected = [zone for zone in self.zones if zone.point_in_zone((x, y))]
+                self.assertEqual(index.zones_at(x, y), expected)
+    
+    def test_zone_index_empty(self):
+        """Test querying an index without zones."""
+        self.assertEqual(ZoneIndex([]).zones_at(10, 10), [])
+    
+    def test_get_zones_for_point_rebuilds_index(self):
+        """Test that AppConfig rebuilds the index when zones change."""
+        config = AppConfig(zones=list(self.zones), bowls={}, performance=PerformanceSettings())
+        self.assertEqual([z.name for z in config.get_zones_for_point((275, 175))],
+                         ["kitchen", "living_room"])
+        
+        config.zones.append(Zone("hall", (260, 160, 280, 180), "normal", (0, 0, 255)))
+        self.assertEqual(len(config.get_zones_for_point((275, 175))), 3)
+        
+        config.zones = []
+        self.assertEqual(config.get_zones_for_point((275, 175)), [])
+
+
+class TestBowlLocation(unittest.TestCase):
+    """Test cases for BowlLocation."""
+    
+    def test_is_near(self):
+        """Test bowl proximity with and without a threshold factor."""
+        bowl = BowlLocation("food", (100, 100), radius=30)
+        
+        self.assertTrue(bowl.is_near((100, 130)))       # On the edge
+        self.assertFalse(bowl.is_near((100, 131)))
+        self.assertTrue(bowl.is_near((120, 120)))
+        self.assertTrue(bowl.is_near((100, 140), threshold_factor=1.5))
+    
+    def test_nearest_bowls(self):
+        """Test vectorized bowl proximity and nearest-bowl selection."""
+        bowls = {
+            "food": BowlLocation("food", (100, 100), radius=30),
+            "water": BowlLocation("water", (140, 100), radius=30)
+        }
+        positions, radii = BowlLocation.stack(bowls)
+        points = np.array([[95, 100], [125, 100], [300, 300]], dtype=np.float32)
+        
+        near, nearest = nearest_bowls(points, positions, radii ** 2)
+        
+        self.assertEqual(near.tolist(), [[True, False], [True, True], [False, False]])
+        self.assertEqual(nearest.tolist(), [0, 1, -1])
+        for i, point in enumerate(points):
+            for j, bowl in enumerate(bowls.values()):
+                self.assertEqual(near[i, j], bowl.is_near(tuple(point)))
+
+
+
+class TestDetection(unittest.TestCase):
+    """Test cases for Detection."""
+    
+    def test_center_and_size(self):
+        """Test the center and size computed from the bounding box."""
+        detection = Detection((100, 50, 200, 250), 'cat', 0.9, 0, 1)
+        
+        self.assertEqual(detection.center, (150.0, 150.0))
+        self.assertEqual(detection.size, 200)
+    
+    def test_equality_ignores_cached_values(self):
+        """Test that detections still compare by their fields."""
+        self.assertEqual(Detection((0, 0, 10, 10), 'dog', 0.5, 0, 1),
+                         Detection((0, 0, 10, 10), 'dog', 0.5, 0, 1))
+
+
+class TestPerformanceSettings(unittest.TestCase):
+    """Test cases for PerformanceSettings."""
+    
+    def test_from_mode_returns_shared_settings(self):
+        """Test that mode lookups return the same immutable instance."""
+        settings = PerformanceSettings.from_mode("performance")
+        
+        self.assertIs(settings, PerformanceSettings.from_mode("performance"))
+        self.assertEqual(settings.frame_skip_ratio, 2)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            settings.display_fps = 1.0
+    
+    def test_from_mode_unknown_falls_back_to_balanced(self):
+        """Test that unknown modes use the balanced settings."""
+        self.assertEqual(PerformanceSettings.from_mode("unknown").mode, "balanced")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Unit tests for the PetPipeline class.
+"""
+import unittest
+import sys
+import os
+
+# Import the modules to test
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.core.pipeline import PetPipeline
+from backend.core.tracker import PetActivityTracker
+from backend.data.models import Zone
+from backend.data.statistics import ActivityStatistics
+from tests.mocks import MockPetDetector, MockVideoCapture
+
+
+class TestPetPipeline(unittest.TestCase):
+    """Test cases for PetPipeline class."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.statistics = ActivityStatistics()
+        self.tracker = PetActivityTracker(self.statistics)
+        self.tracker.update_zones([
+            Zone("kitchen", (100, 100, 300, 300), "restricted", (255, 0, 0))
+        ])
+        
+        self.detector = MockPetDetector()
+        self.detector.set_detection_patterns([
+            [MockPetDetector.create_cat_detection((150, 150, 200, 200))]
+        ])
+        
+        self.capture = MockVideoCapture(0)
+        self.capture.open()
+    
+    def test_processes_all_frames_in_order(self):
+        """Test that every captured frame reaches the tracking stage in order."""
+        pipeline = PetPipeline(self.detector, self.tracker, queue_size=2, batch_size=3)
+        seen = []
+        
+        processed = pipeline.run(
+            self.capture, max_frames=10,
+            on_result=lambda n, frame, detections, results: seen.append((n, len(detections)))
+        )
+        
+        self.assertEqual(processed, 10)
+        self.assertEqual([n for n, _ in seen], list(range(10)))
+        self.assertTrue(all(count == 1 for _, count in seen))
+        self.assertEqual(self.statistics.stats['total_detections'], 10)
+        self.assertGreater(self.statistics.stats['restricted_zone_violations'], 0)
+        self.assertFalse(pipeline.running)
+    
+    def test_stops_at_end_of_video(self):
+        """Test that the pipeline finishes when the capture source ends."""
+        self.capture.simulate_end_of_video = True
+        self.capture.end_at_frame = 5
+        pipeline = PetPipeline(self.detector, self.tracker)
+        
+        processed = pipeline.run(self.capture)
+        
+        self.assertEqual(processed, 5)
+        self.assertEqual(self.tracker.frame_shape, (480, 640))
+    
+    def test_get_status(self):
+        """Test pipeline status reporting."""
+        pipeline = PetPipeline(self.detector, self.tracker, queue_size=4, batch_size=2)
+        
+        status = pipeline.get_status()
+        
+        self.assertFalse(status['running'])
+        self.assertEqual(status['queue_size'], 4)
+        self.assertEqual(status['batch_size'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,8 @@ Unit tests for the ActivityStatistics class.
 import unittest
 import numpy as np
 import datetime
-from collections import defaultdict
+import threading
+from collections import Counter
 import sys
 import os
 
@@ -12,7 +13,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from backend.data.statistics import ActivityStatistics
-from backend.data.models import Detection, ZoneDuration
+from backend.data.models import Detection, DetectionBatch, ZoneDuration
 
 
 class TestActivityStatistics(unittest.TestCase):
@@ -28,8 +29,9 @@ class TestActivityStatistics(unittest.TestCase):
         self.assertEqual(self.stats.stats['drinking_events'], 0)
         self.assertEqual(self.stats.stats['restricted_zone_violations'], 0)
         self.assertEqual(self.stats.stats['total_detections'], 0)
-        self.assertIsInstance(self.stats.stats['activity_timeline'], defaultdict)
-        self.assertIsInstance(self.stats.stats['zone_visits'], defaultdict)
+        self.assertEqual(self.stats.stats['activity_timeline'].shape, (24,))
+        self.assertEqual(self.stats.stats['activity_timeline'].sum(), 0)
+        self.assertIsInstance(self.stats.stats['zone_visits'], Counter)
         self.assertEqual(len(self.stats.activity_log), 0)
         self.assertEqual(len(self.stats.zone_durations), 0)
         self.assertEqual(len(self.stats.current_zones), 0)
@@ -39,7 +41,7 @@ class TestActivityStatistics(unittest.TestCase):
         # Modify some statistics
         self.stats.stats['eating_events'] = 5
         self.stats.stats['total_detections'] = 10
-        self.stats.activity_log.append("Test entry")
+        self.stats.activity_log.append((datetime.datetime.now(), "Test entry"))
         self.stats.zone_durations['test_zone'] = ZoneDuration('test_zone', 100.0)
         
         # Reset
@@ -58,7 +60,7 @@ class TestActivityStatistics(unittest.TestCase):
         
         self.assertIsNotNone(self.stats.heatmap)
         self.assertEqual(self.stats.heatmap.shape, frame_shape)
-        self.assertEqual(self.stats.heatmap.dtype, np.float32)
+        self.assertEqual(self.stats.heatmap.dtype, np.uint16)
         self.assertTrue(np.all(self.stats.heatmap == 0))
     
     def test_log_activity(self):
@@ -68,10 +70,13 @@ class TestActivityStatistics(unittest.TestCase):
         
         self.assertEqual(len(self.stats.activity_log), 1)
         
-        # Check log entry format
-        log_entry = self.stats.activity_log[0]
-        self.assertIn(message, log_entry)
-        self.assertIn(datetime.datetime.now().strftime("%Y-%m-%d"), log_entry)
+        # Check log entry, stored raw and formatted on read
+        timestamp, logged_message = self.stats.activity_log[0]
+        self.assertEqual(logged_message, message)
+        self.assertIsInstance(timestamp, datetime.datetime)
+        
+        log_entry = self.stats.get_recent_activities(1)[0]
+        self.assertEqual(log_entry, f"{timestamp.strftime('%Y-%m-%d %H:%M:%S')}: {message}")
         
         # Check event object
         self.assertEqual(event.event_type, "zone_entry")
@@ -92,6 +97,21 @@ class TestActivityStatistics(unittest.TestCase):
         
         self.assertEqual(self.stats.stats['total_detections'], initial_count + 1)
     
+    def test_record_detection_batch(self):
+        """Test recording a whole DetectionBatch at once."""
+        self.stats.initialize_heatmap((100, 100))
+        batch = DetectionBatch.from_detections([
+            Detection((10, 10, 20, 20), 'cat', 0.8, 0, 1),
+            Detection((15, 15, 30, 30), 'dog', 0.7, 0, 1)
+        ])
+        
+        self.stats.record_detection(batch)
+        self.stats.fold_heatmap()
+        
+        self.assertEqual(self.stats.stats['total_detections'], 2)
+        self.assertEqual(self.stats.heatmap[12, 12], 1)
+        self.assertEqual(self.stats.heatmap[17, 17], 2)
+    
     def test_update_heatmap(self):
         """Test heatmap updates with detection bounding boxes."""
         frame_shape = (480, 640)
@@ -99,6 +119,7 @@ class TestActivityStatistics(unittest.TestCase):
         
         bbox = (100, 100, 200, 200)
         self.stats.update_heatmap(bbox)
+        self.stats.fold_heatmap()
         
         # Heatmap should be updated in the bbox region
         self.assertTrue(np.any(self.stats.heatmap > 0))
@@ -115,12 +136,97 @@ class TestActivityStatistics(unittest.TestCase):
         # Bbox partially outside frame
         bbox = (80, 80, 120, 120)
         self.stats.update_heatmap(bbox)
+        self.stats.fold_heatmap()
         
         # Should not crash and should update valid region
         self.assertTrue(np.any(self.stats.heatmap > 0))
         updated_region = self.stats.heatmap[80:100, 80:100]
         self.assertTrue(np.any(updated_region > 0))
     
+    def test_update_heatmap_overlapping_boxes(self):
+        """Test that deferred heatmap updates count overlapping boxes exactly."""
+        self.stats.initialize_heatmap((100, 100))
+        
+        self.stats.update_heatmap((10, 10, 50, 50))
+        self.stats.update_heatmap((30, 30, 70, 70))
+        self.stats.fold_heatmap()
+        
+        heatmap = self.stats.heatmap
+        self.assertEqual(heatmap[20, 20], 1)
+        self.assertEqual(heatmap[40, 40], 2)
+        self.assertEqual(heatmap[60, 60], 1)
+        self.assertEqual(heatmap[50, 50], 1)  # End coordinates are exclusive
+        self.assertEqual(heatmap.sum(), 2 * 40 * 40)
+        
+        # Folding again without new detections does not change the heatmap
+        self.stats.update_heatmap((10, 10, 20, 20))
+        self.stats.fold_heatmap()
+        self.assertEqual(self.stats.heatmap[15, 15], 2)
+        self.stats.fold_heatmap()
+        self.assertEqual(self.stats.heatmap[15, 15], 2)
+    
+    def test_heatmap_read_does_not_fold(self):
+        """Test that reading the heatmap leaves pending detections unfolded."""
+        self.stats.initialize_heatmap((100, 100))
+        self.assertTrue(self.stats.has_heatmap)
+        
+        self.stats.update_heatmap((10, 10, 20, 20))
+        self.assertEqual(self.stats.heatmap[15, 15], 0)
+        
+        self.stats.fold_heatmap()
+        self.assertEqual(self.stats.heatmap[15, 15], 1)
+    
+    def test_heatmap_fold_during_updates(self):
+        """Test that folding the heatmap while boxes arrive loses no counts."""
+        self.stats.initialize_heatmap((100, 100))
+        
+        def record_boxes():
+            for _ in range(2000):
+                self.stats.update_heatmap((10, 10, 20, 20))
+        
+        writer = threading.Thread(target=record_boxes)
+        writer.start()
+        while writer.is_alive():
+            self.stats.fold_heatmap()
+        writer.join()
+        
+        self.stats.fold_heatmap()
+        heatmap = self.stats.heatmap
+        self.assertEqual(heatmap[15, 15], 2000)
+        self.assertEqual(heatmap.sum(), 2000 * 10 * 10)
+    
+    def test_heatmap_tiles(self):
+        """Test that boxes spanning several tiles are stitched back correctly."""
+        self.stats.initialize_heatmap((100, 150))
+        self.assertEqual(self.stats.heatmap_tiled.shape, (2, 3, 64, 64))
+        
+        self.stats.update_heatmap((50, 40, 140, 90))
+        self.stats.fold_heatmap()
+        
+        expected = np.zeros((100, 150), dtype=np.uint16)
+        expected[40:90, 50:140] = 1
+        np.testing.assert_array_equal(self.stats.heatmap, expected)
+        self.assertEqual(self.stats.heatmap_tiled[1, 2, 20, 10], 1)  # pixel (84, 138)
+        self.assertEqual(self.stats.heatmap_tiled.sum(), expected.sum())
+    
+    def test_heatmap_saturates(self):
+        """Test that heatmap counts saturate instead of wrapping."""
+        self.stats.initialize_heatmap((10, 10))
+        heatmap = self.stats.heatmap
+        heatmap[2, 2] = 65534
+        self.stats.heatmap = heatmap
+        
+        for _ in range(3):
+            self.stats.update_heatmap((0, 0, 5, 5))
+        self.stats.fold_heatmap()
+        
+        self.assertEqual(self.stats.heatmap[2, 2], 65535)
+        self.assertEqual(self.stats.heatmap[0, 0], 3)
+        
+        image = self.stats.get_heatmap_image()
+        self.assertEqual(image.dtype, np.uint8)
+        self.assertEqual(image[2, 2], 255)
+    
     # def test_record_eating_event(self):
     #     """Test recording eating events."""
     #     initial_count = self.stats.stats['eating_events']
@@ -172,6 +278,20 @@ class TestActivityStatistics(unittest.TestCase):
         self.assertIn(zone_name, self.stats.current_zones)
         self.assertIsNotNone(self.stats.zone_durations[zone_name].entry_time)
     
+    def test_record_zone_entries_batch(self):
+        """Test recording several zone entries from one frame."""
+        self.stats.record_zone_entries_batch([
+            ("kitchen", "restricted", "cat"),
+            ("kitchen", "restricted", "dog"),
+            ("bedroom", "normal", "cat")
+        ])
+        
+        self.assertEqual(self.stats.stats['zone_visits']['kitchen'], 2)
+        self.assertEqual(self.stats.stats['zone_visits']['bedroom'], 1)
+        self.assertEqual(self.stats.current_zones, {"kitchen", "bedroom"})
+        self.assertEqual(self.stats.zone_durations['kitchen'].visit_count, 1)
+        self.assertEqual(self.stats.stats['restricted_zone_violations'], 1)
+    
     def test_record_zone_exit(self):
         """Test recording zone exit events."""
         zone_name = "kitchen"
@@ -283,9 +403,52 @@ class TestActivityStatistics(unittest.TestCase):
         self.assertEqual(self.stats.stats['total_detections'], 20)
         self.assertEqual(self.stats.stats['zone_visits']['kitchen'], 3)
         self.assertEqual(len(self.stats.activity_log), 2)
+        self.assertEqual(self.stats.get_recent_activities(), ['Activity 1', 'Activity 2'])
         self.assertIn('kitchen', self.stats.zone_durations)
         self.assertEqual(self.stats.zone_durations['kitchen'].total_time, 150.0)
     
+    def test_activity_log_round_trip(self):
+        """Test that exported log entries import back to the same entries."""
+        self.stats.log_activity("cat entered kitchen")
+        self.stats.log_activity("ALERT: cat entered restricted zone: kitchen")
+        
+        restored = ActivityStatistics()
+        restored.import_from_dict(self.stats.export_to_dict())
+        
+        self.assertEqual(restored.get_recent_activities(), self.stats.get_recent_activities())
+        self.assertEqual(restored.activity_log[1][1], "ALERT: cat entered restricted zone: kitchen")
+    
+    def test_activity_timeline_round_trip(self):
+        """Test exporting and importing the hourly activity timeline."""
+        self.stats.stats['activity_timeline'][9] = 4
+        self.stats.stats['activity_timeline'][21] = 2
+        
+        export_data = self.stats.export_to_dict()
+        self.assertEqual(len(export_data['stats']['activity_timeline']), 24)
+        
+        restored = ActivityStatistics()
+        restored.import_from_dict(export_data)
+        self.assertEqual(restored.get_activity_timeline(), {9: 4, 21: 2})
+        
+        # Older exports stored the timeline as an hour -> count mapping
+        restored.import_from_dict({'stats': {'activity_timeline': {'7': 3}}})
+        self.assertEqual(restored.get_activity_timeline(), {7: 3})
+    
+    def test_json_bytes_round_trip(self):
+        """Test serializing statistics to JSON bytes and back."""
+        self.stats.record_eating_event('cat')
+        self.stats.record_zone_entry("kitchen", "restricted", "cat")
+        self.stats.stats['activity_timeline'][8] = 3
+        
+        data = self.stats.to_json_bytes()
+        self.assertIsInstance(data, bytes)
+        
+        restored = ActivityStatistics.from_json_bytes(data)
+        self.assertEqual(restored.stats['eating_events'], 1)
+        self.assertEqual(restored.stats['zone_visits']['kitchen'], 1)
+        self.assertEqual(restored.get_activity_timeline()[8], 3)
+        self.assertEqual(list(restored.activity_log), list(self.stats.activity_log))
+    
     def test_get_summary_report(self):
         """Test getting comprehensive summary report."""
         # Create diverse activity data
@@ -329,7 +492,7 @@ class TestActivityStatistics(unittest.TestCase):
         self.assertEqual(len(stats_limited.activity_log), 5)
         
         # Check that it kept the most recent ones
-        recent_activities = list(stats_limited.activity_log)
+        recent_activities = stats_limited.get_recent_activities(10)
         self.assertIn("Activity 9", recent_activities[-1])
         self.assertIn("Activity 5", recent_activities[0])
 
@@ -355,7 +518,9 @@ class TestZoneDuration(unittest.TestCase):
         
         self.assertEqual(zone_duration.visit_count, initial_count + 1)
         self.assertIsNotNone(zone_duration.entry_time)
-        self.assertIsInstance(zone_duration.entry_time, datetime.datetime)
+        self.assertIsInstance(zone_duration.entry_time, float)
+        self.assertIsInstance(zone_duration.entry_wallclock, datetime.datetime)
+        self.assertLess(abs((datetime.datetime.now() - zone_duration.entry_wallclock).total_seconds()), 1.0)
     
     def test_end_visit(self):
         """Test ending a zone visit."""
@@ -244,7 +244,8 @@ class TestPetActivityTracker(unittest.TestCase):
     def test_clear_zones(self):
         """Test clearing all zones."""
         self.tracker.update_zones(self.test_zones)
-        self.tracker.current_zones.add("kitchen")
+        self.tracker.process_detections([self.test_detection_kitchen])
+        self.assertIn("kitchen", self.tracker.current_zones)
         
         self.tracker.clear_zones()
         
@@ -287,6 +288,37 @@ class TestPetActivityTracker(unittest.TestCase):
         # Frame should be modified
         self.assertIsInstance(result_frame, np.ndarray)
     
+    def test_update_zones_keeps_occupied_zones(self):
+        """Test that occupancy follows zone names when zones are reordered or removed."""
+        self.tracker.update_zones(self.test_zones)
+        self.tracker.process_detections([self.test_detection_kitchen])
+        
+        # Kitchen moves to a different index but stays occupied
+        self.tracker.update_zones(list(reversed(self.test_zones)))
+        self.assertEqual(self.tracker.current_zones, {"kitchen"})
+        
+        # Removing the kitchen exits it on the next frame
+        self.tracker.update_zones(self.test_zones[1:])
+        self.assertEqual(self.tracker.current_zones, set())
+        self.tracker.process_detections([self.test_detection_kitchen])
+        self.assertNotIn("kitchen", self.statistics.current_zones)
+    
+    def test_draw_zones_caches_outlines(self):
+        """Test that zone outlines are rendered once and reused until zones change."""
+        self.tracker.update_zones(self.test_zones)
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        
+        first = self.tracker.draw_zones(frame).copy()
+        outlines = self.tracker.zone_outlines
+        second = self.tracker.draw_zones(frame)
+        
+        self.assertIs(self.tracker.zone_outlines, outlines)
+        self.assertTrue(np.array_equal(first, second))
+        self.assertTrue(np.array_equal(first[100, 150], (255, 0, 0)))  # kitchen border
+        
+        self.tracker.update_zones(self.test_zones[:1])
+        self.assertIsNone(self.tracker.zone_outlines)
+    
     @patch('cv2.circle')
     @patch('cv2.rectangle')
     @patch('cv2.putText')
@@ -304,6 +336,27 @@ class TestPetActivityTracker(unittest.TestCase):
         
         # Frame should be modified
         self.assertIsInstance(result_frame, np.ndarray)
+    
+    def test_draw_static_overlays_matches_separate_draws(self):
+        """Test that the cached zone and bowl sprite draws the same as draw_zones then draw_bowls."""
+        self.tracker.update_zones(self.test_zones)
+        self.tracker.update_bowls(self.test_bowls)
+        frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        
+        expected = self.tracker.draw_bowls(self.tracker.draw_zones(frame)).copy()
+        result = self.tracker.draw_static_overlays(frame)
+        
+        self.assertTrue(np.array_equal(result, expected))
+        
+        # Moving a bowl in place is picked up after invalidate_cache()
+        overlay = self.tracker.static_overlay
+        self.tracker.draw_static_overlays(frame)
+        self.assertIs(self.tracker.static_overlay, overlay)
+        
+        self.test_bowls["food"].position = (500, 400)
+        self.tracker.invalidate_cache()
+        expected = self.tracker.draw_bowls(self.tracker.draw_zones(frame)).copy()
+        self.assertTrue(np.array_equal(self.tracker.draw_static_overlays(frame), expected))
 
 
 class TestTrackerIntegration(unittest.TestCase):